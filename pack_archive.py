@@ -0,0 +1,103 @@
+"""
+FUO Scraper - Archive packing tool
+Convert thread image folders into packed containers (one file per thread), or back.
+
+Usage (from the project root):
+    python pack_archive.py [--course JPD113] [--unpack]
+
+Packed threads are served by the web application as before; scraping a
+packed thread again unpacks it first.
+"""
+import os
+import sys
+import argparse
+
+# Add src/backend to path
+backend_path = os.path.join(os.path.dirname(__file__), 'src', 'backend')
+sys.path.insert(0, backend_path)
+
+from database.database import db  # noqa: E402
+from scraper.blob_store import BlobStore  # noqa: E402
+from scraper.fuo_scraper import parse_thread_name  # noqa: E402
+from scraper.pack import extract_pack, is_packed, pack_path, pack_thread  # noqa: E402
+
+
+def running_threads():
+    """(course_code, thread_name) of scrape jobs that are running now."""
+    return {parse_thread_name(job['thread_url']) for job in db.list_jobs("running")}
+
+
+def pack_threads(threads, blob_store):
+    """Pack every thread that is still a folder."""
+    scraping = running_threads()
+    packed = files = size = 0
+    for thread in threads:
+        images_folder = thread['images_folder']
+        name = f"{thread['course_code']}/{thread['thread_name']}"
+        if not os.path.isdir(images_folder) or is_packed(images_folder):
+            continue
+        if (thread['course_code'], thread['thread_name']) in scraping:
+            print(f"- {name}: being scraped, skipped")
+            continue
+
+        # The folder's files may be the last links to their blobs
+        blob_keys = blob_store.thread_keys(images_folder) if blob_store else set()
+        try:
+            result = pack_thread(images_folder)
+        except Exception as e:
+            print(f"✗ {name}: {e}")
+            continue
+        if blob_keys:
+            blob_store.release(blob_keys)
+
+        packed += 1
+        files += result["files"]
+        size += result["bytes"]
+        print(f"✓ {name}: {result['files']} images → {result['bytes'] / 1024 / 1024:.1f} MB")
+        if result["leftovers"]:
+            print(f"  kept other files in the folder: {', '.join(result['leftovers'])}")
+
+    print(f"\nPacked {packed} thread(s), {files} image files replaced by {packed} container(s) ({size / 1024 / 1024:.1f} MB)")
+
+
+def unpack_threads(threads, blob_store):
+    """Restore the folder of every packed thread."""
+    unpacked = 0
+    for thread in threads:
+        images_folder = thread['images_folder']
+        container = pack_path(images_folder)
+        name = f"{thread['course_code']}/{thread['thread_name']}"
+        if not is_packed(images_folder):
+            continue
+        try:
+            count = extract_pack(container, images_folder)
+        except Exception as e:
+            print(f"✗ {name}: {e}")
+            continue
+        if blob_store:
+            blob_store.store_thread(images_folder)
+        unpacked += 1
+        print(f"✓ {name}: {count} images")
+
+    print(f"\nUnpacked {unpacked} thread(s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pack thread image folders into containers")
+    parser.add_argument("--course", help="only this course code")
+    parser.add_argument("--unpack", action="store_true", help="convert containers back to folders")
+    args = parser.parse_args()
+
+    threads = db.get_threads_by_course(args.course) if args.course else db.get_all_threads()
+    if args.course and not threads:
+        sys.exit(f"Course not found: {args.course}")
+
+    blob_store = BlobStore() if os.getenv("BLOB_STORE", "true").lower() == "true" else None
+    if args.unpack:
+        unpack_threads(threads, blob_store)
+    else:
+        pack_threads(threads, blob_store)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,54 @@
 """FastAPI server for FUO Scraper application."""
 import os
+import copy
+import uuid
 import shutil
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+import mimetypes
+import threading
+from contextlib import ExitStack
+from datetime import datetime, timezone
+from email.utils import formatdate
+from fastapi import FastAPI, HTTPException, Query
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
 from fastapi.requests import Request
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from dotenv import load_dotenv
-from typing import Dict
-from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
 
-from scraper.fuo_scraper import FUOScraper
+from scraper.blob_store import BlobStore
+from scraper.bundle import stream_pdf, stream_zip
+from scraper.capture import CAPTURE_MODES
+from scraper.derivatives import DERIVATIVE_SIZES, derivative_name, make_derivative
+from scraper.fuo_scraper import DOWNLOAD_MODES, parse_thread_name
+from scraper.http_scraper import HTTPScraper
+from scraper.pack import PackReader, PackReaders, is_packed, pack_path, unpacked_images
+from scraper.backends import SCRAPER_BACKENDS, create_scraper
+from scraper.session_store import SessionStore
+from scraper.transcode import TRANSCODE_FORMATS, transcode_thread
+from scraper.driver_pool import DriverPool
+from scraper.pdf_builder import (
+    DEFAULT_PDF_PROFILE,
+    PDF_PROFILES,
+    build_pdf,
+    build_pdfs,
+    is_pdf_current,
+    pdf_filename,
+    pdf_page_count
+)
+from scraper.phash import HASH_BITS, MAX_INDEXED_DISTANCE, from_signed
+from scraper.utils import IMAGE_EXTENSIONS, get_image_files
 from database.database import db
+from api.disk_cache import DiskCache
+from api.duplicates import (
+    dedupe_identical_images,
+    find_similar_images,
+    index_thread_hashes,
+    thread_duplicates
+)
+from api.scheduler import JobScheduler, normalize_thread_url
 
 # Load environment variables
 load_dotenv()
@@ -30,7 +66,50 @@ templates = Jinja2Templates(directory="src/frontend/templates")
 # Store scraping tasks
 scraping_tasks: Dict[str, Dict] = {}
 
-executor = ThreadPoolExecutor(max_workers=1)
+# Number of scrape jobs run at the same time
+SCRAPE_WORKERS = int(os.getenv("SCRAPE_WORKERS", "2"))
+
+# Saved login sessions shared by all scrape jobs
+session_store = SessionStore()
+
+# Warm browser pools for the Selenium backend, one per headless setting
+DRIVER_POOL_SIZE = int(os.getenv("DRIVER_POOL_SIZE", "2"))
+DRIVER_MAX_USES = int(os.getenv("DRIVER_MAX_USES", "20"))
+driver_pools: Dict[bool, DriverPool] = {}
+driver_pools_lock = threading.Lock()
+
+# PDFs built on first request (missing or older than their images)
+PDF_CACHE_DIR = os.getenv("PDF_CACHE_DIR", os.path.join("archive", "cache", "pdf"))
+PDF_CACHE_MAX_MB = int(os.getenv("PDF_CACHE_MAX_MB", "1024"))
+pdf_cache = DiskCache(PDF_CACHE_DIR, PDF_CACHE_MAX_MB * 1024 * 1024)
+
+# Downscaled images (thumbnails etc.) built on first request or after a scrape
+IMAGE_CACHE_DIR = os.getenv("IMAGE_CACHE_DIR", os.path.join("archive", "cache", "images"))
+IMAGE_CACHE_MAX_MB = int(os.getenv("IMAGE_CACHE_MAX_MB", "512"))
+THUMBNAIL_PREWARM = os.getenv("THUMBNAIL_PREWARM", "true").lower() == "true"
+image_cache = DiskCache(IMAGE_CACHE_DIR, IMAGE_CACHE_MAX_MB * 1024 * 1024)
+
+# Identical images of all threads stored once (hard links into archive/blobs)
+BLOB_STORE = os.getenv("BLOB_STORE", "true").lower() == "true"
+blob_store = BlobStore() if BLOB_STORE else None
+
+# Containers of packed threads (see pack_archive.py), kept open between requests
+pack_readers = PackReaders()
+
+
+def get_driver_pool(headless: bool, username: str, password: str) -> DriverPool:
+    """Get (or create) the shared driver pool for a headless setting."""
+    with driver_pools_lock:
+        if headless not in driver_pools:
+            driver_pools[headless] = DriverPool(
+                username,
+                password,
+                size=DRIVER_POOL_SIZE,
+                max_uses=DRIVER_MAX_USES,
+                headless=headless,
+                session_store=session_store
+            )
+        return driver_pools[headless]
 
 
 @app.on_event("startup")
@@ -39,16 +118,60 @@ async def startup_event():
     print("\n🔄 Syncing archive to database...")
     db.sync_from_archive()
     print("✅ Database sync complete\n")
+    
+    # Start logged-in browsers ahead of the first scrape
+    username = os.getenv("FUO_USERNAME")
+    password = os.getenv("FUO_PASSWORD")
+    prewarm = os.getenv("DRIVER_POOL_PREWARM", "false").lower() == "true"
+    if prewarm and DRIVER_POOL_SIZE > 0 and username and password:
+        print(f"🔥 Warming {DRIVER_POOL_SIZE} browser(s)...")
+        get_driver_pool(True, username, password).prewarm()
+    
+    scheduler.start()
+    print(f"🧵 Scrape scheduler started with {SCRAPE_WORKERS} worker(s)")
 
 
-class ScrapeRequest(BaseModel):
-    url: str
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Run on application shutdown."""
+    scheduler.stop()
+    for pool in driver_pools.values():
+        pool.close()
+
+
+class ScrapeSettings(BaseModel):
+    backend: str = "selenium"
+    priority: int = 0
     headless: bool = False
     all_in_one: bool = False
     batch_size: int = 10
     item_delay: int = 2
     page_load_timeout: int = 10
     element_timeout: int = 10
+    download_mode: str = "screenshot"
+    capture_mode: str = "viewport"
+    pdf_workers: int = 1
+    pdf_profile: str = DEFAULT_PDF_PROFILE
+    lazy_pdf: bool = False
+    auto_crop: bool = False
+    max_connections: int = 4
+    concurrency: int = 8
+    rate_limit: float = 10.0
+    force: bool = False
+
+
+class ScrapeRequest(ScrapeSettings):
+    url: str
+
+
+class BulkScrapeRequest(ScrapeSettings):
+    urls: List[str] = []
+    listing_url: Optional[str] = None
+    max_pages: int = 10
+
+
+# Settings passed through to run_scraper for each job
+SCRAPER_SETTING_FIELDS = set(ScrapeSettings.__fields__) - {"priority"}
 
 
 class SearchRequest(BaseModel):
@@ -60,6 +183,11 @@ class DeleteThreadRequest(BaseModel):
     thread_name: str
 
 
+class TranscodeRequest(BaseModel):
+    format: str = "webp"
+    course_code: Optional[str] = None
+
+
 @app.get("/")
 async def home(request: Request):
     """Render homepage."""
@@ -95,7 +223,7 @@ async def get_courses():
             courses[course_code].append({
                 'name': thread['thread_name'],
                 'image_count': thread['image_count'],
-                'has_pdf': bool(thread['pdf_path'] and os.path.exists(thread['pdf_path'])),
+                'has_pdf': has_pdf(thread),
                 'course_code': course_code
             })
         
@@ -113,14 +241,18 @@ async def get_images(course_code: str, thread_name: str):
             raise HTTPException(status_code=404, detail="Thread not found")
         
         images_folder = thread['images_folder']
-        if not os.path.exists(images_folder):
+        pack = thread_pack(images_folder)
+        if not os.path.exists(images_folder) and not pack:
             raise HTTPException(status_code=404, detail="Images folder not found")
         
         # Get image files
-        image_files = sorted(
-            [f for f in os.listdir(images_folder) if f.endswith(('.jpg', '.jpeg', '.png'))],
-            key=lambda x: int(x.split('.')[0]) if x.split('.')[0].isdigit() else 0
-        )
+        if pack:
+            image_files = pack.names()
+        else:
+            image_files = sorted(
+                [f for f in os.listdir(images_folder) if f.lower().endswith(IMAGE_EXTENSIONS)],
+                key=lambda x: int(x.split('.')[0]) if x.split('.')[0].isdigit() else 0
+            )
         
         # Return relative paths for API
         relative_images = [
@@ -140,44 +272,462 @@ async def get_images(course_code: str, thread_name: str):
 
 
 @app.get("/api/image/{course_code}/{thread_name}/{filename}")
-async def get_image(course_code: str, thread_name: str, filename: str):
-    """Serve a specific image file."""
+async def get_image(
+    request: Request,
+    course_code: str,
+    thread_name: str,
+    filename: str,
+    size: Optional[str] = None
+):
+    """
+    Serve a specific image file.
+    With `size` ('thumb' or 'medium'), serves a downscaled copy from the
+    image cache, as WebP (or JPEG for clients that do not accept WebP).
+    Images of packed threads are read from the thread's container.
+    """
     image_path = os.path.join(
         "archive", "images", course_code, thread_name, filename
     )
     
+    pack = None
     if not os.path.exists(image_path):
-        raise HTTPException(status_code=404, detail="Image not found")
+        pack = thread_pack(os.path.dirname(image_path))
+        if not pack or not pack.entry(filename):
+            raise HTTPException(status_code=404, detail="Image not found")
+    
+    if size is None:
+        if pack:
+            return packed_image_response(request, pack, filename)
+        return FileResponse(image_path)
+    
+    if size not in DERIVATIVE_SIZES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid image size. Must be one of: {', '.join(DERIVATIVE_SIZES)}"
+        )
+    
+    image_format = "webp" if "image/webp" in request.headers.get("accept", "") else "jpeg"
+    try:
+        derivative_path = await run_in_threadpool(
+            cached_derivative, course_code, thread_name, image_path, size, image_format, pack
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Could not resize image: {e}")
     
-    return FileResponse(image_path)
+    return FileResponse(
+        derivative_path,
+        media_type=f"image/{image_format}",
+        headers={"Vary": "Accept"}
+    )
+
+
+def cached_derivative(
+    course_code: str,
+    thread_name: str,
+    image_path: str,
+    size: str,
+    image_format: str,
+    pack: Optional[PackReader] = None
+) -> str:
+    """
+    Path of an image's downscaled copy, building it if missing or stale.
+    With `pack`, the image is read from the thread's container.
+    """
+    filename = os.path.basename(image_path)
+    mtime = pack.entry(filename)["mtime"] if pack else os.path.getmtime(image_path)
+    
+    def build(tmp_path: str):
+        source = pack.open(filename) if pack else image_path
+        make_derivative(source, tmp_path, size, image_format)
+    
+    key = os.path.join(course_code, thread_name, derivative_name(filename, size, image_format))
+    return image_cache.get_or_build(key, build, lambda path: os.path.getmtime(path) >= mtime)
+
+
+def thread_pack(images_folder: str) -> Optional[PackReader]:
+    """Container of a packed thread (None if the thread is a folder, see is_packed)."""
+    if not images_folder or not is_packed(images_folder):
+        return None
+    try:
+        return pack_readers.get(pack_path(images_folder))
+    except (OSError, ValueError) as e:
+        print(f"Error opening container of {images_folder}: {e}")
+        return None
+
+
+def parse_byte_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single `Range: bytes=start-end` header into [start, end).
+    Returns None to serve the whole file (no header, or several ranges);
+    raises 416 for a range outside the file.
+    """
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    first, _, last = header[len("bytes="):].strip().partition("-")
+    try:
+        if first:
+            start = int(first)
+            end = min(int(last) + 1, size) if last else size
+        else:
+            start, end = max(size - int(last), 0), size
+    except ValueError:
+        return None
+    if start >= end:
+        raise HTTPException(
+            status_code=416,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{size}"}
+        )
+    return start, end
+
+
+def packed_image_response(request: Request, pack: PackReader, filename: str) -> Response:
+    """Serve an image (or the requested byte range of it) from a container."""
+    entry = pack.entry(filename)
+    size = entry["size"]
+    headers = {
+        "Accept-Ranges": "bytes",
+        "Last-Modified": formatdate(entry["mtime"], usegmt=True)
+    }
+    media_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    
+    byte_range = parse_byte_range(request.headers.get("range"), size)
+    if byte_range is None:
+        return Response(pack.read(filename), media_type=media_type, headers=headers)
+    
+    start, end = byte_range
+    headers["Content-Range"] = f"bytes {start}-{end - 1}/{size}"
+    return Response(
+        pack.read(filename, start, end),
+        status_code=206,
+        media_type=media_type,
+        headers=headers
+    )
+
+
+def process_new_images(course_code: str, thread_name: str, images_folder: str):
+    """After a scrape: hash the thread's images and build their thumbnails."""
+    try:
+        index_thread_hashes(course_code, thread_name, images_folder)
+    except Exception as e:
+        print(f"Error indexing image hashes of {thread_name}: {e}")
+    
+    if not THUMBNAIL_PREWARM:
+        return
+    for image_path in thread_image_paths(images_folder):
+        try:
+            cached_derivative(course_code, thread_name, image_path, "thumb", "webp")
+        except Exception as e:
+            print(f"Error creating thumbnail for {image_path}: {e}")
 
 
 @app.get("/api/thread/{course_code}/{thread_name}/pdf")
 @app.head("/api/thread/{course_code}/{thread_name}/pdf")
-async def get_pdf(course_code: str, thread_name: str):
-    """Serve PDF file for a thread from database."""
+async def get_pdf(course_code: str, thread_name: str, profile: Optional[str] = None):
+    """
+    Serve PDF file for a thread from database.
+    Without `profile`, serves the PDF recorded for the thread; otherwise the
+    variant built with that profile (e.g. 'mobile' for slow links).
+    A PDF that is missing or older than the thread's images is built on
+    first request and kept in the PDF cache.
+    """
     thread = db.get_thread(course_code, thread_name)
     
-    if not thread or not thread['pdf_path']:
+    if not thread:
         raise HTTPException(status_code=404, detail="PDF not found")
     
-    pdf_path = thread['pdf_path']
-    if not os.path.exists(pdf_path):
+    if profile is None:
+        pdf_path = thread['pdf_path']
+        profile = thread.get('pdf_profile') or DEFAULT_PDF_PROFILE
+    else:
+        validate_pdf_profile(profile)
+        pdf_path = thread_pdf_path(course_code, thread_name, profile)
+    
+    try:
+        pdf_path = await run_in_threadpool(current_pdf, course_code, thread, profile, pdf_path)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Could not build PDF: {e}")
+    if not pdf_path:
         raise HTTPException(status_code=404, detail="PDF file not found")
     
     return FileResponse(
         pdf_path,
         media_type="application/pdf",
-        filename=f"{thread_name}.pdf"
+        filename=os.path.basename(pdf_path)
     )
 
 
-@app.post("/api/scrape")
-async def start_scrape(
-    scrape_request: ScrapeRequest,
-    background_tasks: BackgroundTasks
+def thread_pdf_path(course_code: str, thread_name: str, profile: str) -> str:
+    """Path of a thread's PDF for a profile."""
+    return os.path.join(
+        "archive", "documents", course_code, pdf_filename(thread_name, profile)
+    )
+
+
+def has_pdf(thread: Dict) -> bool:
+    """A thread has a PDF if one was written or it can be built from its images."""
+    if thread['pdf_path'] and os.path.exists(thread['pdf_path']):
+        return True
+    return bool(thread['image_count'])
+
+
+def thread_image_paths(images_folder: str) -> List[str]:
+    """Image files of a thread in page order (empty if the folder is gone)."""
+    if not images_folder or not os.path.isdir(images_folder):
+        return []
+    return [os.path.join(images_folder, f) for f in get_image_files(images_folder)]
+
+
+def cached_pdf(
+    course_code: str,
+    thread_name: str,
+    image_paths: List[str],
+    profile: str
+) -> str:
+    """
+    Path of a thread's PDF in the PDF cache, building it if it is missing
+    or stale. Concurrent requests for the same PDF share one build, which
+    runs in the request's thread (no process pool per request).
+    """
+    return pdf_cache.get_or_build(
+        os.path.join(course_code, pdf_filename(thread_name, profile)),
+        lambda tmp_path: build_pdf(image_paths, tmp_path, workers=1, profile=profile),
+        lambda path: is_pdf_current(path, image_paths)
+    )
+
+
+def current_pdf(course_code: str, thread: Dict, profile: str, pdf_path: str) -> Optional[str]:
+    """
+    `pdf_path` if it is current, otherwise the thread's PDF from the PDF
+    cache (built if needed; a packed thread's images are extracted to a
+    temporary folder for the build). Returns None if there are no images.
+    """
+    thread_name = thread['thread_name']
+    pack = thread_pack(thread['images_folder'])
+    if not pack:
+        image_paths = thread_image_paths(thread['images_folder'])
+        if is_pdf_current(pdf_path, image_paths):
+            return pdf_path
+        return cached_pdf(course_code, thread_name, image_paths, profile) if image_paths else None
+    
+    newest = pack.mtime()
+    
+    def is_current(path: str) -> bool:
+        return os.path.getmtime(path) >= newest and pdf_page_count(path) == len(pack.names())
+    
+    def build(tmp_path: str):
+        with unpacked_images(pack.path) as image_paths:
+            build_pdf(image_paths, tmp_path, workers=1, profile=profile)
+    
+    if pdf_path and os.path.exists(pdf_path) and is_current(pdf_path):
+        return pdf_path
+    if not pack.names():
+        return None
+    return pdf_cache.get_or_build(
+        os.path.join(course_code, pdf_filename(thread_name, profile)), build, is_current
+    )
+
+
+def validate_pdf_profile(profile: str):
+    """Reject unknown PDF profile names."""
+    if profile not in PDF_PROFILES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid PDF profile. Must be one of: {', '.join(PDF_PROFILES)}"
+        )
+
+
+@app.post("/api/course/{course_code}/pdf/rebuild")
+async def rebuild_course_pdfs(
+    course_code: str,
+    workers: int = 0,
+    profile: str = DEFAULT_PDF_PROFILE
 ):
-    """Start a new scraping task."""
+    """
+    Regenerate the PDF of every thread in a course for a profile.
+    Pages are prepared on `workers` processes (0 = one per CPU core).
+    """
+    validate_pdf_profile(profile)
+    threads = db.get_threads_by_course(course_code)
+    if not threads:
+        raise HTTPException(status_code=404, detail="Course not found")
+    
+    documents = []
+    for thread in threads:
+        image_paths = thread_image_paths(thread['images_folder'])
+        if not image_paths:
+            continue
+        pdf_path = thread_pdf_path(course_code, thread['thread_name'], profile)
+        os.makedirs(os.path.dirname(pdf_path), exist_ok=True)
+        documents.append((image_paths, pdf_path))
+    
+    rebuilt = await run_in_threadpool(build_pdfs, documents, workers, profile)
+    return JSONResponse(content={
+        "success": True,
+        "rebuilt": len(rebuilt),
+        "total": len(threads)
+    })
+
+
+# Course bundle formats: ZIP of PDFs and images, or one merged PDF
+BUNDLE_FORMATS = ("zip", "pdf")
+
+
+@app.get("/api/course/{course_code}/bundle")
+async def download_course_bundle(
+    course_code: str,
+    bundle_format: str = Query("zip", alias="format"),
+    profile: str = DEFAULT_PDF_PROFILE,
+    images: bool = True,
+    pdfs: bool = True,
+    workers: int = 1
+):
+    """
+    Stream every thread of a course as one download, generated on the fly.
+    format=zip: {thread}/{thread}.pdf and {thread}/images/* for each thread;
+    format=pdf: one PDF with the pages of all threads in order.
+    """
+    if bundle_format not in BUNDLE_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid bundle format. Must be one of: {', '.join(BUNDLE_FORMATS)}"
+        )
+    validate_pdf_profile(profile)
+    
+    threads = sorted(db.get_threads_by_course(course_code), key=lambda t: t['thread_name'])
+    if not threads:
+        raise HTTPException(status_code=404, detail="Course not found")
+    
+    if bundle_format == "pdf":
+        chunks = course_pdf_chunks(threads, workers, profile)
+        media_type = "application/pdf"
+    else:
+        chunks = stream_zip(course_bundle_files(course_code, threads, profile, images, pdfs))
+        media_type = "application/zip"
+    
+    return StreamingResponse(
+        chunks,
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="{course_code}.{bundle_format}"'
+        }
+    )
+
+
+def course_pdf_chunks(threads: List[Dict], workers: int, profile: str):
+    """
+    Merged PDF of a course's threads. Packed threads are extracted to
+    temporary folders, removed once the stream ends.
+    """
+    with ExitStack() as stack:
+        image_paths = []
+        for thread in threads:
+            pack = thread_pack(thread['images_folder'])
+            if pack:
+                image_paths.extend(stack.enter_context(unpacked_images(pack.path)))
+            else:
+                image_paths.extend(thread_image_paths(thread['images_folder']))
+        yield from stream_pdf(image_paths, workers=workers, profile=profile)
+
+
+def course_bundle_files(
+    course_code: str,
+    threads: List[Dict],
+    profile: str,
+    images: bool,
+    pdfs: bool
+):
+    """
+    Yield (arcname, path) pairs for a course ZIP. A thread's PDF is taken
+    from the archive when current, otherwise built into the PDF cache.
+    """
+    for thread in threads:
+        thread_name = thread['thread_name']
+        
+        if pdfs:
+            pdf_path = thread_pdf_path(course_code, thread_name, profile)
+            try:
+                pdf_path = current_pdf(course_code, thread, profile, pdf_path)
+            except Exception as e:
+                print(f"Error building PDF for {thread_name}: {e}")
+            if pdf_path and os.path.exists(pdf_path):
+                yield f"{thread_name}/{pdf_filename(thread_name, profile)}", pdf_path
+        
+        if images:
+            pack = thread_pack(thread['images_folder'])
+            if pack:
+                for name in pack.names():
+                    yield f"{thread_name}/images/{name}", (pack, name)
+            for path in thread_image_paths(thread['images_folder']):
+                yield f"{thread_name}/images/{os.path.basename(path)}", path
+
+
+def validate_scrape_settings(settings: ScrapeSettings):
+    """Reject scraper settings the backend cannot run."""
+    if settings.download_mode not in DOWNLOAD_MODES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid download mode. Must be one of: {', '.join(DOWNLOAD_MODES)}"
+        )
+    
+    if settings.capture_mode not in CAPTURE_MODES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid capture mode. Must be one of: {', '.join(CAPTURE_MODES)}"
+        )
+    
+    if settings.backend not in SCRAPER_BACKENDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid backend. Must be one of: {', '.join(SCRAPER_BACKENDS)}"
+        )
+    
+    validate_pdf_profile(settings.pdf_profile)
+    
+    if settings.pdf_workers < 0:
+        raise HTTPException(
+            status_code=400,
+            detail="PDF workers must be 0 (one per CPU core) or more."
+        )
+    
+    if settings.concurrency < 1 or settings.rate_limit <= 0:
+        raise HTTPException(
+            status_code=400,
+            detail="Concurrency must be at least 1 and rate limit must be positive."
+        )
+
+
+def queue_scrape(url: str, settings: ScrapeSettings) -> Tuple[str, Dict, bool]:
+    """
+    Queue a scrape job for a thread URL.
+    Returns (task_id, job, created); created is False when the thread is
+    already queued or running.
+    """
+    # Create task ID
+    task_id = url.split("/threads/")[1].split("/")[0] if "/threads/" in url else str(hash(url))
+    
+    job, created = scheduler.submit(
+        task_id,
+        url,
+        settings.dict(include=SCRAPER_SETTING_FIELDS),
+        priority=settings.priority
+    )
+    
+    if created:
+        # Initialize task
+        scraping_tasks[task_id] = {
+            "status": "queued",
+            "progress": 0,
+            "total": 0,
+            "url": url
+        }
+    
+    return task_id, job, created
+
+
+@app.post("/api/scrape")
+async def start_scrape(scrape_request: ScrapeRequest):
+    """Queue a new scraping task."""
     url = scrape_request.url
     
     # Validate URL
@@ -187,55 +737,217 @@ async def start_scrape(
             detail="Invalid URL. Must be a FUOverflow thread URL."
         )
     
-    # Create task ID
-    task_id = url.split("/threads/")[1].split("/")[0] if "/threads/" in url else str(hash(url))
+    validate_scrape_settings(scrape_request)
     
-    # Check if already scraping
-    if task_id in scraping_tasks and scraping_tasks[task_id]["status"] == "running":
+    # Queue the job; a thread that is already queued or running is not added again
+    task_id, job, created = queue_scrape(url, scrape_request)
+    if not created:
         return JSONResponse(content={
             "success": False,
-            "error": "This thread is already being scraped.",
-            "task_id": task_id
+            "error": "This thread is already queued or being scraped.",
+            "task_id": job["task_id"]
         })
     
-    # Initialize task
-    scraping_tasks[task_id] = {
-        "status": "running",
-        "progress": 0,
-        "total": 0,
-        "url": url
-    }
+    return JSONResponse(content={
+        "success": True,
+        "task_id": task_id,
+        "message": "Scraping queued"
+    })
+
+
+def expand_listing(listing_url: str, max_pages: int) -> List[Dict]:
+    """Fetch a forum listing (and its next pages) and return its threads."""
+    scraper = HTTPScraper(
+        os.getenv("FUO_USERNAME"),
+        os.getenv("FUO_PASSWORD"),
+        session_store=session_store
+    )
+    try:
+        return scraper.list_threads(listing_url, max_pages)
+    finally:
+        scraper.close()
+
+
+def is_thread_unchanged(course_code: str, thread_name: str, last_activity: Optional[int]) -> bool:
+    """
+    Check whether a thread was already scraped and has no newer posts.
+    Without listing data (last_activity is None) the thread is queued and
+    the scraper's fingerprint check decides, at the cost of one page fetch.
+    """
+    thread = db.get_thread(course_code, thread_name)
+    if not thread or last_activity is None:
+        return False
     
-    # Start background task with settings
-    background_tasks.add_task(
-        run_scraper,
-        task_id,
-        url,
-        scrape_request.headless,
-        scrape_request.all_in_one,
-        scrape_request.batch_size,
-        scrape_request.item_delay,
-        scrape_request.page_load_timeout,
-        scrape_request.element_timeout
+    scraped_at = datetime.strptime(thread["scraped_at"], "%Y-%m-%d %H:%M:%S")
+    return scraped_at.replace(tzinfo=timezone.utc).timestamp() >= last_activity
+
+
+@app.post("/api/scrape/bulk")
+async def start_bulk_scrape(bulk_request: BulkScrapeRequest):
+    """Queue many threads, given as URLs and/or a forum listing, as one batch."""
+    validate_scrape_settings(bulk_request)
+    
+    if not bulk_request.urls and not bulk_request.listing_url:
+        raise HTTPException(
+            status_code=400,
+            detail="Provide thread URLs or a forum listing URL."
+        )
+    
+    candidates = [{"url": url, "last_activity": None} for url in bulk_request.urls]
+    
+    if bulk_request.listing_url:
+        if not bulk_request.listing_url.startswith("https://fuoverflow.com/"):
+            raise HTTPException(
+                status_code=400,
+                detail="Invalid listing URL. Must be a FUOverflow forum URL."
+            )
+        if not os.getenv("FUO_USERNAME") or not os.getenv("FUO_PASSWORD"):
+            raise HTTPException(status_code=400, detail="Missing credentials")
+        
+        try:
+            candidates.extend(await run_in_threadpool(
+                expand_listing, bulk_request.listing_url, bulk_request.max_pages
+            ))
+        except Exception as e:
+            raise HTTPException(
+                status_code=502,
+                detail=f"Could not read forum listing: {str(e)}"
+            )
+    
+    job_ids = []
+    skipped = []
+    invalid = []
+    seen = set()
+    
+    for candidate in candidates:
+        url = candidate["url"]
+        if not url.startswith("https://fuoverflow.com/") or "/threads/" not in url:
+            invalid.append(url)
+            continue
+        
+        key = normalize_thread_url(url)
+        if key in seen:
+            continue
+        seen.add(key)
+        
+        try:
+            course_code, thread_name = parse_thread_name(url)
+        except ValueError:
+            invalid.append(url)
+            continue
+        
+        if not bulk_request.force and is_thread_unchanged(
+            course_code, thread_name, candidate["last_activity"]
+        ):
+            skipped.append({
+                "url": url,
+                "course_code": course_code,
+                "thread_name": thread_name
+            })
+            continue
+        
+        task_id, job, created = queue_scrape(url, bulk_request)
+        job_ids.append(job["id"])
+    
+    batch_id = uuid.uuid4().hex[:12]
+    db.create_batch(
+        batch_id,
+        bulk_request.listing_url or "urls",
+        job_ids,
+        skipped
     )
     
     return JSONResponse(content={
         "success": True,
-        "task_id": task_id,
-        "message": "Scraping started"
+        "batch_id": batch_id,
+        "queued": len(job_ids),
+        "skipped": len(skipped),
+        "invalid": invalid
+    })
+
+
+@app.get("/api/scrape/batch/{batch_id}")
+async def get_batch_status(batch_id: str):
+    """Get combined progress of a bulk scrape batch."""
+    batch = db.get_batch(batch_id)
+    if not batch:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    
+    counts = {"queued": 0, "running": 0, "completed": 0, "error": 0}
+    jobs = []
+    done = 0.0
+    
+    for job in batch["jobs"]:
+        task = scraping_tasks.get(job["task_id"], {})
+        status = job["status"]
+        counts[status] = counts.get(status, 0) + 1
+        
+        progress = task.get("progress", 0)
+        total = task.get("total", 0)
+        if status in ("completed", "error"):
+            done += 1
+        elif status == "running" and total:
+            done += progress / total
+        
+        jobs.append({
+            "task_id": job["task_id"],
+            "url": job["thread_url"],
+            "status": status,
+            "progress": progress,
+            "total": total,
+            "error": job["error"]
+        })
+    
+    return JSONResponse(content={
+        "success": True,
+        "batch": {
+            "id": batch["id"],
+            "source": batch["source"],
+            "created_at": batch["created_at"],
+            "total": len(jobs),
+            "counts": counts,
+            "progress": round(done / len(jobs) * 100, 1) if jobs else 100.0,
+            "jobs": jobs,
+            "skipped": batch["skipped"]
+        }
     })
 
 
 @app.get("/api/scrape/status/{task_id}")
 async def get_scrape_status(task_id: str):
     """Get status of a scraping task."""
-    if task_id not in scraping_tasks:
+    if task_id in scraping_tasks:
+        return JSONResponse(content={
+            "success": True,
+            "task": scraping_tasks[task_id]
+        })
+    
+    # Jobs from before a restart are only in the database
+    job = db.get_job(task_id)
+    if not job:
         raise HTTPException(status_code=404, detail="Task not found")
     
-    return JSONResponse(content={
-        "success": True,
-        "task": scraping_tasks[task_id]
-    })
+    task = {
+        "status": job["status"],
+        "progress": 0,
+        "total": 0,
+        "url": job["thread_url"]
+    }
+    if job["result"]:
+        task["result"] = job["result"]
+    if job["error"]:
+        task["error"] = job["error"]
+    
+    return JSONResponse(content={"success": True, "task": task})
+
+
+@app.get("/api/scrape/jobs")
+async def list_scrape_jobs(status: Optional[str] = None, limit: int = 100):
+    """List queued, running and finished scrape jobs."""
+    jobs = db.list_jobs(status, limit)
+    for job in jobs:
+        job.pop("settings", None)
+    return JSONResponse(content={"success": True, "jobs": jobs})
 
 
 @app.get("/api/search/suggestions")
@@ -273,7 +985,7 @@ async def search(search_request: SearchRequest):
             grouped[course_code].append({
                 'name': thread['thread_name'],
                 'image_count': thread['image_count'],
-                'has_pdf': bool(thread['pdf_path'] and os.path.exists(thread['pdf_path'])),
+                'has_pdf': has_pdf(thread),
                 'course_code': course_code
             })
         
@@ -293,7 +1005,18 @@ def run_scraper(
     batch_size: int = 10,
     item_delay: int = 2,
     page_load_timeout: int = 10,
-    element_timeout: int = 10
+    element_timeout: int = 10,
+    download_mode: str = "screenshot",
+    capture_mode: str = "viewport",
+    pdf_workers: int = 1,
+    pdf_profile: str = DEFAULT_PDF_PROFILE,
+    lazy_pdf: bool = False,
+    auto_crop: bool = False,
+    max_connections: int = 4,
+    concurrency: int = 8,
+    rate_limit: float = 10.0,
+    backend: str = "selenium",
+    force: bool = False
 ):
     """Run scraper in background."""
     try:
@@ -305,7 +1028,13 @@ def run_scraper(
             scraping_tasks[task_id]["error"] = "Missing credentials"
             return
         
-        scraper = FUOScraper(
+        # Selenium jobs borrow a warm browser instead of starting one
+        driver_pool = None
+        if backend == "selenium" and DRIVER_POOL_SIZE > 0:
+            driver_pool = get_driver_pool(headless, username, password)
+        
+        scraper = create_scraper(
+            backend,
             username,
             password,
             headless=headless,
@@ -313,19 +1042,43 @@ def run_scraper(
             batch_size=batch_size,
             item_delay=item_delay,
             page_load_timeout=page_load_timeout,
-            element_timeout=element_timeout
+            element_timeout=element_timeout,
+            download_mode=download_mode,
+            capture_mode=capture_mode,
+            pdf_workers=pdf_workers,
+            pdf_profile=pdf_profile,
+            lazy_pdf=lazy_pdf,
+            auto_crop=auto_crop,
+            max_connections=max_connections,
+            concurrency=concurrency,
+            rate_limit=rate_limit,
+            session_store=session_store,
+            driver_pool=driver_pool,
+            blob_store=blob_store,
+            force=force
         )
         
         def progress_callback(current, total):
             scraping_tasks[task_id]["progress"] = current
             scraping_tasks[task_id]["total"] = total
         
-        result = scraper.scrape_images(url, progress_callback)
+        def stage_callback(stages):
+            scraping_tasks[task_id]["stages"] = stages
+        
+        result = scraper.scrape_images(url, progress_callback, stage_callback)
         
         if result["success"]:
             scraping_tasks[task_id]["status"] = "completed"
             scraping_tasks[task_id]["result"] = result
             scraping_tasks[task_id]["progress"] = result.get("total", 0)
+            
+            # Thumbnails and duplicate index, without holding up the job
+            if result.get("downloaded"):
+                threading.Thread(
+                    target=process_new_images,
+                    args=(result["course_code"], result["full_name"], result["images_folder"]),
+                    daemon=True
+                ).start()
         else:
             scraping_tasks[task_id]["status"] = "error"
             scraping_tasks[task_id]["error"] = result.get("error", "Unknown error")
@@ -335,6 +1088,323 @@ def run_scraper(
         scraping_tasks[task_id]["error"] = str(e)
 
 
+def run_job(job: Dict):
+    """Run a queued scrape job and record its outcome in the database."""
+    task_id = job["task_id"]
+    task = scraping_tasks.setdefault(task_id, {
+        "progress": 0,
+        "total": 0,
+        "url": job["thread_url"]
+    })
+    task["status"] = "running"
+    
+    run_scraper(task_id, job["thread_url"], **job["settings"])
+    
+    db.finish_job(
+        job["id"],
+        task["status"],
+        result=task.get("result"),
+        error=task.get("error")
+    )
+
+
+scheduler = JobScheduler(run_job, workers=SCRAPE_WORKERS)
+
+
+# Progress of the background archive transcoding run
+transcode_status: Dict = {"status": "idle", "courses": {}}
+transcode_lock = threading.Lock()
+
+
+@app.post("/api/archive/transcode")
+async def start_transcode(transcode_request: TranscodeRequest):
+    """
+    Re-encode archived images losslessly (WebP or optimized PNG) in the
+    background, for one course or the whole archive.
+    """
+    if transcode_request.format not in TRANSCODE_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid format. Must be one of: {', '.join(TRANSCODE_FORMATS)}"
+        )
+    
+    if transcode_request.course_code:
+        threads = db.get_threads_by_course(transcode_request.course_code)
+        if not threads:
+            raise HTTPException(status_code=404, detail="Course not found")
+    else:
+        threads = db.get_all_threads()
+    
+    with transcode_lock:
+        if transcode_status["status"] == "running":
+            raise HTTPException(status_code=409, detail="Transcoding is already running")
+        transcode_status.update(
+            status="running",
+            format=transcode_request.format,
+            done=0,
+            total=len(threads),
+            courses={},
+            started_at=datetime.now(timezone.utc).isoformat()
+        )
+    
+    threading.Thread(
+        target=run_transcode,
+        args=(threads, transcode_request.format),
+        name="archive-transcode",
+        daemon=True
+    ).start()
+    
+    return JSONResponse(content={"success": True, "total": len(threads)})
+
+
+@app.get("/api/archive/transcode")
+async def get_transcode_status():
+    """Progress of the last transcoding run, with bytes saved per course."""
+    with transcode_lock:
+        status = copy.deepcopy(transcode_status)
+    return JSONResponse(content={"success": True, "transcode": status})
+
+
+@app.post("/api/archive/blobs")
+async def store_archive_blobs(course_code: Optional[str] = None):
+    """
+    Move existing thread folders (one course or the whole archive) into
+    the blob store, then remove unreferenced blobs. New scrapes are stored
+    as they are downloaded.
+    """
+    if not blob_store:
+        raise HTTPException(status_code=400, detail="Blob store is disabled")
+    
+    threads = db.get_threads_by_course(course_code) if course_code else db.get_all_threads()
+    if course_code and not threads:
+        raise HTTPException(status_code=404, detail="Course not found")
+    
+    report = await run_in_threadpool(run_blob_migration, threads)
+    return JSONResponse(content={"success": True, **report})
+
+
+@app.get("/api/archive/blobs")
+async def get_blob_stats():
+    """Blob store usage and the disk space its shared files save."""
+    if not blob_store:
+        raise HTTPException(status_code=400, detail="Blob store is disabled")
+    stats = await run_in_threadpool(blob_store.stats)
+    return JSONResponse(content={"success": True, "blobs": stats})
+
+
+def run_blob_migration(threads: List[Dict]) -> Dict[str, int]:
+    """Store threads one by one, skipping threads being scraped."""
+    scraping = {
+        parse_thread_name(job['thread_url'])
+        for job in db.list_jobs("running")
+    }
+    report = {"threads": 0, "files": 0, "linked": 0, "bytes_saved": 0}
+    for thread in threads:
+        if (
+            (thread['course_code'], thread['thread_name']) in scraping
+            or not os.path.isdir(thread['images_folder'])
+        ):
+            continue
+        result = blob_store.store_thread(thread['images_folder'])
+        report["threads"] += 1
+        for key in ("files", "linked", "bytes_saved"):
+            report[key] += result[key]
+    
+    collected = blob_store.collect()
+    report["blobs_removed"] = collected["blobs"]
+    return report
+
+
+def run_transcode(threads: List[Dict], image_format: str):
+    """
+    Transcode threads one by one, skipping threads being scraped.
+    transcode_status is only changed under transcode_lock, since the status
+    endpoint reads it concurrently.
+    """
+    try:
+        for thread in threads:
+            course_code = thread['course_code']
+            thread_name = thread['thread_name']
+            with transcode_lock:
+                report = transcode_status["courses"].setdefault(course_code, {
+                    "threads": 0,
+                    "files": 0,
+                    "bytes_before": 0,
+                    "bytes_after": 0,
+                    "bytes_saved": 0
+                })
+            
+            scraping = {
+                parse_thread_name(job['thread_url'])
+                for job in db.list_jobs("running")
+            }
+            if (course_code, thread_name) in scraping or not os.path.isdir(thread['images_folder']):
+                with transcode_lock:
+                    transcode_status["done"] += 1
+                continue
+            
+            result = transcode_thread(thread['images_folder'], image_format)
+            if result["files"]:
+                # Thumbnails are keyed by file name
+                image_cache.discard_tree(os.path.join(course_code, thread_name))
+                if blob_store:
+                    blob_store.store_thread(thread['images_folder'])
+            
+            with transcode_lock:
+                report["threads"] += 1
+                for key in ("files", "bytes_before", "bytes_after"):
+                    report[key] += result[key]
+                report["bytes_saved"] = report["bytes_before"] - report["bytes_after"]
+                transcode_status["done"] += 1
+        
+        # Blobs of the replaced files
+        if blob_store:
+            blob_store.collect()
+        with transcode_lock:
+            transcode_status["status"] = "completed"
+    except Exception as e:
+        with transcode_lock:
+            transcode_status["status"] = "error"
+            transcode_status["error"] = str(e)
+        print(f"Error transcoding archive: {e}")
+    finally:
+        with transcode_lock:
+            transcode_status["finished_at"] = datetime.now(timezone.utc).isoformat()
+
+
+# Progress of the background duplicate index run
+hash_index_status: Dict = {"status": "idle"}
+hash_index_lock = threading.Lock()
+
+
+def validate_max_distance(max_distance: int):
+    """Reject Hamming distances outside the hash length."""
+    if not 0 <= max_distance <= HASH_BITS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"max_distance must be between 0 and {HASH_BITS}"
+        )
+
+
+@app.post("/api/duplicates/index")
+async def start_hash_index(course_code: Optional[str] = None):
+    """Hash every image of a course (or the archive) into the duplicate index."""
+    threads = db.get_threads_by_course(course_code) if course_code else db.get_all_threads()
+    if course_code and not threads:
+        raise HTTPException(status_code=404, detail="Course not found")
+    
+    with hash_index_lock:
+        if hash_index_status["status"] == "running":
+            raise HTTPException(status_code=409, detail="Indexing is already running")
+        hash_index_status.clear()
+        hash_index_status.update(status="running", done=0, total=len(threads), images=0)
+    
+    threading.Thread(
+        target=run_hash_index, args=(threads,), name="hash-index", daemon=True
+    ).start()
+    
+    return JSONResponse(content={"success": True, "total": len(threads)})
+
+
+@app.get("/api/duplicates/index")
+async def get_hash_index_status():
+    """Progress of the last duplicate index run."""
+    with hash_index_lock:
+        status = dict(hash_index_status)
+    return JSONResponse(content={"success": True, "index": status})
+
+
+def run_hash_index(threads: List[Dict]):
+    """
+    Index threads one by one; only new or changed images are decoded.
+    hash_index_status is only changed under hash_index_lock.
+    """
+    try:
+        for thread in threads:
+            images = index_thread_hashes(
+                thread['course_code'], thread['thread_name'], thread['images_folder']
+            )
+            with hash_index_lock:
+                hash_index_status["images"] += images
+                hash_index_status["done"] += 1
+        with hash_index_lock:
+            hash_index_status["status"] = "completed"
+    except Exception as e:
+        with hash_index_lock:
+            hash_index_status["status"] = "error"
+            hash_index_status["error"] = str(e)
+        print(f"Error indexing image hashes: {e}")
+
+
+@app.get("/api/duplicates/image/{course_code}/{thread_name}/{filename}")
+async def get_image_duplicates(
+    course_code: str,
+    thread_name: str,
+    filename: str,
+    max_distance: int = MAX_INDEXED_DISTANCE
+):
+    """Near-duplicates of one image anywhere in the archive (dHash distance)."""
+    validate_max_distance(max_distance)
+    thread = db.get_thread(course_code, thread_name)
+    if not thread:
+        raise HTTPException(status_code=404, detail="Thread not found")
+    
+    rows = {row['filename']: row for row in db.get_image_hashes(course_code, thread_name)}
+    if filename not in rows:
+        # Not indexed yet (or changed): hash the thread first
+        await run_in_threadpool(
+            index_thread_hashes, course_code, thread_name, thread['images_folder']
+        )
+        rows = {row['filename']: row for row in db.get_image_hashes(course_code, thread_name)}
+    if filename not in rows:
+        raise HTTPException(status_code=404, detail="Image not found")
+    
+    value = from_signed(rows[filename]['dhash'])
+    matches = [
+        dict(match, url=f"/api/image/{match['course_code']}/{match['thread_name']}/{match['filename']}")
+        for match in await run_in_threadpool(find_similar_images, value, max_distance)
+        if (match['course_code'], match['thread_name'], match['filename'])
+        != (course_code, thread_name, filename)
+    ]
+    return JSONResponse(content={
+        "success": True,
+        "dhash": f"{value:016x}",
+        "matches": matches
+    })
+
+
+@app.get("/api/duplicates/thread/{course_code}/{thread_name}")
+async def get_thread_duplicates(
+    course_code: str,
+    thread_name: str,
+    max_distance: int = MAX_INDEXED_DISTANCE
+):
+    """Other threads containing near-duplicates of this thread's images."""
+    validate_max_distance(max_distance)
+    thread = db.get_thread(course_code, thread_name)
+    if not thread:
+        raise HTTPException(status_code=404, detail="Thread not found")
+    
+    await run_in_threadpool(
+        index_thread_hashes, course_code, thread_name, thread['images_folder']
+    )
+    threads = await run_in_threadpool(thread_duplicates, course_code, thread_name, max_distance)
+    return JSONResponse(content={"success": True, "threads": threads})
+
+
+@app.post("/api/duplicates/dedupe")
+async def dedupe_images(course_code: Optional[str] = None):
+    """
+    Store byte-identical copies of an image once in the blob store, using
+    the duplicate index to find them. Run /api/duplicates/index first for
+    older archives.
+    """
+    if not blob_store:
+        raise HTTPException(status_code=400, detail="Blob store is disabled")
+    report = await run_in_threadpool(dedupe_identical_images, blob_store, course_code)
+    return JSONResponse(content={"success": True, **report})
+
+
 @app.get("/favicon.ico")
 async def favicon():
     """Return favicon or 204 No Content to avoid 404 errors."""
@@ -363,13 +1433,15 @@ async def delete_thread(delete_request: DeleteThreadRequest):
         images_folder = os.path.join(
             "archive", "images", course_code, thread_name
         )
-        pdf_path = os.path.join(
-            "archive", "documents", course_code, f"{thread_name}.pdf"
-        )
         
         deleted_items = []
         errors = []
         
+        # Blobs shared with the thread's files, released once they are gone
+        blob_keys = set()
+        if blob_store and os.path.exists(images_folder):
+            blob_keys = blob_store.thread_keys(images_folder)
+        
         # Delete images folder with force deletion
         if os.path.exists(images_folder):
             try:
@@ -384,7 +1456,8 @@ async def delete_thread(delete_request: DeleteThreadRequest):
                     for name in files:
                         file_path = os.path.join(root, name)
                         try:
-                            os.chmod(file_path, stat.S_IWRITE)
+                            # Add write permission only: the file may be a shared blob link
+                            os.chmod(file_path, os.stat(file_path).st_mode | stat.S_IWRITE)
                             os.remove(file_path)
                         except Exception as fe:
                             print(f"Error deleting file {file_path}: {fe}")
@@ -404,8 +1477,12 @@ async def delete_thread(delete_request: DeleteThreadRequest):
                 errors.append(f"images folder: {str(e)}")
                 print(f"Error deleting images folder: {e}")
         
-        # Delete PDF
-        if os.path.exists(pdf_path):
+        # Delete PDF (and the variants of other profiles, including cached ones)
+        for profile in PDF_PROFILES:
+            pdf_cache.discard(os.path.join(course_code, pdf_filename(thread_name, profile)))
+            pdf_path = thread_pdf_path(course_code, thread_name, profile)
+            if not os.path.exists(pdf_path):
+                continue
             try:
                 os.remove(pdf_path)
                 deleted_items.append("PDF file")
@@ -414,6 +1491,27 @@ async def delete_thread(delete_request: DeleteThreadRequest):
                 errors.append(f"PDF file: {str(e)}")
                 print(f"Error deleting PDF: {e}")
         
+        # Delete the container of a packed thread
+        container = pack_path(images_folder)
+        if os.path.exists(container):
+            pack_readers.discard(container)
+            try:
+                os.remove(container)
+                deleted_items.append("image container")
+                print(f"Deleted image container: {container}")
+            except Exception as e:
+                errors.append(f"image container: {str(e)}")
+                print(f"Error deleting image container: {e}")
+        
+        # Delete blobs no other thread links to
+        if blob_keys:
+            released = blob_store.release(blob_keys)
+            if released["blobs"]:
+                deleted_items.append(f"{released['blobs']} unreferenced blob(s)")
+        
+        # Delete cached thumbnails
+        image_cache.discard_tree(os.path.join(course_code, thread_name))
+        
         # Delete from database
         try:
             if db.delete_thread(course_code, thread_name):
@@ -0,0 +1,154 @@
+"""Size-bounded on-disk cache with LRU eviction and single-flight builds."""
+import os
+import shutil
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+
+# A path handed out by get_or_build is not evicted for this long, so the
+# caller can still open it (e.g. a FileResponse sent after the return)
+LEASE_SECONDS = 60.0
+
+
+class DiskCache:
+    """
+    Generated files under `root`, keyed by relative path.
+    A missing or stale entry is built by the caller's build function; when
+    several requests ask for the same key at once, only the first builds it
+    and the others wait for that result. Once the cache holds more than
+    `max_bytes`, the least recently used files are removed. Use time is the
+    file's mtime, refreshed on every hit (atime is often disabled). The
+    cache folder is only scanned when the running total may be over budget.
+    Files handed out in the last LEASE_SECONDS are never evicted.
+    """
+
+    def __init__(self, root: str, max_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._key_locks: Dict[str, threading.Lock] = {}
+        self._leases: Dict[str, float] = {}
+        self._total: Optional[int] = None
+
+    def path(self, key: str) -> str:
+        """File path of a cache key."""
+        return os.path.join(self.root, key)
+
+    def _key_lock(self, key: str) -> threading.Lock:
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def _lease(self, path: str):
+        """Keep `path` from being evicted for LEASE_SECONDS."""
+        with self._lock:
+            self._leases[path] = time.monotonic() + LEASE_SECONDS
+
+    def get_or_build(
+        self,
+        key: str,
+        build: Callable[[str], None],
+        is_fresh: Optional[Callable[[str], bool]] = None
+    ) -> str:
+        """
+        Return the path of `key`, building it first if it is missing or
+        `is_fresh(path)` is false. build(tmp_path) must write the file to
+        tmp_path; it is moved into place only when complete.
+        """
+        path = self.path(key)
+        with self._key_lock(key):
+            # Leased before the existence check: evict() either skips the
+            # file or has already removed it (and it is rebuilt here)
+            self._lease(path)
+            if os.path.exists(path) and (is_fresh is None or is_fresh(path)):
+                self.touch(path)
+                return path
+
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.part"
+            try:
+                build(tmp_path)
+                self._lease(path)  # renewed after a long build
+                os.replace(tmp_path, path)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+
+        with self._lock:
+            if self._total is not None:
+                self._total += os.path.getsize(path)
+            over_budget = self._total is None or self._total > self.max_bytes
+        if over_budget:
+            self.evict()
+        return path
+
+    def touch(self, path: str):
+        """Mark a cached file as just used."""
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+
+    def discard(self, key: str) -> bool:
+        """Remove a cached file. Returns: True if it existed."""
+        path = self.path(key)
+        with self._key_lock(key):
+            if not os.path.exists(path):
+                return False
+            os.remove(path)
+        with self._lock:
+            self._total = None
+        return True
+
+    def discard_tree(self, prefix: str):
+        """Remove every cached file under a key prefix (a folder)."""
+        shutil.rmtree(self.path(prefix), ignore_errors=True)
+        with self._lock:
+            self._total = None
+
+    def size(self) -> int:
+        """Total bytes of cached files."""
+        return sum(size for _, _, size in self._entries())
+
+    def _entries(self):
+        """(mtime, path, size) of every complete cached file."""
+        entries = []
+        for folder, _, files in os.walk(self.root):
+            for name in files:
+                if name.endswith(".part"):
+                    continue
+                path = os.path.join(folder, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, path, stat.st_size))
+        return entries
+
+    def evict(self) -> int:
+        """
+        Remove least recently used files until the cache fits in max_bytes.
+        Leased files (handed out recently, e.g. the file just built) are
+        kept; the choice and removal happen under the lock that leases take.
+        Returns: number of files removed
+        """
+        entries = sorted(self._entries())
+        total = sum(size for _, _, size in entries)
+        removed = 0
+        with self._lock:
+            now = time.monotonic()
+            self._leases = {path: end for path, end in self._leases.items() if end > now}
+            for _, path, size in entries:
+                if total <= self.max_bytes:
+                    break
+                if path in self._leases:
+                    continue
+                try:
+                    os.remove(path)
+                except OSError as e:
+                    print(f"Error evicting {path}: {e}")
+                    continue
+                total -= size
+                removed += 1
+            self._total = total
+        return removed
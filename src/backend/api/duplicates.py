@@ -0,0 +1,130 @@
+"""Near-duplicate image lookup and exact-copy dedupe over the dHash index."""
+import os
+from itertools import groupby
+from typing import Dict, List, Optional
+
+from database.database import db
+from scraper.blob_store import BlobStore
+from scraper.phash import (
+    MAX_INDEXED_DISTANCE,
+    band_probes,
+    from_signed,
+    hamming,
+    hash_bands,
+    hash_folder,
+    to_signed
+)
+
+
+def archive_image_path(course_code: str, thread_name: str, filename: str) -> str:
+    """Path of an archived image."""
+    return os.path.join("archive", "images", course_code, thread_name, filename)
+
+
+def index_thread_hashes(course_code: str, thread_name: str, images_folder: str) -> int:
+    """
+    Hash a thread's images into the index; unchanged files keep their hash.
+    Returns: number of images indexed
+    """
+    known = {
+        row["filename"]: dict(row, dhash=from_signed(row["dhash"]))
+        for row in db.get_image_hashes(course_code, thread_name)
+    }
+    rows = hash_folder(images_folder, known) if os.path.isdir(images_folder) else []
+    for row in rows:
+        for band, value in enumerate(hash_bands(row["dhash"])):
+            row[f"band{band}"] = value
+        row["dhash"] = to_signed(row["dhash"])
+    db.replace_image_hashes(course_code, thread_name, rows)
+    return len(rows)
+
+
+def find_similar_images(
+    value: int,
+    max_distance: int,
+    distinct: Optional[List[int]] = None
+) -> List[Dict]:
+    """
+    Indexed images within `max_distance` bits of a hash, nearest first.
+    Up to MAX_INDEXED_DISTANCE the band indexes give the candidates;
+    beyond it every distinct hash is compared (`distinct`, when given, is
+    that list already read from the database).
+    """
+    if max_distance <= MAX_INDEXED_DISTANCE:
+        candidates = db.find_hash_candidates(band_probes(value, max_distance))
+    else:
+        if distinct is None:
+            distinct = db.get_distinct_hashes()
+        candidates = db.get_hashes_by_value([
+            stored for stored in distinct
+            if hamming(value, from_signed(stored)) <= max_distance
+        ])
+
+    matches = []
+    for row in candidates:
+        distance = hamming(value, from_signed(row["dhash"]))
+        if distance <= max_distance:
+            matches.append({
+                "course_code": row["course_code"],
+                "thread_name": row["thread_name"],
+                "filename": row["filename"],
+                "distance": distance
+            })
+    matches.sort(key=lambda m: (m["distance"], m["course_code"], m["thread_name"], m["filename"]))
+    return matches
+
+
+def thread_duplicates(course_code: str, thread_name: str, max_distance: int) -> List[Dict]:
+    """
+    Other threads holding near-duplicates of this thread's images, with
+    the matching image pairs; threads sharing the most images first.
+    """
+    threads: Dict[tuple, Dict] = {}
+    distinct = db.get_distinct_hashes() if max_distance > MAX_INDEXED_DISTANCE else None
+    for row in db.get_image_hashes(course_code, thread_name):
+        for match in find_similar_images(from_signed(row["dhash"]), max_distance, distinct):
+            key = (match["course_code"], match["thread_name"])
+            if key == (course_code, thread_name):
+                continue
+            entry = threads.setdefault(key, {
+                "course_code": match["course_code"],
+                "thread_name": match["thread_name"],
+                "images": []
+            })
+            entry["images"].append({
+                "filename": row["filename"],
+                "match_filename": match["filename"],
+                "distance": match["distance"]
+            })
+
+    results = list(threads.values())
+    for entry in results:
+        entry["matches"] = len({image["filename"] for image in entry["images"]})
+    results.sort(key=lambda entry: (-entry["matches"], entry["course_code"], entry["thread_name"]))
+    return results
+
+
+def dedupe_identical_images(blob_store: BlobStore, course_code: Optional[str] = None) -> Dict[str, int]:
+    """
+    Share byte-identical copies through the blob store. Only images whose
+    hash occurs more than once are candidates, so this is cheaper than
+    storing the whole archive; the blob store confirms copies by SHA-256.
+    Returns: {'groups': ..., 'files': ..., 'linked': ..., 'bytes_saved': ...}
+    """
+    report = {"groups": 0, "files": 0, "linked": 0, "bytes_saved": 0}
+    rows = db.get_repeated_hashes(course_code)
+    for _, group in groupby(rows, key=lambda row: row["dhash"]):
+        paths = [
+            path for path in (
+                archive_image_path(row["course_code"], row["thread_name"], row["filename"])
+                for row in group
+            )
+            if os.path.exists(path)
+        ]
+        if len(paths) < 2:
+            continue
+        report["groups"] += 1
+        result = blob_store.store_files(paths)
+        for key in ("files", "linked", "bytes_saved"):
+            report[key] += result[key]
+    return report
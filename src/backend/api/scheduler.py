@@ -0,0 +1,92 @@
+"""Scrape job scheduler backed by the persistent SQLite queue."""
+import threading
+from typing import Callable, Dict, List, Tuple
+from urllib.parse import urlsplit, urlunsplit
+
+from database.database import db
+
+
+def normalize_thread_url(url: str) -> str:
+    """Canonical form of a thread URL used to deduplicate jobs."""
+    parts = urlsplit(url.strip())
+    path = parts.path if parts.path.endswith("/") else f"{parts.path}/"
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, "", ""))
+
+
+class JobScheduler:
+    """
+    Run queued scrape jobs on a fixed number of worker threads.
+    Jobs are stored in the scrape_jobs table, so queued work survives a
+    restart. Higher priority jobs run first, then oldest first.
+    """
+
+    def __init__(
+        self,
+        runner: Callable[[Dict], None],
+        workers: int = 2,
+        poll_interval: float = 2.0
+    ):
+        self.runner = runner
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self._threads: List[threading.Thread] = []
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+
+    def start(self):
+        """Requeue interrupted jobs and start the worker threads."""
+        requeued = db.requeue_running_jobs()
+        if requeued:
+            print(f"↩️  Requeued {requeued} interrupted scrape job(s)")
+
+        self._stopping.clear()
+        for i in range(self.workers):
+            thread = threading.Thread(
+                target=self._work, name=f"scrape-worker-{i + 1}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        """Ask workers to exit once their current job finishes."""
+        self._stopping.set()
+        self._wakeup.set()
+
+    def submit(
+        self,
+        task_id: str,
+        url: str,
+        settings: Dict,
+        priority: int = 0
+    ) -> Tuple[Dict, bool]:
+        """
+        Queue a job for a thread URL.
+        Returns (job, created); created is False when the URL is already
+        queued or running.
+        """
+        job, created = db.enqueue_job(
+            task_id, normalize_thread_url(url), settings, priority
+        )
+        if created:
+            self._wakeup.set()
+        return job, created
+
+    def _work(self):
+        """Worker loop: claim the next job, run it, repeat."""
+        while not self._stopping.is_set():
+            try:
+                job = db.claim_next_job()
+            except Exception as e:
+                print(f"Error claiming scrape job: {e}")
+                job = None
+
+            if job is None:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+                continue
+
+            try:
+                self.runner(job)
+            except Exception as e:
+                print(f"Error running scrape job {job['task_id']}: {e}")
+                db.finish_job(job["id"], "error", error=str(e))
@@ -2,13 +2,34 @@
 
 import sqlite3
 import os
-from typing import List, Dict, Optional
+import json
+from typing import List, Dict, Optional, Tuple
 from datetime import datetime
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+# Band columns of image_hashes (scraper.phash.BANDS)
+HASH_BAND_COLUMNS = tuple(f"band{band}" for band in range(4))
+
+# Derived tables recreated empty when their layout changed: table ->
+# column only an old layout has (image_hashes briefly had 8 bands of 8 bits)
+REBUILT_TABLES = {
+    "image_hashes": "band7",
+}
+
+# Tries to queue a job while the URL's previous job keeps finishing
+ENQUEUE_ATTEMPTS = 3
+
+# Columns added after a table was first released: table -> {column: definition}
+COLUMN_MIGRATIONS = {
+    "scraped_threads": {
+        "fingerprint": "TEXT",
+        "pdf_profile": "TEXT DEFAULT 'archival'",
+    },
+}
+
 
 class Database:
     """SQLite database manager for scraped threads."""
@@ -34,11 +55,32 @@ class Database:
         # Execute schema
         conn = self.get_connection()
         try:
+            self._migrate(conn)
             conn.executescript(schema)
             conn.commit()
         finally:
             conn.close()
 
+    def _migrate(self, conn: sqlite3.Connection):
+        """
+        Add columns missing from tables created by an older schema, and drop
+        derived tables with an old layout (the schema recreates them).
+        """
+        for table, column in REBUILT_TABLES.items():
+            existing = {row["name"] for row in conn.execute(f"PRAGMA table_info({table})")}
+            if column in existing:
+                conn.execute(f"DROP TABLE {table}")
+                print(f"Dropped outdated table {table}; it is rebuilt on demand")
+        for table, columns in COLUMN_MIGRATIONS.items():
+            existing = {row["name"] for row in conn.execute(f"PRAGMA table_info({table})")}
+            if not existing:
+                # Table does not exist yet; the schema creates it complete
+                continue
+            for column, definition in columns.items():
+                if column not in existing:
+                    conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+        conn.commit()
+
     def get_connection(self) -> sqlite3.Connection:
         """Get database connection."""
         conn = sqlite3.connect(self.db_path)
@@ -53,6 +95,8 @@ class Database:
         images_folder: str,
         image_count: int,
         thread_url: Optional[str] = None,
+        fingerprint: Optional[str] = None,
+        pdf_profile: str = "archival",
     ) -> int:
         """Add or update a scraped thread."""
         conn = self.get_connection()
@@ -60,13 +104,15 @@ class Database:
             cursor = conn.execute(
                 """
                 INSERT INTO scraped_threads 
-                (course_code, thread_name, thread_url, pdf_path, images_folder, image_count)
-                VALUES (?, ?, ?, ?, ?, ?)
+                (course_code, thread_name, thread_url, pdf_path, images_folder, image_count, fingerprint, pdf_profile)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
                 ON CONFLICT(course_code, thread_name) 
                 DO UPDATE SET
                     pdf_path = excluded.pdf_path,
                     images_folder = excluded.images_folder,
                     image_count = excluded.image_count,
+                    fingerprint = excluded.fingerprint,
+                    pdf_profile = excluded.pdf_profile,
                     scraped_at = CURRENT_TIMESTAMP
                 """,
                 (
@@ -76,6 +122,8 @@ class Database:
                     pdf_path,
                     images_folder,
                     image_count,
+                    fingerprint,
+                    pdf_profile,
                 ),
             )
             conn.commit()
@@ -175,11 +223,344 @@ class Database:
                 """,
                 (course_code, thread_name),
             )
+            conn.execute(
+                "DELETE FROM image_hashes WHERE course_code = ? AND thread_name = ?",
+                (course_code, thread_name),
+            )
             conn.commit()
             return cursor.rowcount > 0
         finally:
             conn.close()
 
+    def enqueue_job(
+        self,
+        task_id: str,
+        thread_url: str,
+        settings: Dict,
+        priority: int = 0,
+    ) -> Tuple[Dict, bool]:
+        """
+        Queue a scrape job.
+        Returns (job, created); if the URL already has a queued or running
+        job, that job is returned with created=False.
+        """
+        conn = self.get_connection()
+        try:
+            # The conflicting job can finish between the INSERT and the
+            # SELECT; the INSERT is then tried again
+            for _ in range(ENQUEUE_ATTEMPTS):
+                try:
+                    cursor = conn.execute(
+                        """
+                        INSERT INTO scrape_jobs (task_id, thread_url, priority, settings)
+                        VALUES (?, ?, ?, ?)
+                        """,
+                        (task_id, thread_url, priority, json.dumps(settings)),
+                    )
+                    conn.commit()
+                    job_id, created = cursor.lastrowid, True
+                    break
+                except sqlite3.IntegrityError:
+                    row = conn.execute(
+                        """
+                        SELECT id FROM scrape_jobs
+                        WHERE thread_url = ? AND status IN ('queued', 'running')
+                        """,
+                        (thread_url,),
+                    ).fetchone()
+                    if row:
+                        job_id, created = row["id"], False
+                        break
+            else:
+                raise RuntimeError(f"Could not queue a scrape job for {thread_url}")
+
+            row = conn.execute(
+                "SELECT * FROM scrape_jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+            return self._job_from_row(row), created
+        finally:
+            conn.close()
+
+    def claim_next_job(self) -> Optional[Dict]:
+        """Atomically mark the highest-priority queued job as running and return it."""
+        conn = self.get_connection()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                """
+                SELECT * FROM scrape_jobs
+                WHERE status = 'queued'
+                ORDER BY priority DESC, id
+                LIMIT 1
+                """
+            ).fetchone()
+            if row is None:
+                conn.rollback()
+                return None
+
+            conn.execute(
+                """
+                UPDATE scrape_jobs
+                SET status = 'running', started_at = CURRENT_TIMESTAMP
+                WHERE id = ?
+                """,
+                (row["id"],),
+            )
+            conn.commit()
+
+            job = self._job_from_row(row)
+            job["status"] = "running"
+            return job
+        finally:
+            conn.close()
+
+    def finish_job(
+        self,
+        job_id: int,
+        status: str,
+        result: Optional[Dict] = None,
+        error: Optional[str] = None,
+    ):
+        """Record the outcome of a job ('completed' or 'error')."""
+        conn = self.get_connection()
+        try:
+            conn.execute(
+                """
+                UPDATE scrape_jobs
+                SET status = ?, result = ?, error = ?, finished_at = CURRENT_TIMESTAMP
+                WHERE id = ?
+                """,
+                (status, json.dumps(result) if result is not None else None, error, job_id),
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+    def get_job(self, task_id: str) -> Optional[Dict]:
+        """Get the most recent job for a task ID."""
+        conn = self.get_connection()
+        try:
+            row = conn.execute(
+                """
+                SELECT * FROM scrape_jobs
+                WHERE task_id = ?
+                ORDER BY id DESC
+                LIMIT 1
+                """,
+                (task_id,),
+            ).fetchone()
+            return self._job_from_row(row) if row else None
+        finally:
+            conn.close()
+
+    def list_jobs(self, status: Optional[str] = None, limit: int = 100) -> List[Dict]:
+        """List jobs, newest first, optionally filtered by status."""
+        conn = self.get_connection()
+        try:
+            if status:
+                cursor = conn.execute(
+                    """
+                    SELECT * FROM scrape_jobs
+                    WHERE status = ?
+                    ORDER BY id DESC
+                    LIMIT ?
+                    """,
+                    (status, limit),
+                )
+            else:
+                cursor = conn.execute(
+                    "SELECT * FROM scrape_jobs ORDER BY id DESC LIMIT ?",
+                    (limit,),
+                )
+            return [self._job_from_row(row) for row in cursor.fetchall()]
+        finally:
+            conn.close()
+
+    def requeue_running_jobs(self) -> int:
+        """Put jobs interrupted by a shutdown back in the queue."""
+        conn = self.get_connection()
+        try:
+            cursor = conn.execute(
+                """
+                UPDATE scrape_jobs
+                SET status = 'queued', started_at = NULL
+                WHERE status = 'running'
+                """
+            )
+            conn.commit()
+            return cursor.rowcount
+        finally:
+            conn.close()
+
+    def create_batch(
+        self,
+        batch_id: str,
+        source: str,
+        job_ids: List[int],
+        skipped: List[Dict],
+    ):
+        """Record a bulk scrape batch and the jobs it tracks."""
+        conn = self.get_connection()
+        try:
+            conn.execute(
+                "INSERT INTO scrape_batches (id, source, skipped) VALUES (?, ?, ?)",
+                (batch_id, source, json.dumps(skipped)),
+            )
+            conn.executemany(
+                """
+                INSERT OR IGNORE INTO batch_jobs (batch_id, job_id, position)
+                VALUES (?, ?, ?)
+                """,
+                [(batch_id, job_id, position) for position, job_id in enumerate(job_ids)],
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+    def get_batch(self, batch_id: str) -> Optional[Dict]:
+        """Get a batch with its jobs in submission order."""
+        conn = self.get_connection()
+        try:
+            row = conn.execute(
+                "SELECT * FROM scrape_batches WHERE id = ?", (batch_id,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            batch = dict(row)
+            batch["skipped"] = json.loads(batch["skipped"]) if batch["skipped"] else []
+            cursor = conn.execute(
+                """
+                SELECT scrape_jobs.* FROM batch_jobs
+                JOIN scrape_jobs ON scrape_jobs.id = batch_jobs.job_id
+                WHERE batch_jobs.batch_id = ?
+                ORDER BY batch_jobs.position
+                """,
+                (batch_id,),
+            )
+            batch["jobs"] = [self._job_from_row(r) for r in cursor.fetchall()]
+            return batch
+        finally:
+            conn.close()
+
+    def replace_image_hashes(self, course_code: str, thread_name: str, rows: List[Dict]):
+        """
+        Replace the stored image hashes of a thread.
+        Rows carry filename, dhash, the band columns, file_size and file_mtime.
+        """
+        columns = ("filename", "dhash") + HASH_BAND_COLUMNS + ("file_size", "file_mtime")
+        conn = self.get_connection()
+        try:
+            conn.execute(
+                "DELETE FROM image_hashes WHERE course_code = ? AND thread_name = ?",
+                (course_code, thread_name),
+            )
+            conn.executemany(
+                f"""
+                INSERT INTO image_hashes (course_code, thread_name, {", ".join(columns)})
+                VALUES ({", ".join("?" * (len(columns) + 2))})
+                """,
+                [
+                    (course_code, thread_name) + tuple(row[column] for column in columns)
+                    for row in rows
+                ],
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+    def get_image_hashes(self, course_code: str, thread_name: str) -> List[Dict]:
+        """Stored image hashes of a thread."""
+        conn = self.get_connection()
+        try:
+            cursor = conn.execute(
+                """
+                SELECT * FROM image_hashes
+                WHERE course_code = ? AND thread_name = ?
+                """,
+                (course_code, thread_name),
+            )
+            return [dict(row) for row in cursor.fetchall()]
+        finally:
+            conn.close()
+
+    def find_hash_candidates(self, probes: List[List[int]]) -> List[Dict]:
+        """
+        Image hashes with a band equal to one of its probe values
+        (`probes` lists the values for each band column, in order).
+        """
+        conn = self.get_connection()
+        try:
+            cursor = conn.execute(
+                "SELECT * FROM image_hashes WHERE "
+                + " OR ".join(
+                    f"{column} IN ({', '.join('?' * len(values))})"
+                    for column, values in zip(HASH_BAND_COLUMNS, probes)
+                ),
+                tuple(value for values in probes for value in values),
+            )
+            return [dict(row) for row in cursor.fetchall()]
+        finally:
+            conn.close()
+
+    def get_distinct_hashes(self) -> List[int]:
+        """Every distinct stored hash (read from the dhash index alone)."""
+        conn = self.get_connection()
+        try:
+            cursor = conn.execute("SELECT DISTINCT dhash FROM image_hashes")
+            return [row["dhash"] for row in cursor.fetchall()]
+        finally:
+            conn.close()
+
+    def get_hashes_by_value(self, values: List[int]) -> List[Dict]:
+        """Image hashes equal to any of `values` (stored signed values)."""
+        conn = self.get_connection()
+        try:
+            rows = []
+            # Stay under SQLite's bound-variable limit
+            for start in range(0, len(values), 500):
+                chunk = values[start:start + 500]
+                cursor = conn.execute(
+                    f"SELECT * FROM image_hashes WHERE dhash IN ({', '.join('?' * len(chunk))})",
+                    tuple(chunk),
+                )
+                rows.extend(dict(row) for row in cursor.fetchall())
+            return rows
+        finally:
+            conn.close()
+
+    def get_repeated_hashes(self, course_code: Optional[str] = None) -> List[Dict]:
+        """
+        Image hashes that occur more than once, ordered by hash.
+        With `course_code`, only hashes with a copy in that course.
+        """
+        conn = self.get_connection()
+        try:
+            query = """
+                SELECT * FROM image_hashes
+                WHERE dhash IN (
+                    SELECT dhash FROM image_hashes GROUP BY dhash HAVING COUNT(*) > 1
+                )
+            """
+            params: Tuple = ()
+            if course_code:
+                query += """
+                AND dhash IN (SELECT dhash FROM image_hashes WHERE course_code = ?)
+                """
+                params = (course_code,)
+            cursor = conn.execute(query + " ORDER BY dhash, course_code, thread_name, filename", params)
+            return [dict(row) for row in cursor.fetchall()]
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _job_from_row(row: sqlite3.Row) -> Dict:
+        """Convert a scrape_jobs row to a dict with JSON columns decoded."""
+        job = dict(row)
+        for key in ("settings", "result"):
+            job[key] = json.loads(job[key]) if job[key] else None
+        return job
+
     def sync_from_archive(self):
         """Sync existing archive data to database."""
         images_dir = "archive/images"
@@ -189,6 +570,8 @@ class Database:
             return
         
         synced_count = 0
+        from scraper.pack import PackReader, is_packed
+        from scraper.utils import get_image_files
         
         # Scan all course codes in archive/images
         for course_code in os.listdir(images_dir):
@@ -196,10 +579,16 @@ class Database:
             if not os.path.isdir(course_path):
                 continue
             
-            # Scan all thread folders in this course
+            # Scan all thread folders (and packed thread containers) in this course
             for thread_name in os.listdir(course_path):
                 thread_path = os.path.join(course_path, thread_name)
-                if not os.path.isdir(thread_path):
+                packed = thread_name.endswith(".pack") and os.path.isfile(thread_path)
+                if packed:
+                    thread_name = thread_name[:-len(".pack")]
+                    thread_path = thread_path[:-len(".pack")]
+                    if not is_packed(thread_path):
+                        continue  # the thread folder holds the images
+                elif not os.path.isdir(thread_path) or is_packed(thread_path):
                     continue
                 
                 # Check if already in database
@@ -208,11 +597,16 @@ class Database:
                     continue
                 
                 # Count images
-                image_files = [
-                    f for f in os.listdir(thread_path)
-                    if f.lower().endswith(('.jpg', '.jpeg', '.png', '.gif'))
-                ]
-                image_count = len(image_files)
+                if packed:
+                    try:
+                        reader = PackReader(f"{thread_path}.pack")
+                    except (OSError, ValueError) as e:
+                        print(f"✗ Failed to sync {course_code}/{thread_name}: {e}")
+                        continue
+                    image_count = len(reader.names())
+                    reader.close()
+                else:
+                    image_count = len(get_image_files(thread_path))
                 
                 # Check for PDF
                 pdf_path = os.path.join(documents_dir, course_code, f"{thread_name}.pdf")
@@ -8,6 +8,8 @@ CREATE TABLE IF NOT EXISTS scraped_threads (
     pdf_path TEXT,
     images_folder TEXT NOT NULL,
     image_count INTEGER DEFAULT 0,
+    fingerprint TEXT,
+    pdf_profile TEXT DEFAULT 'archival',
     scraped_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     UNIQUE(course_code, thread_name)
 );
@@ -16,3 +18,63 @@ CREATE TABLE IF NOT EXISTS scraped_threads (
 CREATE INDEX IF NOT EXISTS idx_course_code ON scraped_threads(course_code);
 CREATE INDEX IF NOT EXISTS idx_thread_name ON scraped_threads(thread_name);
 CREATE INDEX IF NOT EXISTS idx_scraped_at ON scraped_threads(scraped_at DESC);
+
+-- Persistent scrape job queue
+CREATE TABLE IF NOT EXISTS scrape_jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    task_id TEXT NOT NULL,
+    thread_url TEXT NOT NULL,
+    priority INTEGER DEFAULT 0,
+    status TEXT NOT NULL DEFAULT 'queued',
+    settings TEXT,
+    result TEXT,
+    error TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    started_at TIMESTAMP,
+    finished_at TIMESTAMP
+);
+
+-- Only one queued or running job per thread URL
+CREATE UNIQUE INDEX IF NOT EXISTS idx_jobs_active_url
+    ON scrape_jobs(thread_url) WHERE status IN ('queued', 'running');
+CREATE INDEX IF NOT EXISTS idx_jobs_queue ON scrape_jobs(status, priority DESC, id);
+CREATE INDEX IF NOT EXISTS idx_jobs_task_id ON scrape_jobs(task_id);
+
+-- Bulk scrape batches and the jobs they track
+CREATE TABLE IF NOT EXISTS scrape_batches (
+    id TEXT PRIMARY KEY,
+    source TEXT,
+    skipped TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS batch_jobs (
+    batch_id TEXT NOT NULL,
+    job_id INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (batch_id, job_id)
+);
+
+-- Perceptual hashes (64-bit dHash) of archived images. The hash is also
+-- split into four 16-bit bands; hashes within Hamming distance 7 have a
+-- band at most 1 bit apart, so neighbour lookups probe the band indexes
+-- (see scraper/phash.py).
+CREATE TABLE IF NOT EXISTS image_hashes (
+    course_code TEXT NOT NULL,
+    thread_name TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    dhash INTEGER NOT NULL,
+    band0 INTEGER NOT NULL,
+    band1 INTEGER NOT NULL,
+    band2 INTEGER NOT NULL,
+    band3 INTEGER NOT NULL,
+    file_size INTEGER,
+    file_mtime REAL,
+    PRIMARY KEY (course_code, thread_name, filename)
+);
+
+CREATE INDEX IF NOT EXISTS idx_hash_band0 ON image_hashes(band0);
+CREATE INDEX IF NOT EXISTS idx_hash_band1 ON image_hashes(band1);
+CREATE INDEX IF NOT EXISTS idx_hash_band2 ON image_hashes(band2);
+CREATE INDEX IF NOT EXISTS idx_hash_band3 ON image_hashes(band3);
+CREATE INDEX IF NOT EXISTS idx_hash_dhash ON image_hashes(dhash);
@@ -1,5 +1,7 @@
 """Init file for scraper package."""
 from .fuo_scraper import FUOScraper
+from .http_scraper import HTTPScraper
+from .backends import SCRAPER_BACKENDS, create_scraper
 from .utils import (
     get_all_courses,
     get_thread_images,
@@ -10,6 +12,9 @@ from .utils import (
 
 __all__ = [
     'FUOScraper',
+    'HTTPScraper',
+    'SCRAPER_BACKENDS',
+    'create_scraper',
     'get_all_courses',
     'get_thread_images',
     'get_pdf_path',
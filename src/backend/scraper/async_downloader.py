@@ -0,0 +1,185 @@
+"""Asyncio download engine with bounded concurrency and per-host rate limits."""
+import os
+import asyncio
+import aiohttp
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+from yarl import URL
+
+from .downloader import guess_extension, remove_stale_files
+
+
+class TokenBucket:
+    """
+    Token bucket rate limiter.
+    Allows `rate` requests per second on average with bursts of up to `capacity`.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError("Rate must be positive")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self.tokens = self.capacity
+        self.updated_at = None
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Wait until a token is available and take it."""
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            while True:
+                now = loop.time()
+                if self.updated_at is not None:
+                    elapsed = now - self.updated_at
+                    self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+                self.updated_at = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class AsyncDownloader:
+    """Download many attachments concurrently inside one asyncio event loop."""
+
+    def __init__(
+        self,
+        cookies: Optional[Dict[str, str]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        concurrency: int = 8,
+        rate_limits: Optional[Dict[str, float]] = None,
+        timeout: int = 30,
+        cookie_url: Optional[str] = None
+    ):
+        """
+        rate_limits maps a host name to requests per second; the limit also
+        applies to its subdomains. Hosts without an entry are not throttled.
+        Cookies are only sent to the host of `cookie_url` (the forum), not to
+        external image hosts or redirect targets; without it none are sent.
+        """
+        self.cookies = cookies or {}
+        self.cookie_url = cookie_url
+        self.headers = headers or {}
+        self.concurrency = concurrency
+        self.rate_limits = rate_limits or {}
+        self.timeout = timeout
+        self._buckets: Dict[str, TokenBucket] = {}
+
+    def _bucket_for(self, url: str) -> Optional[TokenBucket]:
+        """Return the rate limiter for the URL's host, if any."""
+        host = (urlparse(url).hostname or '').lower()
+        for limited_host, rate in self.rate_limits.items():
+            if host == limited_host or host.endswith(f".{limited_host}"):
+                if limited_host not in self._buckets:
+                    self._buckets[limited_host] = TokenBucket(rate)
+                return self._buckets[limited_host]
+        return None
+
+    async def _download(
+        self,
+        session: aiohttp.ClientSession,
+        semaphore: asyncio.Semaphore,
+        url: str,
+        images_folder: str,
+        index: int
+    ) -> str:
+        """Download one attachment and write it to disk as soon as it arrives."""
+        async with semaphore:
+            bucket = self._bucket_for(url)
+            if bucket:
+                await bucket.acquire()
+
+            async with session.get(url) as response:
+                response.raise_for_status()
+                data = await response.read()
+                ext = guess_extension(response.headers, str(response.url))
+
+        img_path = os.path.join(images_folder, f"{index}{ext}")
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, _write_file, img_path, data)
+        remove_stale_files(images_folder, index, img_path)
+        return img_path
+
+    async def download_all(
+        self,
+        items: List[Tuple[int, str]],
+        images_folder: str,
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+        item_callback: Optional[Callable[[int, Optional[str]], None]] = None
+    ) -> List[Optional[str]]:
+        """
+        Download (index, url) items concurrently.
+        item_callback(index, path) is called as each item finishes (path
+        None on failure). Returns saved paths in the order of items (None
+        for failures).
+        """
+        total = len(items)
+        paths: List[Optional[str]] = [None] * total
+        completed = 0
+
+        # Limiters are bound to the running event loop
+        self._buckets = {}
+        semaphore = asyncio.Semaphore(self.concurrency)
+        connector = aiohttp.TCPConnector(limit=self.concurrency)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        jar = aiohttp.CookieJar(unsafe=True)
+        if self.cookie_url:
+            jar.update_cookies(self.cookies, response_url=URL(self.cookie_url))
+
+        async with aiohttp.ClientSession(
+            connector=connector,
+            timeout=timeout,
+            cookie_jar=jar,
+            headers=self.headers
+        ) as session:
+
+            async def fetch(position: int, idx: int, img_url: str):
+                try:
+                    return position, await self._download(
+                        session, semaphore, img_url, images_folder, idx
+                    ), None
+                except Exception as e:
+                    return position, None, e
+
+            tasks = [
+                asyncio.ensure_future(fetch(position, idx, img_url))
+                for position, (idx, img_url) in enumerate(items)
+            ]
+
+            for next_done in asyncio.as_completed(tasks):
+                position, img_path, error = await next_done
+                completed += 1
+                if error is not None:
+                    print(f"Error downloading image {items[position][0]}: {error}")
+                else:
+                    paths[position] = img_path
+
+                if item_callback:
+                    item_callback(items[position][0], paths[position])
+                if progress_callback:
+                    progress_callback(completed, total)
+
+        return paths
+
+    def run(
+        self,
+        items: List[Tuple[int, str]],
+        images_folder: str,
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+        item_callback: Optional[Callable[[int, Optional[str]], None]] = None
+    ) -> List[Optional[str]]:
+        """Run download_all in a fresh event loop (for synchronous callers)."""
+        return asyncio.run(
+            self.download_all(items, images_folder, progress_callback, item_callback)
+        )
+
+
+def _write_file(path: str, data: bytes):
+    """Write a file under a temporary name and rename it when complete."""
+    tmp_path = f"{path}.part"
+    with open(tmp_path, "wb") as output_file:
+        output_file.write(data)
+    os.replace(tmp_path, path)
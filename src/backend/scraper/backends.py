@@ -0,0 +1,17 @@
+"""Scraper backend selection."""
+from .fuo_scraper import FUOScraper
+from .http_scraper import HTTPScraper
+
+
+# Backend name -> scraper class
+SCRAPER_BACKENDS = {
+    "selenium": FUOScraper,
+    "http": HTTPScraper,
+}
+
+
+def create_scraper(backend: str, username: str, password: str, **kwargs) -> FUOScraper:
+    """Create a scraper for the named backend ('selenium' or 'http')."""
+    if backend not in SCRAPER_BACKENDS:
+        raise ValueError(f"Unknown scraper backend: {backend}")
+    return SCRAPER_BACKENDS[backend](username, password, **kwargs)
@@ -0,0 +1,167 @@
+"""Content-addressed store of archived image files, shared through hard links."""
+import os
+import threading
+from typing import Dict, Iterable, List, Optional, Set
+
+from .manifest import ThreadManifest, file_sha256
+from .utils import get_image_files
+
+
+class BlobStore:
+    """
+    Every distinct image is kept once, as archive/blobs/{ab}/{sha256}.
+    Thread folders keep their ordered file names ({n}.png, indexed by the
+    thread manifest, whose `sha256` is the blob key) as hard links to the
+    blobs, so the PDF builder, viewer and downloads read them as before.
+    The file system's link count is the reference count: a blob with a
+    single link is referenced by no thread and can be removed.
+    Archive files must only ever be replaced (os.replace), never rewritten
+    in place, since a write through one link changes every thread's copy.
+    """
+
+    def __init__(self, folder: str = None):
+        if folder is None:
+            folder = os.getenv("BLOB_DIR", os.path.join("archive", "blobs"))
+        self.folder = folder
+        self._lock = threading.Lock()
+
+    def blob_path(self, sha256: str) -> str:
+        """Blob file for a content hash."""
+        return os.path.join(self.folder, sha256[:2], sha256)
+
+    def add(self, path: str, sha256: Optional[str] = None) -> int:
+        """
+        Share an archive file through the store. An existing blob with the
+        same content replaces the file (atomically); otherwise the file
+        becomes the blob. The shared inode takes the newer of the two
+        mtimes, so a newly added page never looks older than the PDFs of
+        its thread (see is_pdf_current).
+        Returns: bytes saved (0 if the file was not a duplicate)
+        """
+        sha256 = sha256 or file_sha256(path)
+        blob = self.blob_path(sha256)
+        with self._lock:
+            if not os.path.exists(blob):
+                os.makedirs(os.path.dirname(blob), exist_ok=True)
+                os.link(path, blob)
+                return 0
+
+            if os.path.samefile(blob, path):
+                return 0
+            size = os.path.getsize(path)
+            if os.path.getsize(blob) != size:
+                raise ValueError(f"Blob {blob} does not match {path}")
+
+            mtime = os.path.getmtime(path)
+            if mtime > os.path.getmtime(blob):
+                os.utime(blob, (mtime, mtime))
+            tmp_path = f"{path}.link"
+            os.link(blob, tmp_path)
+            os.replace(tmp_path, path)
+            return size
+
+    def store_files(self, paths: Iterable[str], hashes: Optional[Dict[str, str]] = None) -> Dict[str, int]:
+        """
+        Add files to the store; `hashes` maps paths to known SHA-256 values.
+        Returns: {'files': ..., 'linked': ..., 'bytes_saved': ...}
+        """
+        hashes = hashes or {}
+        report = {"files": 0, "linked": 0, "bytes_saved": 0}
+        for path in paths:
+            try:
+                saved = self.add(path, hashes.get(path))
+            except (OSError, ValueError) as e:
+                print(f"Error storing {path}: {e}")
+                continue
+            report["files"] += 1
+            if saved:
+                report["linked"] += 1
+                report["bytes_saved"] += saved
+        return report
+
+    def store_thread(self, images_folder: str) -> Dict[str, int]:
+        """
+        Add every image of a thread folder, reusing the manifest's hashes
+        (files without a manifest entry, e.g. older archives, are hashed).
+        """
+        hashes = {
+            os.path.join(images_folder, entry["filename"]): entry["sha256"]
+            for entry in ThreadManifest(images_folder).completed()
+        }
+        paths = [os.path.join(images_folder, name) for name in get_image_files(images_folder)]
+        return self.store_files(paths, hashes)
+
+    def thread_keys(self, images_folder: str) -> Set[str]:
+        """Blob keys referenced by a thread folder (read before deleting it)."""
+        keys = set()
+        hashes = {
+            entry["filename"]: entry["sha256"]
+            for entry in ThreadManifest(images_folder).completed()
+        }
+        for name in get_image_files(images_folder):
+            sha256 = hashes.get(name)
+            if sha256 is None:
+                try:
+                    sha256 = file_sha256(os.path.join(images_folder, name))
+                except OSError:
+                    continue
+            keys.add(sha256)
+        return keys
+
+    def _remove_unreferenced(self, blob: str) -> int:
+        """Remove a blob no thread links to. Returns: bytes freed."""
+        try:
+            stat = os.stat(blob)
+            if stat.st_nlink > 1:
+                return 0
+            os.remove(blob)
+            return stat.st_size
+        except FileNotFoundError:
+            return 0
+
+    def release(self, keys: Iterable[str]) -> Dict[str, int]:
+        """
+        Drop the blobs of `keys` that are no longer referenced, after the
+        thread files linking to them were deleted.
+        Returns: {'blobs': removed, 'bytes_freed': ...}
+        """
+        report = {"blobs": 0, "bytes_freed": 0}
+        with self._lock:
+            for sha256 in keys:
+                freed = self._remove_unreferenced(self.blob_path(sha256))
+                if freed:
+                    report["blobs"] += 1
+                    report["bytes_freed"] += freed
+        return report
+
+    def blobs(self) -> List[str]:
+        """Paths of every blob in the store."""
+        if not os.path.isdir(self.folder):
+            return []
+        return [
+            os.path.join(self.folder, prefix, name)
+            for prefix in sorted(os.listdir(self.folder))
+            if os.path.isdir(os.path.join(self.folder, prefix))
+            for name in sorted(os.listdir(os.path.join(self.folder, prefix)))
+        ]
+
+    def collect(self) -> Dict[str, int]:
+        """Remove every unreferenced blob (e.g. after files were re-encoded)."""
+        return self.release(os.path.basename(blob) for blob in self.blobs())
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Store usage: blob count and bytes, and the thread files linking to
+        them with the bytes they would take as separate copies.
+        """
+        report = {"blobs": 0, "bytes": 0, "links": 0, "bytes_linked": 0}
+        for blob in self.blobs():
+            try:
+                stat = os.stat(blob)
+            except FileNotFoundError:
+                continue
+            report["blobs"] += 1
+            report["bytes"] += stat.st_size
+            report["links"] += stat.st_nlink - 1
+            report["bytes_linked"] += (stat.st_nlink - 1) * stat.st_size
+        return report
@@ -0,0 +1,84 @@
+"""Streaming course bundles: ZIP archives and merged PDFs generated in chunks."""
+import time
+import zipfile
+from typing import Iterable, Iterator, List, Tuple, Union
+
+from .pack import PackReader
+from .pdf_builder import DEFAULT_PDF_PROFILE, DEFAULT_RESOLUTION, PDFBuilder, prepare_pages
+
+
+CHUNK_SIZE = 256 * 1024
+
+
+class ChunkSink:
+    """
+    Write-only sink that keeps bytes until the consumer takes them.
+    It is not seekable and has no tell(), so writers produce their output
+    strictly in order (zipfile switches to data descriptors).
+    """
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def take(self) -> bytes:
+        """Return and forget everything written so far."""
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def stream_zip(files: Iterable[Tuple[str, Union[str, Tuple[PackReader, str]]]]) -> Iterator[bytes]:
+    """
+    Generate a ZIP of (arcname, source) files as byte chunks, where source
+    is a path or a (container, image name) pair of a packed thread.
+    Entries are stored without compression (PDFs and images are already
+    compressed), so at most one CHUNK_SIZE read (or one packed image) is
+    held in memory. `files` may be a generator; each source is only opened
+    when its turn comes.
+    """
+    sink = ChunkSink()
+    with zipfile.ZipFile(sink, "w", zipfile.ZIP_STORED) as archive:
+        for arcname, path in files:
+            if isinstance(path, tuple):
+                reader, name = path
+                entry = reader.entry(name)
+                info = zipfile.ZipInfo(arcname, time.localtime(entry["mtime"])[:6])
+                info.file_size = entry["size"]
+                opened = reader.open(name)
+            else:
+                info = zipfile.ZipInfo.from_file(path, arcname)
+                opened = open(path, "rb")
+            with opened as source, archive.open(info, "w") as target:
+                for chunk in iter(lambda: source.read(CHUNK_SIZE), b""):
+                    target.write(chunk)
+                    yield sink.take()
+            yield sink.take()
+    yield sink.take()
+
+
+def stream_pdf(
+    image_paths: List[str],
+    resolution: float = DEFAULT_RESOLUTION,
+    workers: int = 1,
+    profile: str = DEFAULT_PDF_PROFILE
+) -> Iterator[bytes]:
+    """
+    Generate one PDF of the images as byte chunks, one page at a time.
+    Pages are encoded with the profile's settings; its target size is not
+    applied because the output is sent before its size is known.
+    """
+    sink = ChunkSink()
+    builder = PDFBuilder(sink, resolution)
+    for page in prepare_pages(image_paths, workers, profile=profile):
+        if page is not None:
+            builder.add_page(page)
+            yield sink.take()
+    builder.close()
+    yield sink.take()
@@ -0,0 +1,87 @@
+"""Capture only the attachment image from a browser tab."""
+import io
+import os
+import base64
+from PIL import Image
+from selenium.webdriver.common.by import By
+from typing import Optional
+
+from .downloader import remove_stale_files
+
+
+# Ways of turning an opened attachment tab into a file
+CAPTURE_MODES = ("viewport", "element")
+
+# Re-draw the decoded image at its native size and return it as a PNG data URL
+IMAGE_DATA_SCRIPT = """
+const img = document.images[0];
+if (!img || !img.complete || !img.naturalWidth) {
+    return null;
+}
+const canvas = document.createElement('canvas');
+canvas.width = img.naturalWidth;
+canvas.height = img.naturalHeight;
+canvas.getContext('2d').drawImage(img, 0, 0);
+return canvas.toDataURL('image/png');
+"""
+
+
+def read_image_data(driver) -> Optional[bytes]:
+    """Read the decoded image's pixels at native resolution (PNG bytes)."""
+    try:
+        data_url = driver.execute_script(IMAGE_DATA_SCRIPT)
+    except Exception as e:
+        # e.g. a tainted canvas when the image is served cross-origin
+        print(f"Could not read image data from page: {e}")
+        return None
+
+    if not data_url or "," not in data_url:
+        return None
+    return base64.b64decode(data_url.split(",", 1)[1])
+
+
+def screenshot_image_element(driver) -> Optional[bytes]:
+    """Screenshot just the box of the page's <img> element (PNG bytes)."""
+    try:
+        return driver.find_element(By.TAG_NAME, "img").screenshot_as_png
+    except Exception as e:
+        print(f"Could not screenshot image element: {e}")
+        return None
+
+
+def save_compact(data: bytes, images_folder: str, index: int) -> str:
+    """Re-encode captured PNG bytes as lossless WebP `{index}.webp`."""
+    img_path = os.path.join(images_folder, f"{index}.webp")
+    tmp_path = f"{img_path}.part"
+
+    with Image.open(io.BytesIO(data)) as img:
+        if img.mode not in ("RGB", "RGBA"):
+            img = img.convert("RGBA" if "transparency" in img.info else "RGB")
+        img.save(tmp_path, "WEBP", lossless=True)
+
+    os.replace(tmp_path, img_path)
+    remove_stale_files(images_folder, index, img_path)
+    return img_path
+
+
+def capture_image(driver, images_folder: str, index: int, mode: str = "viewport") -> str:
+    """
+    Save the attachment shown in the current tab as image `index`.
+    'viewport' stores the whole window as PNG (original behaviour).
+    'element' stores only the image, at native resolution when the page
+    allows reading its pixels, falling back to the <img> element's box.
+    """
+    if mode == "element":
+        data = read_image_data(driver) or screenshot_image_element(driver)
+        if data:
+            return save_compact(data, images_folder, index)
+        print(f"Falling back to viewport screenshot for image {index}")
+
+    img_path = os.path.join(images_folder, f"{index}.png")
+    # Replace rather than overwrite: the old file may be a shared blob link
+    tmp_path = f"{img_path}.part"
+    with open(tmp_path, "wb") as f:
+        f.write(driver.get_screenshot_as_png())
+    os.replace(tmp_path, img_path)
+    remove_stale_files(images_folder, index, img_path)
+    return img_path
@@ -0,0 +1,41 @@
+"""Downscaled copies of archive images for grids, previews and slow links."""
+import os
+from PIL import Image
+
+from .pdf_builder import flatten_image
+
+
+# Size name -> longest side in pixels
+DERIVATIVE_SIZES = {
+    "thumb": 320,
+    "medium": 1280,
+}
+
+# Output format -> (file extension, Pillow save options)
+DERIVATIVE_FORMATS = {
+    "webp": (".webp", {"format": "WEBP", "quality": 80, "method": 4}),
+    "jpeg": (".jpg", {"format": "JPEG", "quality": 82, "optimize": True, "progressive": True}),
+}
+
+
+def derivative_name(filename: str, size: str, image_format: str) -> str:
+    """Cache file name of an image's derivative, e.g. 'thumb/3.png.webp'."""
+    return os.path.join(size, filename + DERIVATIVE_FORMATS[image_format][0])
+
+
+def make_derivative(src_path: str, dst_path: str, size: str, image_format: str = "webp"):
+    """
+    Write a copy of src_path scaled to fit the named size (never enlarged).
+    JPEG output is flattened onto white since it has no alpha channel.
+    """
+    longest = DERIVATIVE_SIZES[size]
+    _, options = DERIVATIVE_FORMATS[image_format]
+
+    with Image.open(src_path) as img:
+        img.draft(None, (longest, longest))
+        img.thumbnail((longest, longest), Image.LANCZOS)
+
+        if image_format == "jpeg":
+            img = flatten_image(img)
+
+        img.save(dst_path, **options)
@@ -0,0 +1,179 @@
+"""Direct HTTP download of thread attachments using the browser's session."""
+import os
+import re
+import requests
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from .utils import IMAGE_EXTENSIONS
+
+
+# Map server content types to the extension used on disk
+CONTENT_TYPE_EXTENSIONS = {
+    'image/jpeg': '.jpg',
+    'image/jpg': '.jpg',
+    'image/pjpeg': '.jpg',
+    'image/png': '.png',
+    'image/gif': '.gif',
+    'image/webp': '.webp',
+}
+
+DEFAULT_EXTENSION = '.jpg'
+CHUNK_SIZE = 64 * 1024
+
+
+def create_session(max_connections_per_host: int = 4) -> requests.Session:
+    """
+    Create a pooled HTTP session.
+    Each host gets at most `max_connections_per_host` open connections;
+    extra requests block until a connection is returned to the pool.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=max_connections_per_host,
+        pool_block=True
+    )
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def driver_user_agent(driver) -> Optional[str]:
+    """Read the browser's user agent so HTTP requests look like the driver's."""
+    try:
+        return driver.execute_script("return navigator.userAgent;")
+    except Exception as e:
+        print(f"Could not read browser user agent: {e}")
+        return None
+
+
+def session_from_cookies(
+    cookies: List[Dict],
+    user_agent: Optional[str] = None,
+    max_connections_per_host: int = 4
+) -> requests.Session:
+    """
+    Create a pooled session carrying the cookies of a logged-in scraper.
+    Cookies use the WebDriver format (dicts with name, value, domain, path).
+    """
+    session = create_session(max_connections_per_host)
+
+    if user_agent:
+        session.headers['User-Agent'] = user_agent
+
+    for cookie in cookies:
+        session.cookies.set(
+            cookie['name'],
+            cookie['value'],
+            domain=cookie.get('domain'),
+            path=cookie.get('path', '/')
+        )
+
+    return session
+
+
+def guess_extension(headers, url: str) -> str:
+    """
+    Work out the file extension of a downloaded attachment.
+    Order: Content-Type header, Content-Disposition filename, URL path.
+    """
+    content_type = headers.get('Content-Type', '').split(';')[0].strip().lower()
+    if content_type in CONTENT_TYPE_EXTENSIONS:
+        return CONTENT_TYPE_EXTENSIONS[content_type]
+
+    disposition = headers.get('Content-Disposition', '')
+    match = re.search(r'filename="?([^";]+)"?', disposition)
+    candidates = [match.group(1)] if match else []
+    candidates.append(urlparse(url).path.rstrip('/'))
+
+    for candidate in candidates:
+        ext = os.path.splitext(candidate)[1].lower()
+        if ext == '.jpeg':
+            return '.jpg'
+        if ext in IMAGE_EXTENSIONS:
+            return ext
+
+    return DEFAULT_EXTENSION
+
+
+def remove_stale_files(images_folder: str, index: int, keep: str):
+    """Remove files for the same image index saved with another extension."""
+    for ext in IMAGE_EXTENSIONS:
+        path = os.path.join(images_folder, f"{index}{ext}")
+        if path != keep and os.path.exists(path):
+            os.remove(path)
+
+
+class HTTPDownloader:
+    """Download original attachment bytes over a pooled HTTP session."""
+
+    def __init__(
+        self,
+        session: requests.Session,
+        max_connections_per_host: int = 4,
+        timeout: int = 30
+    ):
+        self.session = session
+        self.max_connections_per_host = max_connections_per_host
+        self.timeout = timeout
+
+    def download(self, url: str, images_folder: str, index: int) -> str:
+        """
+        Download one attachment as `{index}{ext}` in images_folder.
+        The file is written under a temporary name and renamed when complete.
+        """
+        with self.session.get(url, timeout=self.timeout, stream=True) as response:
+            response.raise_for_status()
+
+            ext = guess_extension(response.headers, response.url)
+            img_path = os.path.join(images_folder, f"{index}{ext}")
+            tmp_path = f"{img_path}.part"
+
+            with open(tmp_path, "wb") as output_file:
+                for chunk in response.iter_content(CHUNK_SIZE):
+                    output_file.write(chunk)
+
+        os.replace(tmp_path, img_path)
+        remove_stale_files(images_folder, index, img_path)
+        return img_path
+
+    def download_all(
+        self,
+        items: List[Tuple[int, str]],
+        images_folder: str,
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+        item_callback: Optional[Callable[[int, Optional[str]], None]] = None
+    ) -> List[Optional[str]]:
+        """
+        Download (index, url) items concurrently.
+        item_callback(index, path) is called as each item finishes (path
+        None on failure). Returns saved paths in the order of items (None
+        for failures).
+        """
+        total = len(items)
+        paths: List[Optional[str]] = [None] * total
+        completed = 0
+
+        with ThreadPoolExecutor(max_workers=self.max_connections_per_host) as pool:
+            futures = {
+                pool.submit(self.download, img_url, images_folder, idx): position
+                for position, (idx, img_url) in enumerate(items)
+            }
+
+            for future in as_completed(futures):
+                position = futures[future]
+                completed += 1
+                try:
+                    paths[position] = future.result()
+                except Exception as e:
+                    print(f"Error downloading image {items[position][0]}: {e}")
+
+                if item_callback:
+                    item_callback(items[position][0], paths[position])
+                if progress_callback:
+                    progress_callback(completed, total)
+
+        return paths
@@ -0,0 +1,167 @@
+"""Pool of warm, logged-in WebDriver instances shared across scrape jobs."""
+import threading
+from typing import Dict, List, Optional
+
+from .fuo_scraper import BASE_URL, FUOScraper
+from .session_store import SessionStore
+
+
+class DriverPool:
+    """
+    Keep up to `size` browsers started and logged in.
+    Jobs borrow a driver with acquire() and hand it back with release().
+    A driver is health-checked before each loan and recycled after
+    `max_uses` jobs.
+    """
+
+    def __init__(
+        self,
+        username: str,
+        password: str,
+        size: int = 2,
+        max_uses: int = 20,
+        headless: bool = True,
+        base_url: str = BASE_URL,
+        session_store: Optional[SessionStore] = None,
+        page_load_timeout: int = 10,
+        element_timeout: int = 10
+    ):
+        self.username = username
+        self.password = password
+        self.size = size
+        self.max_uses = max_uses
+        self.headless = headless
+        self.base_url = base_url
+        self.session_store = session_store
+        self.page_load_timeout = page_load_timeout
+        self.element_timeout = element_timeout
+
+        self._idle: List = []
+        self._uses: Dict[int, int] = {}
+        self._count = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+    def _create(self):
+        """Start a browser and log it in."""
+        scraper = FUOScraper(
+            self.username,
+            self.password,
+            headless=self.headless,
+            page_load_timeout=self.page_load_timeout,
+            element_timeout=self.element_timeout,
+            base_url=self.base_url,
+            session_store=self.session_store
+        )
+        scraper.init_driver()
+        if not scraper.ensure_login(self.base_url):
+            scraper.close()
+            raise RuntimeError("Login failed while warming driver")
+        return scraper.driver
+
+    def _destroy(self, driver):
+        """Quit a driver and free its slot."""
+        try:
+            driver.quit()
+        except Exception as e:
+            print(f"Error quitting pooled driver: {e}")
+        with self._cond:
+            self._uses.pop(id(driver), None)
+            self._count -= 1
+            self._cond.notify()
+
+    def _add_new(self):
+        """Start one driver for a reserved slot and make it available."""
+        try:
+            driver = self._create()
+        except Exception as e:
+            print(f"Could not start pooled driver: {e}")
+            with self._cond:
+                self._count -= 1
+                self._cond.notify()
+            return None
+
+        with self._cond:
+            self._uses[id(driver)] = 0
+        return driver
+
+    def _is_healthy(self, driver) -> bool:
+        """Check the browser still responds and reset it to a single tab."""
+        try:
+            handles = driver.window_handles
+            for handle in handles[1:]:
+                driver.switch_to.window(handle)
+                driver.close()
+            driver.switch_to.window(handles[0])
+            return driver.execute_script("return 1;") == 1
+        except Exception:
+            return False
+
+    def prewarm(self):
+        """Start drivers in the background until the pool is full."""
+        def warm_one():
+            driver = self._add_new()
+            if driver is not None:
+                self.release(driver, used=False)
+
+        with self._cond:
+            missing = self.size - self._count
+            self._count += max(missing, 0)
+
+        for _ in range(max(missing, 0)):
+            threading.Thread(target=warm_one, daemon=True).start()
+
+    def acquire(self, timeout: Optional[float] = None):
+        """Borrow a healthy, logged-in driver, waiting if all are busy."""
+        while True:
+            with self._cond:
+                if self._closed:
+                    raise RuntimeError("Driver pool is closed")
+
+                if self._idle:
+                    driver = self._idle.pop()
+                elif self._count < self.size:
+                    self._count += 1
+                    driver = None
+                elif not self._cond.wait(timeout):
+                    raise TimeoutError("No pooled driver became available")
+                else:
+                    continue
+
+            if driver is None:
+                driver = self._add_new()
+                if driver is None:
+                    raise RuntimeError("Could not start a browser for the pool")
+                return driver
+
+            if self._is_healthy(driver):
+                return driver
+
+            print("Pooled driver failed health check, replacing it")
+            self._destroy(driver)
+
+    def release(self, driver, used: bool = True):
+        """Return a driver; it is recycled once it reaches max_uses."""
+        with self._cond:
+            if used:
+                self._uses[id(driver)] = self._uses.get(id(driver), 0) + 1
+            retire = self._closed or self._uses.get(id(driver), 0) >= self.max_uses
+
+            if not retire:
+                self._idle.append(driver)
+                self._cond.notify()
+                return
+
+        self._destroy(driver)
+        if not self._closed:
+            self.prewarm()
+
+    def close(self):
+        """Quit every idle driver; busy drivers are quit when released."""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._cond.notify_all()
+
+        for driver in idle:
+            self._destroy(driver)
@@ -0,0 +1,91 @@
+"""Fast extraction of links from XenForo pages with lxml XPath."""
+import lxml.html
+from lxml import etree
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urljoin
+
+
+def _has_class(name: str) -> str:
+    """XPath predicate matching one token of the class attribute."""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+# Attachment links on a thread page (a.file-preview.js-lbImage)
+ATTACHMENT_HREFS = etree.XPath(
+    f"//a[{_has_class('file-preview')} and {_has_class('js-lbImage')}]/@href"
+)
+
+# "Next" link of the page navigation (a.pageNav-jump--next)
+NEXT_PAGE_HREFS = etree.XPath(f"//a[{_has_class('pageNav-jump--next')}]/@href")
+
+# Thread rows of a forum listing and the parts read from each row
+THREAD_ITEMS = etree.XPath(f"//div[{_has_class('structItem--thread')}]")
+THREAD_TITLE_HREFS = etree.XPath(f".//div[{_has_class('structItem-title')}]//a/@href")
+THREAD_LATEST_TIMES = etree.XPath(
+    f".//time[{_has_class('structItem-latestDate')}]/@data-time"
+)
+
+
+def parse_html(html: str):
+    """Parse a page into an lxml tree (no BeautifulSoup wrapper)."""
+    return lxml.html.document_fromstring(html)
+
+
+def _absolute(href: str, base_url: str) -> str:
+    """Resolve a link against the forum root."""
+    return urljoin(base_url + "/", href)
+
+
+def extract_attachment_urls(tree, base_url: str) -> List[str]:
+    """Attachment URLs of a thread page, in page order without duplicates."""
+    urls = []
+    seen = set()
+    for href in ATTACHMENT_HREFS(tree):
+        url = _absolute(href, base_url)
+        if url not in seen:
+            seen.add(url)
+            urls.append(url)
+    return urls
+
+
+def extract_next_page_url(tree, base_url: str) -> Optional[str]:
+    """Return the URL of the next XenForo page, or None on the last page."""
+    hrefs = NEXT_PAGE_HREFS(tree)
+    return _absolute(hrefs[0], base_url) if hrefs else None
+
+
+def extract_thread_page(html: str, base_url: str) -> Tuple[List[str], Optional[str]]:
+    """
+    Parse a thread page once and read its attachments and next page link.
+    Returns: (['https://fuoverflow.com/attachments/1.jpg', ...], 'https://.../page-2' or None)
+    """
+    tree = parse_html(html)
+    return extract_attachment_urls(tree, base_url), extract_next_page_url(tree, base_url)
+
+
+def extract_thread_links(tree, base_url: str) -> List[Dict]:
+    """
+    Extract threads from a XenForo forum listing page.
+    Returns: [{'url': 'https://.../threads/jpd113-su25-b5-mc.4934/', 'last_activity': 1718000000}, ...]
+    (last_activity is the Unix time of the latest post, or None)
+    """
+    threads = []
+    seen = set()
+
+    for item in THREAD_ITEMS(tree):
+        links = [href for href in THREAD_TITLE_HREFS(item) if "/threads/" in href]
+        if not links:
+            continue
+
+        thread_url = _absolute(links[-1], base_url)
+        if thread_url in seen:
+            continue
+        seen.add(thread_url)
+
+        latest = THREAD_LATEST_TIMES(item)
+        threads.append({
+            "url": thread_url,
+            "last_activity": int(latest[0]) if latest else None
+        })
+
+    return threads
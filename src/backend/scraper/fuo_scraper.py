@@ -1,15 +1,100 @@
 import os
-import time
 import re
 import requests
-from PIL import Image
-from pypdf import PdfWriter, PdfReader
-from bs4 import BeautifulSoup
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
+
+from .async_downloader import AsyncDownloader
+from .autocrop import crop_batch
+from .blob_store import BlobStore
+from .capture import CAPTURE_MODES, capture_image
+from .downloader import HTTPDownloader, driver_user_agent, session_from_cookies
+from .extract import extract_thread_page
+from .manifest import ThreadManifest, thread_fingerprint
+from .pack import extract_pack, is_packed, pack_path
+from .pdf_builder import DEFAULT_PDF_PROFILE, PDF_PROFILES, build_pdf, pdf_filename, update_pdf
+from .pipeline import PagePipeline
+from .session_store import SessionStore
+from .utils import get_image_files
+from .waits import WaitRecorder
+
+
+# Supported ways of fetching attachments
+DOWNLOAD_MODES = ("screenshot", "http", "async")
+
+# Forum root; relative attachment links are resolved against it
+BASE_URL = "https://fuoverflow.com"
+
+# Upper bound on thread pages followed when collecting attachments
+THREAD_MAX_PAGES = 50
+
+# Host whose requests are throttled by the async downloader
+FORUM_HOST = "fuoverflow.com"
+
+# XenForo marks the <html> tag of pages rendered for a logged-in member
+LOGGED_IN_MARKER = 'data-logged-in="true"'
+
+# JS check for the same marker on the live page
+LOGGED_IN_SCRIPT = "return document.documentElement.getAttribute('data-logged-in') === 'true';"
+
+# Cookie fields accepted by WebDriver.add_cookie
+WEBDRIVER_COOKIE_KEYS = ("name", "value", "path", "domain", "secure", "httpOnly", "expiry")
+
+
+def is_logged_in(html: str) -> bool:
+    """Check whether a XenForo page was rendered for a logged-in member."""
+    return LOGGED_IN_MARKER in html
+
+
+def create_driver(headless: bool = False):
+    """Start an Edge WebDriver with a 1920x1080 window."""
+    options = webdriver.EdgeOptions()
+    if headless:
+        options.add_argument('--headless')
+        options.add_argument('--disable-gpu')
+    options.add_argument('--window-size=1920,1080')
+    driver = webdriver.Edge(options=options)
+    if not headless:
+        driver.set_window_size(1920, 1080)
+    return driver
+
+
+def parse_thread_name(url: str) -> Tuple[str, str]:
+    """
+    Extract course code and full name from thread URL.
+    Example: https://fuoverflow.com/threads/jpd113-su25-b5-mc.4934/
+    Returns: ('JPD113', 'JPD113_SU25_B5_MC')
+    Example: https://fuoverflow.com/threads/swe201c-su25-re.4845/
+    Returns: ('SWE201c', 'SWE201c_SU25_RE')
+    Example: https://fuoverflow.com/threads/mai391-fa25-fe.5252/
+    Returns: ('MAI391', 'MAI391_FA25_FE')
+    """
+    # Extract thread name from URL
+    match = re.search(r'/threads/([^/]+)/', url)
+    if not match:
+        raise ValueError("Invalid thread URL format")
+
+    thread_name = match.group(1)
+    # Remove the trailing number if exists (e.g., .4934)
+    thread_name = re.sub(r'\.\d+$', '', thread_name)
+
+    # Convert to uppercase and replace hyphens with underscores
+    full_name = thread_name.upper().replace('-', '_')
+
+    # Extract course code using regex: letters followed by digits, optionally ending with a lowercase letter
+    # Pattern: 3+ uppercase letters, followed by 3+ digits, optionally followed by 1 lowercase letter
+    course_code_match = re.match(r'^([A-Z]{3,}\d{3,}[a-z]?)', full_name)
+    if course_code_match:
+        course_code = course_code_match.group(1)
+    else:
+        # Fallback: take everything before first underscore or first 6 characters
+        parts = full_name.split('_')
+        course_code = parts[0] if parts else full_name[:6]
+
+    return course_code, full_name
 
 
 class FUOScraper:
@@ -24,8 +109,29 @@ class FUOScraper:
         batch_size: int = 10,
         item_delay: int = 2,
         page_load_timeout: int = 10,
-        element_timeout: int = 10
+        element_timeout: int = 10,
+        download_mode: str = "screenshot",
+        capture_mode: str = "viewport",
+        pdf_workers: int = 1,
+        pdf_profile: str = DEFAULT_PDF_PROFILE,
+        lazy_pdf: bool = False,
+        auto_crop: bool = False,
+        max_connections: int = 4,
+        concurrency: int = 8,
+        rate_limit: float = 10.0,
+        base_url: str = BASE_URL,
+        session_store: Optional[SessionStore] = None,
+        driver_pool=None,
+        blob_store: Optional[BlobStore] = None,
+        force: bool = False
     ):
+        if download_mode not in DOWNLOAD_MODES:
+            raise ValueError(f"Unknown download mode: {download_mode}")
+        if capture_mode not in CAPTURE_MODES:
+            raise ValueError(f"Unknown capture mode: {capture_mode}")
+        if pdf_profile not in PDF_PROFILES:
+            raise ValueError(f"Unknown PDF profile: {pdf_profile}")
+        
         self.username = username
         self.password = password
         self.driver = None
@@ -35,71 +141,56 @@ class FUOScraper:
         self.item_delay = item_delay
         self.page_load_timeout = page_load_timeout
         self.element_timeout = element_timeout
+        self.download_mode = download_mode
+        self.capture_mode = capture_mode
+        self.pdf_workers = pdf_workers
+        self.pdf_profile = pdf_profile
+        self.lazy_pdf = lazy_pdf
+        self.auto_crop = auto_crop
+        self.max_connections = max_connections
+        self.concurrency = concurrency
+        self.rate_limit = rate_limit
+        self.base_url = base_url.rstrip('/')
+        self.session_store = session_store
+        self.driver_pool = driver_pool
+        self.blob_store = blob_store
+        self.force = force
+        self.waits = WaitRecorder()
         
     def parse_thread_name(self, url: str) -> Tuple[str, str]:
-        """
-        Extract course code and full name from thread URL.
-        Example: https://fuoverflow.com/threads/jpd113-su25-b5-mc.4934/
-        Returns: ('JPD113', 'JPD113_SU25_B5_MC')
-        Example: https://fuoverflow.com/threads/swe201c-su25-re.4845/
-        Returns: ('SWE201c', 'SWE201c_SU25_RE')
-        Example: https://fuoverflow.com/threads/mai391-fa25-fe.5252/
-        Returns: ('MAI391', 'MAI391_FA25_FE')
-        """
-        # Extract thread name from URL
-        match = re.search(r'/threads/([^/]+)/', url)
-        if not match:
-            raise ValueError("Invalid thread URL format")
-        
-        thread_name = match.group(1)
-        # Remove the trailing number if exists (e.g., .4934)
-        thread_name = re.sub(r'\.\d+$', '', thread_name)
-        
-        # Convert to uppercase and replace hyphens with underscores
-        full_name = thread_name.upper().replace('-', '_')
-        
-        # Extract course code using regex: letters followed by digits, optionally ending with a lowercase letter
-        # Pattern: 3+ uppercase letters, followed by 3+ digits, optionally followed by 1 lowercase letter
-        course_code_match = re.match(r'^([A-Z]{3,}\d{3,}[a-z]?)', full_name)
-        if course_code_match:
-            course_code = course_code_match.group(1)
-        else:
-            # Fallback: take everything before first underscore or first 6 characters
-            parts = full_name.split('_')
-            course_code = parts[0] if parts else full_name[:6]
-        
-        return course_code, full_name
+        """Extract course code and full name from thread URL."""
+        return parse_thread_name(url)
     
     def create_folder_structure(self, course_code: str, full_name: str) -> Tuple[str, str, str]:
         """
         Create folder structure: archive/images/{course_code}/{full_name}
+        A packed thread is unpacked first so it can be updated.
         Returns: (parent_folder_path, images_folder_path, pdf_folder_path)
         """
         parent_folder = os.path.join("archive", "images", course_code)
         images_folder = os.path.join(parent_folder, full_name)
         pdf_folder = os.path.join("archive", "documents", course_code)
         
+        if is_packed(images_folder):
+            extract_pack(pack_path(images_folder), images_folder)
+        
         os.makedirs(images_folder, exist_ok=True)
         os.makedirs(pdf_folder, exist_ok=True)
         
         return parent_folder, images_folder, pdf_folder
     
     def init_driver(self):
-        """Initialize Selenium WebDriver."""
+        """Initialize Selenium WebDriver (borrowed from the pool if there is one)."""
         if self.driver is None:
-            options = webdriver.EdgeOptions()
-            if self.headless:
-                options.add_argument('--headless')
-                options.add_argument('--disable-gpu')
-            options.add_argument('--window-size=1920,1080')
-            self.driver = webdriver.Edge(options=options)
-            if not self.headless:
-                self.driver.set_window_size(1920, 1080)
+            if self.driver_pool:
+                self.driver = self.driver_pool.acquire()
+            else:
+                self.driver = create_driver(self.headless)
     
     def login(self, url: str):
         """Login to FUOverflow."""
         self.driver.get(url)
-        time.sleep(self.page_load_timeout)
+        self.waits.document_ready(self.driver, self.page_load_timeout)
         
         try:
             login_button = WebDriverWait(self.driver, self.element_timeout).until(
@@ -109,7 +200,14 @@ class FUOScraper:
                 ))
             )
             login_button.click()
-            time.sleep(self.page_load_timeout)
+            
+            # The login form opens in an overlay
+            self.waits.wait_until(
+                self.driver,
+                "login_form",
+                EC.visibility_of_element_located((By.NAME, "login")),
+                self.page_load_timeout
+            )
             
             input_username = self.driver.find_element(By.NAME, "login")
             input_password = self.driver.find_element(By.NAME, "password")
@@ -122,32 +220,127 @@ class FUOScraper:
                 "button.button--primary.button.button--icon.button--icon--login"
             )
             submit_button.click()
-            time.sleep(3)
             
-            return True
+            logged_in = self.waits.wait_until(
+                self.driver,
+                "logged_in",
+                lambda d: d.execute_script(LOGGED_IN_SCRIPT),
+                self.page_load_timeout
+            )
+            self.waits.document_ready(self.driver, self.page_load_timeout)
+            
+            return logged_in
         except Exception as e:
             print(f"Login error: {e}")
             return False
     
-    def get_image_urls(self) -> List[str]:
-        """Extract all image URLs from the current page."""
-        page_source = self.driver.page_source
-        soup = BeautifulSoup(page_source, "lxml")
-        all_images = soup.find_all("a", class_="file-preview js-lbImage")
+    def restore_session(self, cookies: List[Dict], url: str) -> bool:
+        """Load saved cookies into the browser and open the thread as a member."""
+        # Cookies can only be set for the domain currently loaded
+        self.driver.get(self.base_url)
+        self.driver.delete_all_cookies()
+        for cookie in cookies:
+            try:
+                self.driver.add_cookie({
+                    key: cookie[key] for key in WEBDRIVER_COOKIE_KEYS
+                    if cookie.get(key) is not None
+                })
+            except Exception as e:
+                print(f"Could not restore cookie {cookie.get('name')}: {e}")
         
+        self.driver.get(url)
+        return is_logged_in(self.get_page_source())
+    
+    def ensure_login(self, url: str) -> bool:
+        """
+        Open the thread as a logged-in member.
+        Reuses the saved session when it is still valid, otherwise logs in
+        and saves the new session.
+        """
+        if self.driver_pool:
+            # Pooled drivers are already logged in
+            self.driver.get(url)
+            if is_logged_in(self.get_page_source()):
+                return True
+        
+        if self.session_store:
+            cookies = self.session_store.load(self.username)
+            if cookies:
+                try:
+                    if self.restore_session(cookies, url):
+                        return True
+                except Exception as e:
+                    print(f"Could not restore saved session: {e}")
+                # Saved session was rejected by the server
+                self.session_store.invalidate(self.username)
+        
+        if not self.login(url):
+            return False
+        
+        if self.session_store:
+            self.session_store.save(self.username, self.get_cookies())
+        return True
+    
+    def get_page_source(self) -> str:
+        """Return the HTML of the current page."""
+        return self.driver.page_source
+    
+    def get_page_validators(self) -> Dict[str, str]:
+        """HTTP validators (ETag, Last-Modified) of the current page, if known."""
+        # The browser does not expose response headers
+        return {}
+    
+    def get_cookies(self) -> List[Dict]:
+        """Return session cookies as dicts with name, value, domain and path."""
+        return self.driver.get_cookies()
+    
+    def get_user_agent(self) -> Optional[str]:
+        """Return the user agent the session is using."""
+        return driver_user_agent(self.driver)
+    
+    def close(self):
+        """Release the browser (returned to the pool if it was borrowed)."""
+        if self.driver:
+            if self.driver_pool:
+                self.driver_pool.release(self.driver)
+            else:
+                self.driver.quit()
+            self.driver = None
+    
+    def open_page(self, url: str):
+        """Navigate to another page of the current thread."""
+        self.driver.get(url)
+        self.waits.document_ready(self.driver, self.page_load_timeout)
+    
+    def get_image_urls(self, max_pages: int = THREAD_MAX_PAGES) -> List[str]:
+        """
+        Extract all image URLs of the thread, starting from the current page.
+        Follows the thread's pagination and merges every page's attachments
+        in order.
+        """
         img_urls = []
-        for img in all_images:
-            if img.has_attr("href"):
-                img_url = img["href"]
-                if not img_url.startswith("http"):
-                    img_url = "https://fuoverflow.com" + img_url
-                img_urls.append(img_url)
+        seen = set()
+        visited = set()
+        
+        for _ in range(max_pages):
+            page_urls, next_url = extract_thread_page(self.get_page_source(), self.base_url)
+            for img_url in page_urls:
+                if img_url not in seen:
+                    seen.add(img_url)
+                    img_urls.append(img_url)
+            
+            if not next_url or next_url in visited:
+                break
+            visited.add(next_url)
+            self.open_page(next_url)
         
         return img_urls
     
-    def scrape_images(self, url: str, progress_callback=None) -> Dict:
+    def scrape_images(self, url: str, progress_callback=None, stage_callback=None) -> Dict:
         """
         Scrape images from FUOverflow thread and save them.
+        stage_callback receives the pipeline's queue depths while images
+        are downloaded and written to the PDF.
         Returns dict with status, folder paths, and image count.
         """
         try:
@@ -161,7 +354,7 @@ class FUOScraper:
             
             # Initialize driver and login
             self.init_driver()
-            if not self.login(url):
+            if not self.ensure_login(url):
                 return {
                     "success": False,
                     "error": "Login failed",
@@ -169,7 +362,10 @@ class FUOScraper:
                     "full_name": full_name
                 }
             
-            # Get image URLs
+            # Get image URLs (from every page of the thread)
+            if self.driver:
+                self.waits.attachments_present(self.driver, self.element_timeout)
+            validators = self.get_page_validators()
             img_urls = self.get_image_urls()
             
             if not img_urls:
@@ -180,30 +376,91 @@ class FUOScraper:
                     "full_name": full_name
                 }
             
-            # Download images
-            if self.all_in_one:
-                # All in One mode: batch download (10 images at a time)
-                self._download_images_batch(
-                    img_urls, images_folder, progress_callback
+            # Only fetch attachments that are new, missing or failed last time
+            manifest = ThreadManifest(images_folder)
+            pending = manifest.plan(img_urls)
+            
+            # Skip everything when the attachment list and PDF profile have not changed
+            from database import db
+            fingerprint = thread_fingerprint(img_urls, validators)
+            existing = db.get_thread(course_code, full_name)
+            if (
+                not self.force
+                and not pending
+                and existing
+                and existing.get("fingerprint") == fingerprint
+                and existing.get("pdf_profile") == self.pdf_profile
+            ):
+                return {
+                    "success": True,
+                    "unchanged": True,
+                    "course_code": course_code,
+                    "full_name": full_name,
+                    "images_folder": images_folder,
+                    "pdf_path": existing["pdf_path"],
+                    "image_count": existing["image_count"],
+                    "downloaded": 0,
+                    "failed": 0,
+                    "wait_stats": self.waits.summary()
+                }
+            downloaded = 0
+            pdf_written = False
+            pdf_path = os.path.join(pdf_folder, pdf_filename(full_name, self.pdf_profile))
+            crop = self.auto_crop and self.download_mode == "screenshot"
+            
+            # Download images, writing PDF pages as they arrive
+            if pending and not (self.lazy_pdf or crop):
+                downloaded = self._download_and_build(
+                    manifest, pending, images_folder, pdf_path,
+                    progress_callback, stage_callback
                 )
-            else:
-                # Original mode: download one by one
-                self._download_images_sequential(
-                    img_urls, images_folder, progress_callback
+                pdf_written = downloaded > 0
+            elif pending:
+                # Whole batch first: lazy PDFs are built by the API on first
+                # request, and auto-crop measures all new screenshots together
+                paths = self._download_images(
+                    pending, images_folder, progress_callback, manifest.record
                 )
+                downloaded = sum(1 for path in paths if path)
+                if crop:
+                    self._crop_screenshots(manifest, pending, paths)
+            manifest.save()
+            
+            completed = manifest.completed()
+            if not completed:
+                return {
+                    "success": False,
+                    "error": "No images downloaded",
+                    "course_code": course_code,
+                    "full_name": full_name
+                }
             
-            # Create PDF
-            pdf_path = self.create_pdf(images_folder, pdf_folder, full_name)
+            # Share new files with identical images already in the archive
+            if self.blob_store and downloaded:
+                pending_indexes = {index for index, _ in pending}
+                new_files = {
+                    os.path.join(images_folder, entry["filename"]): entry["sha256"]
+                    for entry in completed
+                    if entry["index"] in pending_indexes
+                }
+                self.blob_store.store_files(list(new_files), new_files)
+            
+            # Create PDF unless the pipeline already wrote it
+            if not self.lazy_pdf and not pdf_written and (
+                downloaded or self.force or not os.path.exists(pdf_path)
+            ):
+                pdf_path = self.create_pdf(images_folder, pdf_folder, full_name)
             
             # Save to database
-            from database import db
             db.add_thread(
                 course_code=course_code,
                 thread_name=full_name,
                 pdf_path=pdf_path,
                 images_folder=images_folder,
-                image_count=len(img_urls),
-                thread_url=url
+                image_count=len(completed),
+                thread_url=url,
+                fingerprint=fingerprint,
+                pdf_profile=self.pdf_profile
             )
             
             return {
@@ -212,7 +469,10 @@ class FUOScraper:
                 "full_name": full_name,
                 "images_folder": images_folder,
                 "pdf_path": pdf_path,
-                "image_count": len(img_urls)
+                "image_count": len(completed),
+                "downloaded": downloaded,
+                "failed": len(manifest.failed()),
+                "wait_stats": self.waits.summary()
             }
             
         except Exception as e:
@@ -221,82 +481,229 @@ class FUOScraper:
                 "error": str(e)
             }
         finally:
-            if self.driver:
-                self.driver.quit()
-                self.driver = None
+            self.close()
     
-    def _download_images_sequential(
+    def _download_and_build(
         self,
-        img_urls: List[str],
+        manifest: ThreadManifest,
+        pending: List[Tuple[int, str]],
         images_folder: str,
-        progress_callback
+        pdf_path: str,
+        progress_callback=None,
+        stage_callback=None
+    ) -> int:
+        """
+        Download pending images while a PagePipeline converts them and
+        writes the PDF, so page preparation overlaps the downloads.
+        Returns: number of images downloaded
+        """
+        complete = {entry["index"]: entry for entry in manifest.completed()}
+        pending_indexes = {idx for idx, _ in pending}
+        slots = []
+        for entry in manifest.ordered():
+            if entry["index"] in pending_indexes:
+                slots.append({"index": entry["index"], "path": None, "key": None})
+            elif entry["index"] in complete:
+                slots.append({
+                    "index": entry["index"],
+                    "path": os.path.join(images_folder, entry["filename"]),
+                    "key": entry["sha256"]
+                })
+        
+        pipeline = PagePipeline(
+            slots,
+            pdf_path,
+            manifest.pdfs.get(self.pdf_profile),
+            profile=self.pdf_profile,
+            workers=self.pdf_workers,
+            stage_callback=stage_callback
+        )
+        pipeline.start()
+        
+        def image_callback(idx: int, path: Optional[str]):
+            entry = manifest.record(idx, path)
+            if entry["status"] == "done":
+                pipeline.image_ready(idx, path, entry["sha256"])
+            else:
+                pipeline.image_failed(idx)
+        
+        try:
+            paths = self._download_images(
+                pending, images_folder, progress_callback, image_callback
+            )
+        finally:
+            state = pipeline.finish()
+        
+        if state is not None:
+            target_size = PDF_PROFILES[self.pdf_profile].get("target_size")
+            if target_size and state["size"] > target_size:
+                # Over the profile's size budget: rebuild with shrinking
+                images = [
+                    (os.path.join(images_folder, entry["filename"]), entry["sha256"])
+                    for entry in manifest.completed()
+                ]
+                state = update_pdf(
+                    images, pdf_path, None,
+                    workers=self.pdf_workers, profile=self.pdf_profile
+                )
+            manifest.pdfs[self.pdf_profile] = state
+        
+        return sum(1 for path in paths if path)
+    
+    def _crop_screenshots(
+        self,
+        manifest: ThreadManifest,
+        items: List[Tuple[int, str]],
+        paths: List[Optional[str]]
     ):
+        """Crop the background shared by a batch of screenshots and re-record them."""
+        saved = {path: idx for (idx, _), path in zip(items, paths) if path}
+        for path in crop_batch(list(saved)):
+            manifest.record(saved[path], path)
+    
+    def _download_images(
+        self,
+        items: List[Tuple[int, str]],
+        images_folder: str,
+        progress_callback=None,
+        image_callback=None
+    ) -> List[Optional[str]]:
+        """Download images with the configured download mode."""
+        if self.download_mode == "http":
+            # Direct mode: fetch original attachment bytes over HTTP
+            return self._download_images_http(
+                items, images_folder, progress_callback, image_callback
+            )
+        if self.download_mode == "async":
+            # Async mode: fetch all attachments concurrently, rate limited
+            return self._download_images_async(
+                items, images_folder, progress_callback, image_callback
+            )
+        if self.all_in_one:
+            # All in One mode: batch download (10 images at a time)
+            return self._download_images_batch(
+                items, images_folder, progress_callback, image_callback
+            )
+        # Original mode: download one by one
+        return self._download_images_sequential(
+            items, images_folder, progress_callback, image_callback
+        )
+    
+    def _download_images_http(
+        self,
+        items: List[Tuple[int, str]],
+        images_folder: str,
+        progress_callback,
+        image_callback=None
+    ) -> List[Optional[str]]:
+        """Download original attachments with the driver's session cookies."""
+        session = session_from_cookies(
+            self.get_cookies(), self.get_user_agent(), self.max_connections
+        )
+        try:
+            downloader = HTTPDownloader(session, self.max_connections)
+            return downloader.download_all(
+                items, images_folder, progress_callback, image_callback
+            )
+        finally:
+            session.close()
+    
+    def _download_images_async(
+        self,
+        items: List[Tuple[int, str]],
+        images_folder: str,
+        progress_callback,
+        image_callback=None
+    ) -> List[Optional[str]]:
+        """Download attachments concurrently with the asyncio engine."""
+        headers = {}
+        user_agent = self.get_user_agent()
+        if user_agent:
+            headers['User-Agent'] = user_agent
+        
+        downloader = AsyncDownloader(
+            cookies={c['name']: c['value'] for c in self.get_cookies()},
+            headers=headers,
+            concurrency=self.concurrency,
+            rate_limits={FORUM_HOST: self.rate_limit},
+            cookie_url=self.base_url
+        )
+        return downloader.run(items, images_folder, progress_callback, image_callback)
+    
+    def _download_images_sequential(
+        self,
+        items: List[Tuple[int, str]],
+        images_folder: str,
+        progress_callback,
+        image_callback=None
+    ) -> List[Optional[str]]:
         """Download images one by one (original mode)."""
-        for idx, img_url in enumerate(img_urls, 1):
+        paths: List[Optional[str]] = [None] * len(items)
+        
+        for position, (idx, img_url) in enumerate(items):
             try:
                 if progress_callback:
-                    progress_callback(idx, len(img_urls))
+                    progress_callback(position + 1, len(items))
                 
                 # Open image in new tab
                 self.driver.execute_script(
                     f"window.open('{img_url}', '_blank');"
                 )
-                time.sleep(self.item_delay)
-                
                 self.driver.switch_to.window(self.driver.window_handles[-1])
+                self.waits.image_loaded(self.driver, self.item_delay)
                 
                 # Save screenshot
-                img_name = f"{idx}.png"
-                img_path = os.path.join(images_folder, img_name)
-                self.driver.save_screenshot(img_path)
+                paths[position] = capture_image(
+                    self.driver, images_folder, idx, self.capture_mode
+                )
                 
                 # Close tab and switch back
                 self.driver.close()
                 self.driver.switch_to.window(self.driver.window_handles[0])
                 
-                time.sleep(1)
-                
             except Exception as e:
                 print(f"Error downloading image {idx}: {e}")
-                continue
+            
+            if image_callback:
+                image_callback(idx, paths[position])
+        
+        return paths
     
     def _download_images_batch(
         self,
-        img_urls: List[str],
+        items: List[Tuple[int, str]],
         images_folder: str,
-        progress_callback
-    ):
+        progress_callback,
+        image_callback=None
+    ) -> List[Optional[str]]:
         """Download images in batches (all in one mode)."""
         batch_size = self.batch_size
-        total = len(img_urls)
+        total = len(items)
+        paths: List[Optional[str]] = [None] * total
         
         for batch_start in range(0, total, batch_size):
             batch_end = min(batch_start + batch_size, total)
-            batch = img_urls[batch_start:batch_end]
+            batch = items[batch_start:batch_end]
             
             # Open all images in batch
-            for idx, img_url in enumerate(batch, start=batch_start + 1):
+            for idx, img_url in batch:
                 try:
                     self.driver.execute_script(
                         f"window.open('{img_url}', '_blank');"
                     )
-                    time.sleep(0.5)  # Small delay between tabs
                 except Exception as e:
                     print(f"Error opening image {idx}: {e}")
             
-            # Wait for all tabs to load
-            time.sleep(self.item_delay)
-            
-            # Save screenshots from all tabs
+            # Save screenshots from all tabs (they load in parallel, so
+            # each one is only waited on when it is captured)
             main_window = self.driver.window_handles[0]
             
             # Process each image in the batch
-            for batch_idx, (img_idx, img_url) in enumerate(
-                zip(range(batch_start + 1, batch_end + 1), batch)
-            ):
+            for batch_idx, (img_idx, img_url) in enumerate(batch):
+                position = batch_start + batch_idx
                 try:
                     if progress_callback:
-                        progress_callback(img_idx, total)
+                        progress_callback(position + 1, total)
                     
                     # Switch to tab (batch_idx + 1 because main window is at 0)
                     tab_position = batch_idx + 1
@@ -305,17 +712,20 @@ class FUOScraper:
                             self.driver.window_handles[tab_position]
                         )
                         
-                        # Wait a bit for image to fully load
-                        time.sleep(0.5)
+                        # Wait for the image to finish loading
+                        self.waits.image_loaded(self.driver, self.item_delay)
                         
                         # Save screenshot
-                        img_name = f"{img_idx}.png"
-                        img_path = os.path.join(images_folder, img_name)
-                        self.driver.save_screenshot(img_path)
-                        print(f"Saved image {img_idx}/{total}")
+                        paths[position] = capture_image(
+                            self.driver, images_folder, img_idx, self.capture_mode
+                        )
+                        print(f"Saved image {position + 1}/{total}")
                         
                 except Exception as e:
                     print(f"Error saving image {img_idx}: {e}")
+                
+                if image_callback:
+                    image_callback(img_idx, paths[position])
             
             # Close all tabs except main window
             self.driver.switch_to.window(main_window)
@@ -325,42 +735,42 @@ class FUOScraper:
             
             # Switch back to main window
             self.driver.switch_to.window(main_window)
-            time.sleep(1)
+        
+        return paths
     
     def create_pdf(self, images_folder: str, pdf_folder: str, name: str) -> str:
-        """Create PDF from images in the folder."""
-        writer = PdfWriter()
-        
-        # Get all image files
-        image_files = sorted(
-            [f for f in os.listdir(images_folder) if f.endswith(('.jpg', '.png'))],
-            key=lambda x: int(x.split('.')[0])
-        )
-        
-        for image_name in image_files:
-            try:
-                image_path = os.path.join(images_folder, image_name)
-                img = Image.open(image_path)
-                
-                # Convert to PDF
-                img_pdf_path = f"{image_path}.pdf"
-                img.save(img_pdf_path, "PDF", resolution=100.0)
-                
-                # Add to writer
-                img_pdf = PdfReader(img_pdf_path)
-                writer.add_page(img_pdf.pages[0])
-                
-                # Clean up temporary PDF
-                os.remove(img_pdf_path)
-            except Exception as e:
-                print(f"Error processing {image_name}: {e}")
-                continue
+        """
+        Create the PDF of the scraper's profile from images in the folder.
+        When the manifest shows the existing PDF already holds the first
+        images, only the new images are appended to it.
+        """
+        pdf_path = os.path.join(pdf_folder, pdf_filename(name, self.pdf_profile))
         
-        # Save final PDF
-        pdf_filename = f"{name}.pdf"
-        pdf_path = os.path.join(pdf_folder, pdf_filename)
+        manifest = ThreadManifest(images_folder)
+        completed = manifest.completed()
+        if not completed:
+            # Folder without a manifest: build from every image file
+            image_files = get_image_files(images_folder)
+            build_pdf(
+                [os.path.join(images_folder, image_name) for image_name in image_files],
+                pdf_path,
+                workers=self.pdf_workers,
+                profile=self.pdf_profile
+            )
+            return pdf_path
         
-        with open(pdf_path, "wb") as output_file:
-            writer.write(output_file)
+        # Pages are matched by image content hash
+        images = [
+            (os.path.join(images_folder, entry["filename"]), entry["sha256"])
+            for entry in completed
+        ]
+        manifest.pdfs[self.pdf_profile] = update_pdf(
+            images,
+            pdf_path,
+            manifest.pdfs.get(self.pdf_profile),
+            workers=self.pdf_workers,
+            profile=self.pdf_profile
+        )
+        manifest.save()
         
         return pdf_path
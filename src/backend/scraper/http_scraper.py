@@ -0,0 +1,181 @@
+"""Browserless scraper that logs in with plain HTTP form posts."""
+import requests
+from bs4 import BeautifulSoup
+from typing import Dict, List, Optional
+from urllib.parse import urljoin
+
+from .downloader import create_session
+from .extract import extract_next_page_url, extract_thread_links, parse_html
+from .fuo_scraper import FUOScraper, is_logged_in
+
+
+# Default XenForo login endpoints (relative to the forum root)
+LOGIN_PAGE_PATH = "/login/"
+LOGIN_POST_PATH = "/login/login"
+
+# Response headers that identify a version of the thread page
+VALIDATOR_HEADERS = ("ETag", "Last-Modified")
+
+
+def extract_login_form(html: str) -> Dict[str, str]:
+    """
+    Extract the XenForo login form action and CSRF token.
+    Returns: {'action': '/login/login', 'token': '...'}
+    """
+    soup = BeautifulSoup(html, "lxml")
+
+    form = None
+    login_input = soup.find("input", attrs={"name": "login"})
+    if login_input is not None:
+        form = login_input.find_parent("form")
+
+    token_scope = form if form is not None else soup
+    token_input = token_scope.find("input", attrs={"name": "_xfToken"})
+    if token_input is None or not token_input.get("value"):
+        raise ValueError("CSRF token not found on login page")
+
+    action = form.get("action") if form is not None else None
+    return {
+        "action": action or LOGIN_POST_PATH,
+        "token": token_input["value"]
+    }
+
+
+class HTTPScraper(FUOScraper):
+    """
+    Scrape FUOverflow threads without starting a browser.
+    Logs in through the XenForo form with requests and downloads attachments
+    over HTTP, so screenshot mode is not available.
+    """
+
+    def __init__(self, username: str, password: str, **kwargs):
+        if kwargs.get("download_mode", "screenshot") == "screenshot":
+            kwargs["download_mode"] = "http"
+        super().__init__(username, password, **kwargs)
+        self.session: Optional[requests.Session] = None
+        self.page_source = ""
+        self.page_validators: Dict[str, str] = {}
+
+    def init_driver(self):
+        """Create the HTTP session (there is no browser to start)."""
+        if self.session is None:
+            self.session = create_session(self.max_connections)
+
+    def _get(self, url: str) -> requests.Response:
+        """GET a page, remembering its HTML as the current page."""
+        response = self.session.get(url, timeout=self.page_load_timeout)
+        response.raise_for_status()
+        self.page_source = response.text
+        self.page_validators = {
+            name: response.headers[name]
+            for name in VALIDATOR_HEADERS
+            if name in response.headers
+        }
+        return response
+
+    def login(self, url: str):
+        """Login to FUOverflow with the XenForo login form and open the thread."""
+        try:
+            login_page = self._get(self.base_url + LOGIN_PAGE_PATH)
+            form = extract_login_form(login_page.text)
+
+            response = self.session.post(
+                urljoin(login_page.url, form["action"]),
+                data={
+                    "login": self.username,
+                    "password": self.password,
+                    "remember": "1",
+                    "_xfToken": form["token"],
+                    "_xfRedirect": url
+                },
+                timeout=self.page_load_timeout
+            )
+            response.raise_for_status()
+
+            if not is_logged_in(response.text):
+                print("Login error: credentials rejected")
+                return False
+
+            self._get(url)
+            return True
+        except Exception as e:
+            print(f"Login error: {e}")
+            return False
+
+    def restore_session(self, cookies: List[Dict], url: str) -> bool:
+        """Load saved cookies into the HTTP session and open the thread."""
+        self.session.cookies.clear()
+        for cookie in cookies:
+            self.session.cookies.set(
+                cookie["name"],
+                cookie["value"],
+                domain=cookie.get("domain"),
+                path=cookie.get("path", "/")
+            )
+
+        self._get(url)
+        return is_logged_in(self.page_source)
+
+    def list_threads(self, listing_url: str, max_pages: int = 10) -> List[Dict]:
+        """
+        Expand a forum listing into its threads, following pagination.
+        Logs in first (reusing a saved session) so member-only forums list fully.
+        """
+        self.init_driver()
+        if not self.ensure_login(listing_url):
+            raise RuntimeError("Login failed")
+
+        threads = []
+        seen = set()
+        page_url = listing_url
+        for _ in range(max_pages):
+            if page_url != listing_url:
+                self._get(page_url)
+
+            tree = parse_html(self.page_source)
+            for thread in extract_thread_links(tree, self.base_url):
+                if thread["url"] not in seen:
+                    seen.add(thread["url"])
+                    threads.append(thread)
+
+            page_url = extract_next_page_url(tree, self.base_url)
+            if not page_url:
+                break
+
+        return threads
+
+    def open_page(self, url: str):
+        """Fetch another page of the current thread."""
+        self._get(url)
+
+    def get_page_source(self) -> str:
+        """Return the HTML of the last page fetched."""
+        return self.page_source
+
+    def get_page_validators(self) -> Dict[str, str]:
+        """Return ETag/Last-Modified of the last page fetched."""
+        return self.page_validators
+
+    def get_cookies(self) -> List[Dict]:
+        """Return session cookies in the WebDriver cookie format."""
+        return [
+            {
+                "name": cookie.name,
+                "value": cookie.value,
+                "domain": cookie.domain,
+                "path": cookie.path,
+                "secure": cookie.secure,
+                "expiry": cookie.expires
+            }
+            for cookie in self.session.cookies
+        ]
+
+    def get_user_agent(self) -> Optional[str]:
+        """Return the user agent of the HTTP session."""
+        return self.session.headers.get("User-Agent")
+
+    def close(self):
+        """Close the HTTP session."""
+        if self.session:
+            self.session.close()
+            self.session = None
@@ -0,0 +1,158 @@
+"""Per-thread manifest of downloaded attachments."""
+import os
+import json
+import time
+import hashlib
+from typing import Dict, List, Optional, Tuple
+
+
+MANIFEST_NAME = "manifest.json"
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def file_sha256(path: str) -> str:
+    """SHA-256 hex digest of a file."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def thread_fingerprint(img_urls: List[str], validators: Optional[Dict[str, str]] = None) -> str:
+    """
+    Fingerprint a thread's attachment list.
+    Combines the set of attachment URLs with any HTTP validators (ETag,
+    Last-Modified) of the thread page; equal fingerprints mean nothing new
+    to download.
+    """
+    digest = hashlib.sha256()
+    for img_url in sorted(set(img_urls)):
+        digest.update(img_url.encode("utf-8") + b"\n")
+    for name, value in sorted((validators or {}).items()):
+        digest.update(f"{name.lower()}: {value}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+class ThreadManifest:
+    """
+    Record of every attachment of a thread: source URL, file name, byte
+    size, hash and status, plus the state of each thread PDF profile built
+    from them.
+    Each attachment URL keeps the image index it was first given, so a
+    rerun only fetches missing or failed items and a grown thread only
+    fetches its new attachments.
+    """
+
+    def __init__(self, images_folder: str):
+        self.images_folder = images_folder
+        self.path = os.path.join(images_folder, MANIFEST_NAME)
+        self.entries: Dict[str, Dict] = {}
+        self.pdfs: Dict[str, Dict] = {}
+        self.load()
+
+    def load(self):
+        """Read the manifest from disk (an absent manifest is empty)."""
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.entries = {entry["url"]: entry for entry in data.get("images", [])}
+            self.pdfs = data.get("pdfs") or {}
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Ignoring unreadable manifest {self.path}: {e}")
+            self.entries = {}
+            self.pdfs = {}
+
+    def save(self):
+        """Write the manifest atomically."""
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"images": self.ordered(), "pdfs": self.pdfs}, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def ordered(self) -> List[Dict]:
+        """Entries sorted by image index."""
+        return sorted(self.entries.values(), key=lambda entry: entry["index"])
+
+    def _is_complete(self, entry: Dict) -> bool:
+        """An entry is complete if it downloaded and its file is intact on disk."""
+        if entry.get("status") != "done" or not entry.get("filename"):
+            return False
+        path = os.path.join(self.images_folder, entry["filename"])
+        return os.path.exists(path) and os.path.getsize(path) == entry.get("size")
+
+    def plan(self, img_urls: List[str]) -> List[Tuple[int, str]]:
+        """
+        Register the thread's current attachment URLs.
+        New URLs get the next free index. Returns (index, url) pairs that
+        still need downloading, in index order.
+        """
+        current = set(img_urls)
+        next_index = max((entry["index"] for entry in self.entries.values()), default=0) + 1
+        for img_url in img_urls:
+            if img_url not in self.entries:
+                self.entries[img_url] = {
+                    "index": next_index,
+                    "url": img_url,
+                    "filename": None,
+                    "size": None,
+                    "sha256": None,
+                    "status": "pending"
+                }
+                next_index += 1
+
+        return [
+            (entry["index"], entry["url"])
+            for entry in self.ordered()
+            if entry["url"] in current and not self._is_complete(entry)
+        ]
+
+    def _entry_for_index(self, index: int) -> Dict:
+        """Find the entry holding an image index."""
+        for entry in self.entries.values():
+            if entry["index"] == index:
+                return entry
+        raise KeyError(f"No manifest entry for image {index}")
+
+    def record(self, index: int, path: Optional[str], error: Optional[str] = None) -> Dict:
+        """Record the outcome of downloading image `index` (path None = failed); returns its entry."""
+        entry = self._entry_for_index(index)
+        entry["updated_at"] = time.time()
+
+        if path and os.path.exists(path):
+            entry["filename"] = os.path.basename(path)
+            entry["size"] = os.path.getsize(path)
+            entry["sha256"] = file_sha256(path)
+            entry["status"] = "done"
+            entry.pop("error", None)
+        else:
+            entry["status"] = "failed"
+            entry["error"] = error or "Download failed"
+        return entry
+
+    def replace_file(self, index: int, path: str):
+        """
+        Point image `index` at a re-encoded copy with the same pixels.
+        Updates its file name, size and hash, and renames its page key in
+        the recorded PDFs so they can still be appended to.
+        """
+        entry = self._entry_for_index(index)
+        old_key = entry.get("sha256")
+        entry["filename"] = os.path.basename(path)
+        entry["size"] = os.path.getsize(path)
+        entry["sha256"] = file_sha256(path)
+        for state in self.pdfs.values():
+            state["pages"] = [
+                entry["sha256"] if key == old_key else key
+                for key in state.get("pages", [])
+            ]
+
+    def completed(self) -> List[Dict]:
+        """Complete entries in index order."""
+        return [entry for entry in self.ordered() if self._is_complete(entry)]
+
+    def failed(self) -> List[Dict]:
+        """Entries whose last download attempt failed."""
+        return [entry for entry in self.ordered() if entry.get("status") == "failed"]
@@ -0,0 +1,280 @@
+"""Packed thread containers: a thread's images in one file with an offset index."""
+import io
+import os
+import json
+import mmap
+import shutil
+import stat
+import struct
+import tempfile
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+from .manifest import MANIFEST_NAME
+from .utils import get_image_files
+
+
+# archive/images/{course}/{thread}.pack replaces the folder {thread}/
+PACK_EXTENSION = ".pack"
+PACK_MAGIC = b"FUOPACK1"
+# Layout: magic, image bytes back to back, JSON index, then this trailer
+# (index offset and length as little-endian uint64, magic again)
+TRAILER = struct.Struct("<QQ8s")
+COPY_CHUNK = 1024 * 1024
+
+
+def pack_path(images_folder: str) -> str:
+    """Container file of a thread folder."""
+    return images_folder.rstrip("/\\") + PACK_EXTENSION
+
+
+def is_packed(images_folder: str) -> bool:
+    """
+    True if a thread is read from its container: the container exists and
+    the thread folder, if any, holds no images (only files pack_thread
+    left behind). A folder with images takes precedence, e.g. after
+    extract_pack could not remove the container.
+    """
+    if not os.path.exists(pack_path(images_folder)):
+        return False
+    return not os.path.isdir(images_folder) or not get_image_files(images_folder)
+
+
+def write_pack(images_folder: str, path: str) -> List[Dict]:
+    """
+    Write a thread folder's images (in page order) and its manifest into a
+    container, atomically. The index records each image's mtime (see
+    is_pdf_current).
+    Returns: index entries {'name', 'offset', 'size', 'mtime'}
+    """
+    files = []
+    manifest = None
+    manifest_path = os.path.join(images_folder, MANIFEST_NAME)
+    if os.path.exists(manifest_path):
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+
+    tmp_path = f"{path}.part"
+    with open(tmp_path, "wb") as output:
+        output.write(PACK_MAGIC)
+        for name in get_image_files(images_folder):
+            source_path = os.path.join(images_folder, name)
+            mtime = os.path.getmtime(source_path)
+            offset = output.tell()
+            with open(source_path, "rb") as source:
+                shutil.copyfileobj(source, output, COPY_CHUNK)
+            files.append({"name": name, "offset": offset, "size": output.tell() - offset, "mtime": mtime})
+
+        index = json.dumps({"files": files, "manifest": manifest}).encode("utf-8")
+        index_offset = output.tell()
+        output.write(index)
+        output.write(TRAILER.pack(index_offset, len(index), PACK_MAGIC))
+        output.flush()
+        os.fsync(output.fileno())
+    os.replace(tmp_path, path)
+    return files
+
+
+class PackReader:
+    """
+    Read-only view of a container through a memory map. Reading an image
+    (or a byte range of it) only touches the pages it covers.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            if len(self._map) < len(PACK_MAGIC) + TRAILER.size or self._map[:len(PACK_MAGIC)] != PACK_MAGIC:
+                raise ValueError(f"Not a thread container: {path}")
+            index_offset, index_size, magic = TRAILER.unpack_from(self._map, len(self._map) - TRAILER.size)
+            if magic != PACK_MAGIC:
+                raise ValueError(f"Truncated thread container: {path}")
+            index = json.loads(self._map[index_offset:index_offset + index_size])
+        except Exception:
+            self.close()
+            raise
+        # Insertion order is page order
+        self.files: Dict[str, Dict] = {entry["name"]: entry for entry in index["files"]}
+        self.manifest: Optional[Dict] = index.get("manifest")
+
+    def names(self) -> List[str]:
+        """Image file names in page order."""
+        return list(self.files)
+
+    def entry(self, name: str) -> Optional[Dict]:
+        """Index entry of an image, or None."""
+        return self.files.get(name)
+
+    def mtime(self) -> float:
+        """Newest image mtime (for checking whether a PDF is current)."""
+        return max((entry["mtime"] for entry in self.files.values()), default=0.0)
+
+    def read(self, name: str, start: int = 0, end: Optional[int] = None) -> bytes:
+        """Bytes [start, end) of an image."""
+        entry = self.files[name]
+        end = entry["size"] if end is None else min(end, entry["size"])
+        return self._map[entry["offset"] + start:entry["offset"] + end]
+
+    def open(self, name: str) -> io.BytesIO:
+        """An image as a file object (e.g. for Image.open)."""
+        return io.BytesIO(self.read(name))
+
+    def close(self):
+        """Unmap and close the container."""
+        if getattr(self, "_map", None) is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+
+class PackReaders:
+    """
+    Open containers shared by requests, reopened when a container is
+    rewritten. Evicted readers are closed once no request uses them.
+    """
+
+    def __init__(self, max_open: int = 32):
+        self.max_open = max_open
+        self._readers: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path: str) -> Optional[PackReader]:
+        """Reader of a container, or None if it does not exist."""
+        try:
+            version = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            self.discard(path)
+            return None
+
+        with self._lock:
+            cached = self._readers.get(path)
+            if cached and cached[0] == version:
+                self._readers.move_to_end(path)
+                return cached[1]
+
+            reader = PackReader(path)
+            self._readers[path] = (version, reader)
+            self._readers.move_to_end(path)
+            while len(self._readers) > self.max_open:
+                self._readers.popitem(last=False)
+            return reader
+
+    def discard(self, path: str):
+        """Forget a container (before deleting or replacing it)."""
+        with self._lock:
+            self._readers.pop(path, None)
+
+
+def _extract(reader: PackReader, folder: str) -> List[str]:
+    """Write a container's images into `folder` with their mtimes; returns their paths."""
+    paths = []
+    for name, entry in reader.files.items():
+        path = os.path.join(folder, name)
+        tmp_path = f"{path}.part"
+        with open(tmp_path, "wb") as f:
+            f.write(reader.read(name))
+        os.utime(tmp_path, (entry["mtime"], entry["mtime"]))
+        os.replace(tmp_path, path)
+        paths.append(path)
+    return paths
+
+
+@contextmanager
+def unpacked_images(path: str) -> Iterator[List[str]]:
+    """Extract a container into a temporary folder; yields the image paths in page order."""
+    folder = tempfile.mkdtemp(prefix="fuo-pack-")
+    reader = PackReader(path)
+    try:
+        yield _extract(reader, folder)
+    finally:
+        reader.close()
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+def _remove_file(path: str):
+    """Remove a file, clearing a read-only flag first (Windows)."""
+    os.chmod(path, os.stat(path).st_mode | stat.S_IWRITE)
+    os.remove(path)
+
+
+def pack_thread(images_folder: str) -> Dict:
+    """
+    Replace a thread folder with its container. The container is read
+    back and compared with every file before the packed images and the
+    manifest are removed. Other files are kept and reported; the folder
+    is removed once empty. If an image cannot be removed, the removed ones
+    are restored from the container and the container is dropped, so the
+    folder is whole again.
+    Returns: {'files': ..., 'bytes': container size, 'leftovers': names}
+    """
+    path = pack_path(images_folder)
+    files = write_pack(images_folder, path)
+
+    reader = PackReader(path)
+    try:
+        for entry in files:
+            with open(os.path.join(images_folder, entry["name"]), "rb") as f:
+                if f.read() != reader.read(entry["name"]):
+                    raise ValueError(f"{entry['name']} changed while packing {images_folder}")
+    except Exception:
+        reader.close()
+        os.remove(path)
+        raise
+    reader.close()
+
+    removed = []
+    try:
+        for entry in files:
+            _remove_file(os.path.join(images_folder, entry["name"]))
+            removed.append(entry["name"])
+    except OSError:
+        reader = PackReader(path)
+        try:
+            for name in removed:
+                restored = os.path.join(images_folder, name)
+                with open(restored, "wb") as f:
+                    f.write(reader.read(name))
+                mtime = reader.files[name]["mtime"]
+                os.utime(restored, (mtime, mtime))
+        finally:
+            reader.close()
+        os.remove(path)
+        raise
+
+    manifest_path = os.path.join(images_folder, MANIFEST_NAME)
+    if os.path.exists(manifest_path):
+        _remove_file(manifest_path)
+    leftovers = sorted(os.listdir(images_folder))
+    if not leftovers:
+        os.rmdir(images_folder)
+    return {"files": len(files), "bytes": os.path.getsize(path), "leftovers": leftovers}
+
+
+def extract_pack(path: str, images_folder: str) -> int:
+    """
+    Restore a thread folder (images and manifest) from its container and
+    remove the container.
+    Returns: number of images restored
+    """
+    os.makedirs(images_folder, exist_ok=True)
+    reader = PackReader(path)
+    try:
+        paths = _extract(reader, images_folder)
+        if reader.manifest is not None:
+            manifest_path = os.path.join(images_folder, MANIFEST_NAME)
+            with open(f"{manifest_path}.tmp", "w", encoding="utf-8") as f:
+                json.dump(reader.manifest, f, indent=2)
+            os.replace(f"{manifest_path}.tmp", manifest_path)
+    finally:
+        reader.close()
+
+    try:
+        os.remove(path)
+    except OSError as e:
+        # e.g. still mapped by the server on Windows; the folder takes precedence
+        print(f"Could not remove container {path}: {e}")
+    return len(paths)
@@ -0,0 +1,638 @@
+"""Single-pass PDF writer that embeds image files as page XObjects."""
+import io
+import os
+import zlib
+import struct
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from itertools import islice
+from PIL import Image
+from pypdf import PdfReader
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple, Union
+
+
+# Page size is image pixels at this DPI (matches the previous Pillow output)
+DEFAULT_RESOLUTION = 100.0
+
+# Pages being prepared ahead of the writer, per worker process
+PREFETCH_PER_WORKER = 2
+
+# zlib level for images that cannot be passed through as-is
+FLATE_LEVEL = 6
+
+PDF_HEADER = b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n"
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# PNG colour types whose IDAT data PDF can read directly, and their components
+PNG_PASSTHROUGH_COLORS = {0: ("DeviceGray", 1), 2: ("DeviceRGB", 3)}
+
+# Named PDF output profiles.
+# color: 'auto' keeps colour images in colour, 'gray' converts every page.
+# encoding: 'lossless' (passthrough/Flate) or 'jpeg' at `quality`.
+# max_width/max_height: downsample larger images (page size is unchanged).
+# target_size: bytes; quality and dimensions are lowered until the PDF fits.
+PDF_PROFILES = {
+    "archival": {
+        "color": "auto",
+        "encoding": "lossless",
+        "quality": None,
+        "flate_level": FLATE_LEVEL,
+        "max_width": None,
+        "max_height": None,
+        "target_size": None
+    },
+    "screen": {
+        "color": "auto",
+        "encoding": "jpeg",
+        "quality": 80,
+        "flate_level": FLATE_LEVEL,
+        "max_width": 1600,
+        "max_height": 1600,
+        "target_size": None
+    },
+    "mobile": {
+        "color": "gray",
+        "encoding": "jpeg",
+        "quality": 60,
+        "flate_level": FLATE_LEVEL,
+        "max_width": 1080,
+        "max_height": 1440,
+        "target_size": 10 * 1024 * 1024
+    }
+}
+DEFAULT_PDF_PROFILE = "archival"
+
+# Attempts at shrinking a PDF to its profile's target size, and the floor
+# for JPEG quality while doing so
+TARGET_SIZE_ATTEMPTS = 4
+MIN_JPEG_QUALITY = 25
+
+# Object numbers reserved for the document catalog and page tree
+CATALOG_OBJ = 1
+PAGES_OBJ = 2
+
+
+def _num(value: float) -> str:
+    """Format a number for a PDF content stream."""
+    return f"{value:.4f}".rstrip("0").rstrip(".")
+
+
+def pdf_filename(name: str, profile: str = DEFAULT_PDF_PROFILE) -> str:
+    """File name of a thread PDF: `{name}.pdf`, or `{name}.{profile}.pdf` for variants."""
+    if profile == DEFAULT_PDF_PROFILE:
+        return f"{name}.pdf"
+    return f"{name}.{profile}.pdf"
+
+
+def _profile_settings(profile: Union[str, Dict]) -> Dict:
+    """Settings dict of a profile given by name (or already a dict)."""
+    return PDF_PROFILES[profile] if isinstance(profile, str) else profile
+
+
+def _fits(size: Tuple[int, int], settings: Dict) -> bool:
+    """Whether an image is within the profile's maximum dimensions."""
+    width, height = size
+    return (
+        (not settings.get("max_width") or width <= settings["max_width"])
+        and (not settings.get("max_height") or height <= settings["max_height"])
+    )
+
+
+def _jpeg_page(path: str, img: Image.Image) -> Optional[Dict]:
+    """Embed a baseline RGB/grayscale JPEG without re-encoding it."""
+    if img.format != "JPEG" or img.mode not in ("RGB", "L"):
+        return None
+
+    with open(path, "rb") as f:
+        data = f.read()
+    return {
+        "width": img.width,
+        "height": img.height,
+        "color_space": "DeviceRGB" if img.mode == "RGB" else "DeviceGray",
+        "filter": "DCTDecode",
+        "decode_parms": None,
+        "data": data
+    }
+
+
+def _png_page(path: str) -> Optional[Dict]:
+    """
+    Embed an 8-bit, non-interlaced RGB/grayscale PNG by copying its
+    compressed IDAT data (PDF applies the same PNG row predictors).
+    """
+    with open(path, "rb") as f:
+        if f.read(8) != PNG_SIGNATURE:
+            return None
+
+        header = None
+        chunks = []
+        while True:
+            length_bytes = f.read(8)
+            if len(length_bytes) < 8:
+                return None
+            length, chunk_type = struct.unpack(">I4s", length_bytes)
+            body = f.read(length)
+            f.read(4)  # CRC
+
+            if chunk_type == b"IHDR":
+                header = struct.unpack(">IIBBBBB", body)
+            elif chunk_type == b"IDAT":
+                chunks.append(body)
+            elif chunk_type == b"tRNS":
+                # Transparency has to be flattened, so decode instead
+                return None
+            elif chunk_type == b"IEND":
+                break
+
+    if header is None or not chunks:
+        return None
+    width, height, bit_depth, color_type, _, _, interlace = header
+    if bit_depth != 8 or interlace or color_type not in PNG_PASSTHROUGH_COLORS:
+        return None
+
+    color_space, colors = PNG_PASSTHROUGH_COLORS[color_type]
+    return {
+        "width": width,
+        "height": height,
+        "color_space": color_space,
+        "filter": "FlateDecode",
+        "decode_parms": f"<< /Predictor 15 /Colors {colors} /BitsPerComponent 8 /Columns {width} >>",
+        "data": b"".join(chunks)
+    }
+
+
+def flatten_image(img: Image.Image) -> Image.Image:
+    """Convert an image to RGB or L, drawing any transparency onto white."""
+    if img.mode in ("RGBA", "LA", "PA") or (img.mode == "P" and "transparency" in img.info):
+        rgba = img.convert("RGBA")
+        background = Image.new("RGB", rgba.size, "white")
+        background.paste(rgba, mask=rgba.getchannel("A"))
+        return background
+    if img.mode in ("L", "RGB"):
+        return img
+    if img.mode == "1":
+        return img.convert("L")
+    return img.convert("RGB")
+
+
+def transform_image(img: Image.Image, settings: Dict) -> Image.Image:
+    """Apply a profile's colour mode and maximum dimensions."""
+    img = flatten_image(img)
+    if settings.get("color") == "gray" and img.mode != "L":
+        img = img.convert("L")
+    if not _fits(img.size, settings):
+        img = img.copy()
+        img.thumbnail(
+            (settings.get("max_width") or img.width, settings.get("max_height") or img.height),
+            Image.LANCZOS
+        )
+    return img
+
+
+def encode_image(img: Image.Image, settings: Optional[Dict] = None) -> Dict:
+    """Compress decoded pixels as a page image (JPEG or Flate per profile)."""
+    settings = settings or PDF_PROFILES[DEFAULT_PDF_PROFILE]
+    img = flatten_image(img)
+    page = {
+        "width": img.width,
+        "height": img.height,
+        "color_space": "DeviceRGB" if img.mode == "RGB" else "DeviceGray",
+        "decode_parms": None
+    }
+
+    if settings.get("encoding") == "jpeg":
+        buffer = io.BytesIO()
+        img.save(buffer, "JPEG", quality=settings["quality"], optimize=True)
+        page.update(filter="DCTDecode", data=buffer.getvalue())
+    else:
+        level = settings.get("flate_level", FLATE_LEVEL)
+        page.update(filter="FlateDecode", data=zlib.compress(img.tobytes(), level))
+    return page
+
+
+def prepare_page(path: str, profile: Union[str, Dict] = DEFAULT_PDF_PROFILE) -> Dict:
+    """
+    Turn an image file into the stream data of one PDF page.
+    Images the profile leaves unchanged are embedded as-is where possible
+    (JPEGs, and simple PNGs for lossless profiles); everything else is
+    decoded, converted/downsampled and re-encoded. The page keeps the
+    original image's display size.
+    """
+    settings = _profile_settings(profile)
+    with Image.open(path) as img:
+        display_size = img.size
+        page = None
+        if _fits(img.size, settings) and (settings.get("color") != "gray" or img.mode == "L"):
+            page = _jpeg_page(path, img)
+            if page is None and img.format == "PNG" and settings.get("encoding") != "jpeg":
+                page = _png_page(path)
+        if page is None:
+            img.load()
+            page = encode_image(transform_image(img, settings), settings)
+
+    page["display_width"], page["display_height"] = display_size
+    return page
+
+
+def _prepare_or_skip(path: str, profile: Union[str, Dict]) -> Optional[Dict]:
+    """prepare_page() that reports and skips unreadable images."""
+    try:
+        return prepare_page(path, profile)
+    except Exception as e:
+        print(f"Error processing {os.path.basename(path)}: {e}")
+        return None
+
+
+def resolve_workers(workers: int) -> int:
+    """Worker process count; 0 or less means one per CPU core."""
+    return workers if workers > 0 else (os.cpu_count() or 1)
+
+
+def prepare_pages(
+    image_paths: List[str],
+    workers: int = 1,
+    executor: Optional[Executor] = None,
+    profile: Union[str, Dict] = DEFAULT_PDF_PROFILE
+) -> Iterator[Optional[Dict]]:
+    """
+    Yield prepared pages in the order of `image_paths` (None for skipped
+    images). With more than one worker, decoding and compression run in a
+    process pool while only a small window of pages is held in memory.
+    """
+    workers = resolve_workers(workers)
+    if executor is None and (workers <= 1 or len(image_paths) <= 1):
+        for path in image_paths:
+            yield _prepare_or_skip(path, profile)
+        return
+
+    own_executor = executor is None
+    if own_executor:
+        executor = ProcessPoolExecutor(max_workers=min(workers, len(image_paths)))
+
+    try:
+        paths = iter(image_paths)
+        pending = deque(
+            executor.submit(_prepare_or_skip, path, profile)
+            for path in islice(paths, workers * PREFETCH_PER_WORKER)
+        )
+        while pending:
+            page = pending.popleft().result()
+            for path in islice(paths, 1):
+                pending.append(executor.submit(_prepare_or_skip, path, profile))
+            yield page
+    finally:
+        if own_executor:
+            executor.shutdown(cancel_futures=True)
+
+
+class PDFBuilder:
+    """
+    Write a PDF page by page to a binary sink.
+    Only object offsets are kept between pages, so memory stays bounded
+    by the largest single image. The sink does not need to be seekable.
+    Given the state() of a finished document, the builder instead writes an
+    incremental update that appends pages to it.
+    """
+
+    def __init__(
+        self,
+        sink: BinaryIO,
+        resolution: float = DEFAULT_RESOLUTION,
+        state: Optional[Dict] = None
+    ):
+        self.sink = sink
+        self.resolution = resolution
+        self.offsets: Dict[int, int] = {}
+        self.closed = False
+
+        if state:
+            # Continue after the end of an existing document
+            self.page_objs: List[int] = list(state["page_objs"])
+            self.next_obj = state["next_obj"]
+            self.position = state["size"]
+            self.prev_xref: Optional[int] = state["xref_offset"]
+        else:
+            self.page_objs = []
+            self.next_obj = PAGES_OBJ + 1
+            self.position = 0
+            self.prev_xref = None
+            self._write(PDF_HEADER)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+
+    def _write(self, data: bytes):
+        self.sink.write(data)
+        self.position += len(data)
+
+    def _new_obj(self) -> int:
+        obj = self.next_obj
+        self.next_obj += 1
+        return obj
+
+    def _write_obj(self, obj: int, body: bytes, stream: Optional[bytes] = None):
+        """Write one indirect object, optionally followed by its stream."""
+        self.offsets[obj] = self.position
+        self._write(f"{obj} 0 obj\n".encode() + body)
+        if stream is not None:
+            self._write(b"\nstream\n")
+            self._write(stream)
+            self._write(b"\nendstream")
+        self._write(b"\nendobj\n")
+
+    def add_image(self, path: str):
+        """Append an image file as a new page."""
+        self.add_page(prepare_page(path))
+
+    def add_page(self, page: Dict):
+        """Append a page prepared by prepare_page()."""
+        image_obj = self._new_obj()
+        content_obj = self._new_obj()
+        page_obj = self._new_obj()
+
+        image_dict = (
+            f"<< /Type /XObject /Subtype /Image /Width {page['width']} "
+            f"/Height {page['height']} /ColorSpace /{page['color_space']} "
+            f"/BitsPerComponent 8 /Filter /{page['filter']} "
+        )
+        if page.get("decode_parms"):
+            image_dict += f"/DecodeParms {page['decode_parms']} "
+        image_dict += f"/Length {len(page['data'])} >>"
+        self._write_obj(image_obj, image_dict.encode(), page["data"])
+
+        width = page.get("display_width", page["width"]) * 72.0 / self.resolution
+        height = page.get("display_height", page["height"]) * 72.0 / self.resolution
+        content = f"q {_num(width)} 0 0 {_num(height)} 0 0 cm /Im0 Do Q".encode()
+        self._write_obj(content_obj, f"<< /Length {len(content)} >>".encode(), content)
+
+        self._write_obj(page_obj, (
+            f"<< /Type /Page /Parent {PAGES_OBJ} 0 R "
+            f"/MediaBox [0 0 {_num(width)} {_num(height)}] "
+            f"/Resources << /XObject << /Im0 {image_obj} 0 R >> >> "
+            f"/Contents {content_obj} 0 R >>"
+        ).encode())
+        self.page_objs.append(page_obj)
+
+    def _xref_sections(self) -> List[str]:
+        """Cross-reference lines for the objects written by this builder."""
+        # Every section restates the head of the free list (object 0)
+        entries = [(0, None)] + sorted(self.offsets.items())
+
+        lines = []
+        start = 0
+        while start < len(entries):
+            end = start + 1
+            while end < len(entries) and entries[end][0] == entries[end - 1][0] + 1:
+                end += 1
+            lines.append(f"{entries[start][0]} {end - start}\n")
+            for obj, offset in entries[start:end]:
+                if offset is None:
+                    lines.append("0000000000 65535 f \n")
+                else:
+                    lines.append(f"{offset:010d} 00000 n \n")
+            start = end
+        return lines
+
+    def close(self):
+        """Write the page tree, catalog, cross-reference table and trailer."""
+        if self.closed:
+            return
+        self.closed = True
+
+        kids = " ".join(f"{obj} 0 R" for obj in self.page_objs)
+        self._write_obj(
+            PAGES_OBJ,
+            f"<< /Type /Pages /Kids [{kids}] /Count {len(self.page_objs)} >>".encode()
+        )
+        if self.prev_xref is None:
+            self._write_obj(CATALOG_OBJ, f"<< /Type /Catalog /Pages {PAGES_OBJ} 0 R >>".encode())
+
+        xref_offset = self.position
+        trailer = f"/Size {self.next_obj} /Root {CATALOG_OBJ} 0 R"
+        if self.prev_xref is not None:
+            trailer += f" /Prev {self.prev_xref}"
+        lines = ["xref\n"] + self._xref_sections()
+        lines.append(f"trailer\n<< {trailer} >>\nstartxref\n{xref_offset}\n%%EOF\n")
+        self._write("".join(lines).encode())
+        self.xref_offset = xref_offset
+
+    def state(self) -> Dict:
+        """What a later builder needs to append to this document."""
+        return {
+            "size": self.position,
+            "xref_offset": self.xref_offset,
+            "next_obj": self.next_obj,
+            "page_objs": list(self.page_objs),
+            "resolution": self.resolution
+        }
+
+
+def _add_pages(
+    builder: PDFBuilder,
+    images: List[Tuple[str, str]],
+    workers: int,
+    executor: Optional[Executor],
+    profile: Union[str, Dict]
+) -> List[str]:
+    """Add (path, key) images as pages; returns the keys of pages added."""
+    keys = []
+    paths = [path for path, _ in images]
+    for (_, key), page in zip(images, prepare_pages(paths, workers, executor, profile)):
+        if page is not None:
+            builder.add_page(page)
+            keys.append(key)
+    return keys
+
+
+def _write_pdf(
+    images: List[Tuple[str, str]],
+    pdf_path: str,
+    resolution: float,
+    workers: int,
+    executor: Optional[Executor],
+    settings: Dict
+) -> Dict:
+    """Write (path, key) images to a new PDF atomically; returns its state."""
+    tmp_path = f"{pdf_path}.part"
+    with open(tmp_path, "wb") as f:
+        builder = PDFBuilder(f, resolution)
+        pages = _add_pages(builder, images, workers, executor, settings)
+        builder.close()
+
+    os.replace(tmp_path, pdf_path)
+    return {**builder.state(), "pages": pages}
+
+
+def _shrink(settings: Dict) -> Dict:
+    """Lower JPEG quality and maximum dimensions for another size attempt."""
+    smaller = dict(settings, encoding="jpeg")
+    smaller["quality"] = max(MIN_JPEG_QUALITY, int((settings.get("quality") or 90) * 0.75))
+    for key in ("max_width", "max_height"):
+        if settings.get(key):
+            smaller[key] = int(settings[key] * 0.8)
+    return smaller
+
+
+def build_pdf(
+    image_paths: List[str],
+    pdf_path: str,
+    resolution: float = DEFAULT_RESOLUTION,
+    workers: int = 1,
+    executor: Optional[Executor] = None,
+    keys: Optional[List[str]] = None,
+    profile: str = DEFAULT_PDF_PROFILE
+) -> Dict:
+    """
+    Write image files to `pdf_path` as one page each, atomically.
+    Pages are prepared by `workers` processes (or a shared `executor`) and
+    written in order. Images that cannot be read are skipped. If the
+    profile has a target size, the PDF is rebuilt at lower quality until
+    it fits (or TARGET_SIZE_ATTEMPTS runs out).
+    Returns the document state, whose 'pages' lists the key of every page
+    (`keys`, e.g. content hashes, default the file names).
+    """
+    if keys is None:
+        keys = [os.path.basename(path) for path in image_paths]
+    images = list(zip(image_paths, keys))
+
+    settings = PDF_PROFILES[profile]
+    state = _write_pdf(images, pdf_path, resolution, workers, executor, settings)
+
+    target_size = settings.get("target_size")
+    for _ in range(TARGET_SIZE_ATTEMPTS):
+        if not target_size or state["size"] <= target_size:
+            break
+        settings = _shrink(settings)
+        state = _write_pdf(images, pdf_path, resolution, workers, executor, settings)
+
+    return {**state, "profile": profile}
+
+
+def append_pdf(
+    images: List[Tuple[str, str]],
+    pdf_path: str,
+    state: Dict,
+    workers: int = 1
+) -> Dict:
+    """
+    Add (path, key) images as new pages at the end of an existing PDF with
+    an incremental update; earlier pages are not rewritten.
+    The file is truncated back if writing fails. Returns the new state.
+    """
+    profile = state.get("profile", DEFAULT_PDF_PROFILE)
+    with open(pdf_path, "r+b") as f:
+        f.seek(state["size"])
+        f.truncate()
+        try:
+            builder = PDFBuilder(f, state.get("resolution", DEFAULT_RESOLUTION), state)
+            pages = _add_pages(builder, images, workers, None, profile)
+            builder.close()
+        except BaseException:
+            f.truncate(state["size"])
+            raise
+
+    return {**builder.state(), "pages": state["pages"] + pages, "profile": profile}
+
+
+def can_append(
+    state: Optional[Dict],
+    pdf_path: str,
+    keys: List[str],
+    resolution: float,
+    profile: str = DEFAULT_PDF_PROFILE
+) -> bool:
+    """
+    Check that `pdf_path` is still the document described by `state` and
+    that its pages are the first pages of `keys`.
+    Profiles with a target size are always rebuilt, since appended pages
+    could push the file over it.
+    """
+    if not state or not state.get("pages") or not os.path.exists(pdf_path):
+        return False
+    if state.get("profile", DEFAULT_PDF_PROFILE) != profile or PDF_PROFILES[profile].get("target_size"):
+        return False
+    if state.get("resolution") != resolution or os.path.getsize(pdf_path) != state.get("size"):
+        return False
+    done = len(state["pages"])
+    return keys[:done] == state["pages"]
+
+
+def pdf_page_count(pdf_path: str) -> Optional[int]:
+    """Number of pages of a PDF (None if it cannot be read)."""
+    try:
+        return len(PdfReader(pdf_path).pages)
+    except Exception as e:
+        print(f"Error reading {pdf_path}: {e}")
+        return None
+
+
+def is_pdf_current(pdf_path: str, image_paths: List[str]) -> bool:
+    """
+    True if the PDF exists, has a page for every image and is not older
+    than any of them.
+    Code that rewrites an image file without changing its pixels keeps the
+    image's original mtime, so the PDFs already built from it stay current.
+    Code that puts new content in a file never moves its mtime back.
+    """
+    if not pdf_path or not os.path.exists(pdf_path):
+        return False
+    pdf_mtime = os.path.getmtime(pdf_path)
+    if not all(os.path.getmtime(path) <= pdf_mtime for path in image_paths):
+        return False
+    return pdf_page_count(pdf_path) == len(image_paths)
+
+
+def update_pdf(
+    images: List[Tuple[str, str]],
+    pdf_path: str,
+    state: Optional[Dict] = None,
+    resolution: float = DEFAULT_RESOLUTION,
+    workers: int = 1,
+    profile: str = DEFAULT_PDF_PROFILE
+) -> Dict:
+    """
+    Bring `pdf_path` up to date with (path, key) images in page order.
+    When the existing PDF already holds the first images (same keys), only
+    the new ones are appended; otherwise the PDF is rebuilt. Returns the new
+    state to pass to the next call.
+    """
+    keys = [key for _, key in images]
+    if can_append(state, pdf_path, keys, resolution, profile):
+        done = len(state["pages"])
+        if done == len(keys):
+            return state
+        return append_pdf(images[done:], pdf_path, state, workers)
+
+    return build_pdf(
+        [path for path, _ in images], pdf_path, resolution, workers,
+        keys=keys, profile=profile
+    )
+
+
+def build_pdfs(
+    documents: List[Tuple[List[str], str]],
+    workers: int = 0,
+    profile: str = DEFAULT_PDF_PROFILE
+) -> List[str]:
+    """
+    Build several PDFs, e.g. every thread of a course, sharing one process
+    pool. `documents` holds (image_paths, pdf_path) pairs. Returns the PDF
+    paths that were written.
+    """
+    workers = resolve_workers(workers)
+    built = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for image_paths, pdf_path in documents:
+            try:
+                build_pdf(
+                    image_paths, pdf_path, workers=workers, executor=executor,
+                    profile=profile
+                )
+                built.append(pdf_path)
+            except Exception as e:
+                print(f"Error building {pdf_path}: {e}")
+    return built
@@ -0,0 +1,193 @@
+"""Streaming download → convert → PDF pipeline for one thread."""
+import os
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from .pdf_builder import (
+    DEFAULT_PDF_PROFILE,
+    DEFAULT_RESOLUTION,
+    PREFETCH_PER_WORKER,
+    PDFBuilder,
+    _prepare_or_skip,
+    can_append,
+    resolve_workers
+)
+
+
+class PagePipeline:
+    """
+    Build a thread PDF while its images are still downloading.
+    `slots` are the pages in order as {'index', 'path', 'key'}; slots whose
+    image is not downloaded yet have path None and are filled in with
+    image_ready()/image_failed(). Ready images are converted on a process
+    pool and a writer thread adds them to the PDF in slot order, so total
+    time is close to max(download, convert) rather than their sum.
+    When the existing PDF (`state`) already holds the leading pages, only
+    the remaining ones are appended.
+    """
+
+    def __init__(
+        self,
+        slots: List[Dict],
+        pdf_path: str,
+        state: Optional[Dict] = None,
+        profile: str = DEFAULT_PDF_PROFILE,
+        workers: int = 1,
+        stage_callback: Optional[Callable[[Dict], None]] = None
+    ):
+        self.pdf_path = pdf_path
+        self.profile = profile
+        self.workers = resolve_workers(workers)
+        self.stage_callback = stage_callback
+
+        self.slots = [dict(slot, event=threading.Event()) for slot in slots]
+        for slot in self.slots:
+            if slot["path"]:
+                slot["event"].set()
+
+        # Leading pages already downloaded before this run
+        leading = []
+        for slot in self.slots:
+            if not slot["path"]:
+                break
+            leading.append(slot["key"])
+        self.state = state if can_append(
+            state, pdf_path, leading, DEFAULT_RESOLUTION, profile
+        ) else None
+        self.done_pages = len(self.state["pages"]) if self.state else 0
+
+        self._by_index = {slot["index"]: slot for slot in self.slots}
+        self._lock = threading.Lock()
+        self._counts = {"convert": 0, "written": 0}
+        self._error: Optional[BaseException] = None
+        self._result: Optional[Dict] = None
+        self._thread = threading.Thread(target=self._run, name="pdf-pipeline", daemon=True)
+
+    def start(self):
+        """Start the writer thread."""
+        self._thread.start()
+
+    def image_ready(self, index: int, path: Optional[str], key: Optional[str] = None):
+        """Hand over a downloaded image (path None marks it as failed)."""
+        slot = self._by_index[index]
+        slot["path"] = path
+        slot["key"] = key
+        slot["event"].set()
+        self._report()
+
+    def image_failed(self, index: int):
+        """Mark an image as failed; its page is left out."""
+        self.image_ready(index, None)
+
+    def stages(self) -> Dict[str, int]:
+        """
+        Queue depth of each stage: images still downloading, pages being
+        converted (or converted and waiting for their turn), pages written.
+        Returns: {'download': 3, 'convert': 2, 'written': 10}
+        """
+        waiting = sum(1 for slot in self.slots if not slot["event"].is_set())
+        with self._lock:
+            return {"download": waiting, **self._counts}
+
+    def _report(self):
+        if self.stage_callback:
+            self.stage_callback(self.stages())
+
+    def _count(self, stage: str, delta: int):
+        with self._lock:
+            self._counts[stage] += delta
+        self._report()
+
+    def _convert(self, executor, slot: Dict):
+        """Start preparing a slot's page (inline when there is no pool)."""
+        if not slot["path"]:
+            return None
+        self._count("convert", 1)
+        if executor is None:
+            return _prepare_or_skip(slot["path"], self.profile)
+        return executor.submit(_prepare_or_skip, slot["path"], self.profile)
+
+    def _run(self):
+        """Writer thread: convert ready slots ahead, write pages in order."""
+        slots = self.slots[self.done_pages:]
+        executor = None
+        if self.workers > 1 and len(slots) > 1:
+            executor = ProcessPoolExecutor(max_workers=min(self.workers, len(slots)))
+
+        appending = self.state is not None
+        tmp_path = self.pdf_path if appending else f"{self.pdf_path}.part"
+        mode = "r+b" if appending else "wb"
+        limit = self.workers * PREFETCH_PER_WORKER
+        keys = list(self.state["pages"]) if appending else []
+
+        try:
+            with open(tmp_path, mode) as f:
+                if appending:
+                    f.seek(self.state["size"])
+                    f.truncate()
+                builder = PDFBuilder(f, DEFAULT_RESOLUTION, self.state)
+
+                window = deque()
+                next_slot = 0
+                while True:
+                    # Queue conversions for every slot whose image is ready
+                    while (
+                        next_slot < len(slots)
+                        and len(window) < limit
+                        and slots[next_slot]["event"].is_set()
+                    ):
+                        slot = slots[next_slot]
+                        window.append((slot, self._convert(executor, slot)))
+                        next_slot += 1
+
+                    if window:
+                        slot, pending = window.popleft()
+                        if slot["path"]:
+                            page = pending.result() if executor else pending
+                            self._count("convert", -1)
+                            if page is not None:
+                                builder.add_page(page)
+                                keys.append(slot["key"])
+                                self._count("written", 1)
+                        continue
+
+                    if next_slot == len(slots):
+                        break
+                    slots[next_slot]["event"].wait()
+
+                builder.close()
+        except BaseException as e:
+            self._error = e
+            if appending:
+                with open(tmp_path, "r+b") as f:
+                    f.truncate(self.state["size"])
+            elif os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+
+        if not appending:
+            if not keys:
+                # Nothing could be downloaded; keep any existing PDF
+                os.remove(tmp_path)
+                return
+            os.replace(tmp_path, self.pdf_path)
+        self._result = {**builder.state(), "pages": keys, "profile": self.profile}
+        self._report()
+
+    def finish(self) -> Optional[Dict]:
+        """
+        Mark any slot still waiting as failed, wait for the PDF and return
+        its state (as build_pdf/update_pdf do), or None if it has no pages.
+        """
+        for slot in self.slots:
+            if not slot["event"].is_set():
+                self.image_failed(slot["index"])
+        self._thread.join()
+        if self._error is not None:
+            raise self._error
+        return self._result
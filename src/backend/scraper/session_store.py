@@ -0,0 +1,73 @@
+"""On-disk cache of authenticated forum sessions, keyed by account."""
+import os
+import json
+import time
+import hashlib
+from typing import Dict, List, Optional
+
+
+# Sessions older than this are treated as expired even if cookies say otherwise
+DEFAULT_MAX_AGE = 7 * 24 * 3600
+
+
+class SessionStore:
+    """Save and restore login cookies so scrape jobs can skip the login flow."""
+
+    def __init__(self, folder: str = None, max_age: int = DEFAULT_MAX_AGE):
+        if folder is None:
+            folder = os.getenv("SESSION_DIR", os.path.join("archive", "sessions"))
+        self.folder = folder
+        self.max_age = max_age
+
+    def _path(self, username: str) -> str:
+        """Session file for an account (the username is hashed, not stored)."""
+        key = hashlib.sha256(username.lower().encode("utf-8")).hexdigest()[:32]
+        return os.path.join(self.folder, f"{key}.json")
+
+    def load(self, username: str) -> Optional[List[Dict]]:
+        """
+        Return saved cookies for the account, or None if there is no
+        session or it has expired.
+        """
+        path = self._path(username)
+        if not os.path.exists(path):
+            return None
+
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Could not read saved session: {e}")
+            return None
+
+        now = time.time()
+        if now - data.get("saved_at", 0) > self.max_age:
+            self.invalidate(username)
+            return None
+
+        cookies = [
+            cookie for cookie in data.get("cookies", [])
+            if not cookie.get("expiry") or cookie["expiry"] > now
+        ]
+        if not cookies:
+            self.invalidate(username)
+            return None
+
+        return cookies
+
+    def save(self, username: str, cookies: List[Dict]):
+        """Save the account's cookies, replacing any previous session."""
+        os.makedirs(self.folder, exist_ok=True)
+        path = self._path(username)
+        tmp_path = f"{path}.tmp"
+
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"saved_at": time.time(), "cookies": cookies}, f)
+        os.chmod(tmp_path, 0o600)
+        os.replace(tmp_path, path)
+
+    def invalidate(self, username: str):
+        """Forget the account's saved session."""
+        path = self._path(username)
+        if os.path.exists(path):
+            os.remove(path)
@@ -0,0 +1,111 @@
+"""Lossless re-encoding of archived images into more compact files."""
+import os
+from typing import Dict, Optional
+from PIL import Image
+
+from .downloader import remove_stale_files
+from .manifest import ThreadManifest
+from .utils import get_image_files, remove_temp_files
+
+
+# Target format -> (file extension, Pillow save options)
+TRANSCODE_FORMATS = {
+    "webp": (".webp", {"format": "WEBP", "lossless": True, "quality": 100, "method": 4}),
+    "png": (".png", {"format": "PNG", "optimize": True}),
+}
+
+# JPEGs are already lossy; re-encoding their pixels losslessly only grows
+# them. GIFs may be animated, and only their first frame would be re-encoded
+# (and compared by same_pixels).
+SKIPPED_EXTENSIONS = (".jpg", ".jpeg", ".gif")
+
+
+def same_pixels(path_a: str, path_b: str) -> bool:
+    """True if two image files decode to identical pixels."""
+    with Image.open(path_a) as a, Image.open(path_b) as b:
+        if a.size != b.size:
+            return False
+        return a.convert("RGBA").tobytes() == b.convert("RGBA").tobytes()
+
+
+def transcode_image(path: str, image_format: str) -> Optional[str]:
+    """
+    Re-encode one image losslessly next to the original.
+    The new file is kept only if it is smaller and decodes to the same
+    pixels; it keeps the original's mtime (see is_pdf_current). The temp
+    file's name is not an image name, so folder listings never see it.
+    Returns: path of the new file (the original still exists) or None if
+    the original should be kept.
+    """
+    ext, options = TRANSCODE_FORMATS[image_format]
+    new_path = os.path.splitext(path)[0] + ext
+    tmp_path = f"{new_path}.transcode"
+
+    try:
+        with Image.open(path) as img:
+            img.save(tmp_path, **options)
+
+        if os.path.getsize(tmp_path) >= os.path.getsize(path) or not same_pixels(path, tmp_path):
+            return None
+
+        stat = os.stat(path)
+        os.utime(tmp_path, (stat.st_atime, stat.st_mtime))
+        os.replace(tmp_path, new_path)
+        return new_path
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def transcode_thread(images_folder: str, image_format: str = "webp") -> Dict[str, int]:
+    """
+    Transcode every eligible image of a thread folder.
+    Each replacement is recorded in the thread manifest (file name, size,
+    hash, and the page keys of its PDFs) before the old file is removed,
+    so an interrupted run leaves the manifest pointing at a valid file.
+    Returns: {'files': 3, 'bytes_before': ..., 'bytes_after': ...}
+    """
+    ext = TRANSCODE_FORMATS[image_format][0]
+    remove_temp_files(images_folder, "transcode")
+    manifest = ThreadManifest(images_folder)
+    entries = {}
+    for entry in manifest.ordered():
+        if not entry.get("filename"):
+            continue
+        entries[entry["filename"]] = entry
+        # Drop the old copy left behind by an interrupted run
+        path = os.path.join(images_folder, entry["filename"])
+        if os.path.exists(path):
+            remove_stale_files(images_folder, entry["index"], path)
+
+    report = {"files": 0, "bytes_before": 0, "bytes_after": 0}
+    for filename in get_image_files(images_folder):
+        lower = filename.lower()
+        if lower.endswith(SKIPPED_EXTENSIONS):
+            continue
+        # Files already in the target format are only rewritten as PNG (optimize)
+        if lower.endswith(ext) and image_format != "png":
+            continue
+
+        path = os.path.join(images_folder, filename)
+        size_before = os.path.getsize(path)
+        try:
+            new_path = transcode_image(path, image_format)
+        except Exception as e:
+            print(f"Error transcoding {path}: {e}")
+            continue
+        if new_path is None:
+            continue
+
+        entry = entries.get(filename)
+        if entry:
+            manifest.replace_file(entry["index"], new_path)
+            manifest.save()
+        if new_path != path:
+            os.remove(path)
+
+        report["files"] += 1
+        report["bytes_before"] += size_before
+        report["bytes_after"] += os.path.getsize(new_path)
+
+    return report
@@ -2,6 +2,29 @@
 import os
 from typing import List, Dict
 
+# Image file extensions stored in the archive
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.webp')
+
+
+def get_image_files(images_folder: str) -> List[str]:
+    """Image file names in a thread folder, sorted by image number."""
+    return sorted(
+        [f for f in os.listdir(images_folder) if f.lower().endswith(IMAGE_EXTENSIONS)],
+        key=lambda x: int(x.split('.')[0]) if x.split('.')[0].isdigit() else 0
+    )
+
+
+def remove_temp_files(images_folder: str, tag: str):
+    """
+    Remove `{name}.{tag}` temp files left in a thread folder by an
+    interrupted run, and the `{stem}.{tag}{ext}` names used before, which
+    were listed as images.
+    """
+    for name in os.listdir(images_folder):
+        stem, ext = os.path.splitext(name)
+        if ext == f".{tag}" or (ext.lower() in IMAGE_EXTENSIONS and stem.endswith(f".{tag}")):
+            os.remove(os.path.join(images_folder, name))
+
 
 def get_all_courses() -> Dict[str, List[Dict]]:
     """
@@ -38,7 +61,7 @@ def get_all_courses() -> Dict[str, List[Dict]]:
             # Count images
             image_files = [
                 f for f in os.listdir(thread_path)
-                if f.endswith(('.jpg', '.jpeg', '.png'))
+                if f.lower().endswith(IMAGE_EXTENSIONS)
             ]
             image_count = len(image_files)
             
@@ -68,7 +91,7 @@ def get_thread_images(course_code: str, thread_name: str) -> List[str]:
         return []
     
     image_files = sorted(
-        [f for f in os.listdir(images_path) if f.endswith(('.jpg', '.jpeg', '.png'))],
+        [f for f in os.listdir(images_path) if f.lower().endswith(IMAGE_EXTENSIONS)],
         key=lambda x: int(x.split('.')[0]) if x.split('.')[0].isdigit() else 0
     )
     
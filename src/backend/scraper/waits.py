@@ -0,0 +1,89 @@
+"""Event-driven browser waits that record how long each one took."""
+import time
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from typing import Callable, Dict, List
+
+
+# Attachment links on a XenForo thread page
+ATTACHMENT_SELECTOR = "a.file-preview.js-lbImage"
+
+# True once the page's first image has decoded to real pixels
+IMAGE_LOADED_SCRIPT = """
+const img = document.images[0];
+return Boolean(img && img.complete && img.naturalWidth > 0);
+"""
+
+
+class WaitRecorder:
+    """
+    Wait for page conditions instead of sleeping for fixed durations.
+    Timeouts are upper bounds: each wait returns as soon as its condition
+    holds. Every wait is recorded so a run can report where time went.
+    """
+
+    def __init__(self, poll_frequency: float = 0.1):
+        self.poll_frequency = poll_frequency
+        self.timings: List[Dict] = []
+
+    def wait_until(self, driver, name: str, condition: Callable, timeout: float) -> bool:
+        """Wait until condition(driver) is truthy. Returns False on timeout."""
+        start = time.perf_counter()
+        try:
+            WebDriverWait(driver, timeout, poll_frequency=self.poll_frequency).until(condition)
+            met = True
+        except TimeoutException:
+            met = False
+
+        self.timings.append({
+            "name": name,
+            "seconds": round(time.perf_counter() - start, 3),
+            "timed_out": not met
+        })
+        return met
+
+    def document_ready(self, driver, timeout: float) -> bool:
+        """Wait for document.readyState to be 'complete'."""
+        return self.wait_until(
+            driver,
+            "document_ready",
+            lambda d: d.execute_script("return document.readyState;") == "complete",
+            timeout
+        )
+
+    def image_loaded(self, driver, timeout: float) -> bool:
+        """Wait for the page's image to finish loading with a non-zero size."""
+        return self.wait_until(
+            driver,
+            "image_loaded",
+            lambda d: d.execute_script(IMAGE_LOADED_SCRIPT),
+            timeout
+        )
+
+    def attachments_present(self, driver, timeout: float) -> bool:
+        """Wait for the thread's attachment links to be in the DOM."""
+        return self.wait_until(
+            driver,
+            "attachments_present",
+            EC.presence_of_element_located((By.CSS_SELECTOR, ATTACHMENT_SELECTOR)),
+            timeout
+        )
+
+    def summary(self) -> Dict[str, Dict]:
+        """
+        Aggregate recorded waits by name.
+        Returns: {'image_loaded': {'count': 10, 'total': 3.2, 'max': 0.8, 'timeouts': 0}, ...}
+        """
+        stats: Dict[str, Dict] = {}
+        for timing in self.timings:
+            entry = stats.setdefault(
+                timing["name"],
+                {"count": 0, "total": 0.0, "max": 0.0, "timeouts": 0}
+            )
+            entry["count"] += 1
+            entry["total"] = round(entry["total"] + timing["seconds"], 3)
+            entry["max"] = max(entry["max"], timing["seconds"])
+            entry["timeouts"] += int(timing["timed_out"])
+        return stats
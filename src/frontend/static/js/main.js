@@ -155,9 +155,11 @@ async function startScrape() {
         const itemDelay = parseInt(document.getElementById('itemDelay')?.value || '2');
         const pageLoadTimeout = parseInt(document.getElementById('pageLoadTimeout')?.value || '10');
         const elementTimeout = parseInt(document.getElementById('elementTimeout')?.value || '10');
+        const directDownload = document.getElementById('directDownload')?.checked || false;
+        const imageOnly = document.getElementById('imageOnly')?.checked || false;
         
         // Save settings to localStorage
-        saveSettings(headless, allInOneMode, batchSize, itemDelay, pageLoadTimeout, elementTimeout);
+        saveSettings(headless, allInOneMode, batchSize, itemDelay, pageLoadTimeout, elementTimeout, directDownload, imageOnly);
         
         const response = await fetch('/api/scrape', {
             method: 'POST',
@@ -171,7 +173,9 @@ async function startScrape() {
                 batch_size: batchSize,
                 item_delay: itemDelay,
                 page_load_timeout: pageLoadTimeout,
-                element_timeout: elementTimeout
+                element_timeout: elementTimeout,
+                download_mode: directDownload ? 'http' : 'screenshot',
+                capture_mode: imageOnly ? 'element' : 'viewport'
             })
         });
         
@@ -208,7 +212,10 @@ async function checkScrapingProgress() {
         if (data.success) {
             const task = data.task;
             
-            if (task.status === 'running') {
+            if (task.status === 'queued') {
+                showStatus('info', 'Đang chờ trong hàng đợi...');
+            } else if (task.status === 'running') {
+                showStatus('info', 'Đang scrape... Vui lòng chờ.');
                 updateProgress(task.progress, task.total);
             } else if (task.status === 'completed') {
                 clearInterval(scrapingInterval);
@@ -425,14 +432,16 @@ function setupViewToggle() {
 }
 
 // Save settings to localStorage
-function saveSettings(headless, allInOneMode, batchSize, itemDelay, pageLoadTimeout, elementTimeout) {
+function saveSettings(headless, allInOneMode, batchSize, itemDelay, pageLoadTimeout, elementTimeout, directDownload, imageOnly) {
     const settings = {
         headless,
         allInOneMode,
         batchSize,
         itemDelay,
         pageLoadTimeout,
-        elementTimeout
+        elementTimeout,
+        directDownload,
+        imageOnly
     };
     localStorage.setItem('fuoScraperSettings', JSON.stringify(settings));
 }
@@ -452,8 +461,12 @@ function loadSettings() {
             const itemDelayInput = document.getElementById('itemDelay');
             const pageLoadTimeoutInput = document.getElementById('pageLoadTimeout');
             const elementTimeoutInput = document.getElementById('elementTimeout');
+            const directDownloadCheckbox = document.getElementById('directDownload');
+            const imageOnlyCheckbox = document.getElementById('imageOnly');
             
             if (headlessCheckbox) headlessCheckbox.checked = settings.headless !== undefined ? settings.headless : true;
+            if (directDownloadCheckbox) directDownloadCheckbox.checked = settings.directDownload || false;
+            if (imageOnlyCheckbox) imageOnlyCheckbox.checked = settings.imageOnly || false;
             if (allInOneCheckbox) {
                 allInOneCheckbox.checked = settings.allInOneMode || false;
                 toggleBatchSize();
@@ -473,8 +486,12 @@ function loadSettings() {
         const itemDelayInput = document.getElementById('itemDelay');
         const pageLoadTimeoutInput = document.getElementById('pageLoadTimeout');
         const elementTimeoutInput = document.getElementById('elementTimeout');
+        const directDownloadCheckbox = document.getElementById('directDownload');
+        const imageOnlyCheckbox = document.getElementById('imageOnly');
         
         if (headlessCheckbox) headlessCheckbox.checked = true;
+        if (directDownloadCheckbox) directDownloadCheckbox.checked = false;
+        if (imageOnlyCheckbox) imageOnlyCheckbox.checked = false;
         if (allInOneCheckbox) allInOneCheckbox.checked = false;
         if (batchSizeInput) batchSizeInput.value = 10;
         if (itemDelayInput) itemDelayInput.value = 2;
@@ -491,11 +508,13 @@ function resetSettings() {
     document.getElementById('itemDelay').value = 2;
     document.getElementById('pageLoadTimeout').value = 5;
     document.getElementById('elementTimeout').value = 5;
+    document.getElementById('directDownload').checked = false;
+    document.getElementById('imageOnly').checked = false;
     
     toggleBatchSize();
     
     // Save defaults
-    saveSettings(true, false, 10, 2, 5, 5);
+    saveSettings(true, false, 10, 2, 5, 5, false, false);
     
     showStatus('info', 'Đã reset về cài đặt mặc định');
 }
@@ -508,9 +527,11 @@ function saveSettingsAndClose() {
     const itemDelay = parseInt(document.getElementById('itemDelay').value);
     const pageLoadTimeout = parseInt(document.getElementById('pageLoadTimeout').value);
     const elementTimeout = parseInt(document.getElementById('elementTimeout').value);
+    const directDownload = document.getElementById('directDownload').checked;
+    const imageOnly = document.getElementById('imageOnly').checked;
     
     // Save to localStorage
-    saveSettings(headless, allInOneMode, batchSize, itemDelay, pageLoadTimeout, elementTimeout);
+    saveSettings(headless, allInOneMode, batchSize, itemDelay, pageLoadTimeout, elementTimeout, directDownload, imageOnly);
     
     // Show success message
     showStatus('success', 'Đã lưu cài đặt thành công!');
@@ -313,6 +313,11 @@ function setupLayoutOptions() {
     });
 }
 
+// URL of a downscaled copy of an image ('thumb' or 'medium')
+function resizedImageUrl(imgSrc, size) {
+    return `${imgSrc}?size=${size}`;
+}
+
 // Show all images in scroll mode
 function showAllImagesScroll() {
     const container = document.querySelector('.image-container');
@@ -320,7 +325,8 @@ function showAllImagesScroll() {
     
     images.forEach((imgSrc, index) => {
         const img = document.createElement('img');
-        img.src = imgSrc;
+        img.src = resizedImageUrl(imgSrc, 'medium');
+        img.loading = 'lazy';
         img.alt = `Image ${index + 1}`;
         container.appendChild(img);
     });
@@ -336,7 +342,8 @@ function showAllImagesGrid() {
         gridItem.className = 'grid-item';
         
         const img = document.createElement('img');
-        img.src = imgSrc;
+        img.src = resizedImageUrl(imgSrc, 'thumb');
+        img.loading = 'lazy';
         img.alt = `Image ${index + 1}`;
         
         gridItem.appendChild(img);
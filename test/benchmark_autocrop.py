@@ -0,0 +1,107 @@
+"""
+Measure the per-image cost of auto-cropping 1920x1080 screenshots.
+
+Usage:
+    python test/benchmark_autocrop.py [screenshot.png ...] [--frames 20] [--runs 5]
+
+Without files, synthetic frames are generated with a fixed seed: an
+attachment of random size centred on a dark browser background.
+"""
+import os
+import sys
+import time
+import random
+import shutil
+import argparse
+import tempfile
+from PIL import Image, ImageChops, ImageDraw
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src", "backend"))
+
+from scraper.autocrop import batch_boxes, content_box, crop_batch, load_pixels  # noqa: E402
+
+
+FRAME_SIZE = (1920, 1080)
+BACKGROUND = (14, 14, 14)
+
+
+def synthetic_frames(folder: str, count: int, seed: int = 0):
+    """Write `count` screenshot-like PNGs and return their paths."""
+    rng = random.Random(seed)
+    paths = []
+    for i in range(1, count + 1):
+        frame = Image.new("RGB", FRAME_SIZE, BACKGROUND)
+        width, height = rng.randint(700, 1400), rng.randint(500, 1000)
+        left = (FRAME_SIZE[0] - width) // 2
+        top = (FRAME_SIZE[1] - height) // 2
+        draw = ImageDraw.Draw(frame)
+        draw.rectangle((left, top, left + width - 1, top + height - 1), fill="white")
+        for y in range(top + 20, top + height - 20, 24):
+            draw.text((left + 20, y), f"Question {i}: choose the correct answer " * 2, fill="black")
+        path = os.path.join(folder, f"{i}.png")
+        frame.save(path)
+        paths.append(path)
+    return paths
+
+
+def pil_box(path: str):
+    """Pillow-only baseline: difference against the corner colour."""
+    with Image.open(path) as img:
+        img = img.convert("RGB")
+        background = Image.new("RGB", img.size, img.getpixel((0, 0)))
+        return ImageChops.difference(img, background).point(lambda v: 255 if v > 12 else 0).getbbox()
+
+
+def best_ms(func, items, runs: int) -> float:
+    """Best time per item in milliseconds."""
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        for item in items:
+            func(item)
+        best = min(best, (time.perf_counter() - start) / len(items))
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("files", nargs="*", help="screenshots to measure")
+    parser.add_argument("--frames", type=int, default=20)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    folder = tempfile.mkdtemp(prefix="autocrop-")
+    try:
+        sources = args.files or synthetic_frames(folder, args.frames)
+        paths = []
+        for i, source in enumerate(sources, 1):
+            path = os.path.join(folder, f"work-{i}{os.path.splitext(source)[1]}")
+            shutil.copyfile(source, path)
+            paths.append(path)
+
+        pixels = [load_pixels(path) for path in paths]
+        print(f"{len(paths)} frames of {pixels[0].shape[1]}x{pixels[0].shape[0]}")
+        print(f"  decode:            {best_ms(load_pixels, paths, args.runs):8.2f} ms/image")
+        print(f"  NumPy content box: {best_ms(content_box, pixels, args.runs):8.2f} ms/image")
+        print(f"  Pillow baseline:   {best_ms(pil_box, paths, args.runs):8.2f} ms/image")
+
+        boxes = batch_boxes(paths)
+        shuffled = batch_boxes(random.Random(1).sample(paths, len(paths)))
+        print(f"  reproducible:      {boxes == shuffled}")
+
+        before = sum(array.shape[0] * array.shape[1] for array in pixels)
+        start = time.perf_counter()
+        cropped = crop_batch(paths)
+        elapsed = (time.perf_counter() - start) / len(paths) * 1000
+        after = 0
+        for path in paths:
+            with Image.open(path) as img:
+                after += img.width * img.height
+        print(f"  batch crop + save: {elapsed:8.2f} ms/image ({len(cropped)} cropped)")
+        print(f"  pixels kept:       {after / before:8.1%}")
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
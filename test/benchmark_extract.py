@@ -0,0 +1,98 @@
+"""
+Compare attachment extraction: full BeautifulSoup parse vs lxml XPath.
+
+Usage:
+    python test/benchmark_extract.py [saved_thread.html ...] [--runs 20]
+
+Without files, a synthetic thread page with 500 posts is generated.
+"""
+import os
+import sys
+import time
+import argparse
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src", "backend"))
+
+from scraper.extract import extract_thread_page  # noqa: E402
+
+
+BASE_URL = "https://fuoverflow.com"
+
+
+def synthetic_page(posts: int = 500) -> str:
+    """Build a XenForo-like thread page with one attachment per post."""
+    body = []
+    for i in range(1, posts + 1):
+        body.append(
+            f'<article class="message message--post" data-content="post-{i}">'
+            f'<div class="message-userContent"><div class="bbWrapper">'
+            f'{"Lorem ipsum dolor sit amet. " * 20}</div>'
+            f'<ul class="attachmentList"><li class="file file--linked">'
+            f'<a class="file-preview js-lbImage" href="/attachments/{i}-jpg.{1000 + i}/">'
+            f'<img src="/data/attachments/{i}.jpg" alt="{i}.jpg"></a></li></ul>'
+            f'</div></article>'
+        )
+    return (
+        '<!DOCTYPE html><html data-logged-in="true"><head><title>Thread</title></head><body>'
+        + "".join(body)
+        + '<nav class="pageNav"><a class="pageNav-jump pageNav-jump--next" '
+        'href="/threads/jpd113-su25-b5-mc.4934/page-2">Next</a></nav></body></html>'
+    )
+
+
+def extract_bs4(html: str):
+    """The previous approach: build a BeautifulSoup tree and search it."""
+    soup = BeautifulSoup(html, "lxml")
+    img_urls = []
+    for img in soup.find_all("a", class_="file-preview js-lbImage"):
+        if img.has_attr("href"):
+            img_url = img["href"]
+            if not img_url.startswith("http"):
+                img_url = BASE_URL + img_url
+            img_urls.append(img_url)
+    return img_urls
+
+
+def extract_lxml(html: str):
+    """The XPath extraction layer."""
+    return extract_thread_page(html, BASE_URL)[0]
+
+
+def bench(func, html: str, runs: int) -> float:
+    """Best time per call in milliseconds."""
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        func(html)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("files", nargs="*", help="saved thread pages (HTML)")
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    pages = []
+    for path in args.files:
+        with open(path, "r", encoding="utf-8") as f:
+            pages.append((os.path.basename(path), f.read()))
+    if not pages:
+        pages.append(("synthetic (500 posts)", synthetic_page()))
+
+    for name, html in pages:
+        old_urls = extract_bs4(html)
+        new_urls = extract_lxml(html)
+        same = list(dict.fromkeys(old_urls)) == new_urls
+
+        old_ms = bench(extract_bs4, html, args.runs)
+        new_ms = bench(extract_lxml, html, args.runs)
+        print(f"{name}: {len(html) / 1024:.0f} KiB, {len(new_urls)} attachments, same result: {same}")
+        print(f"  BeautifulSoup: {old_ms:8.2f} ms")
+        print(f"  lxml XPath:    {new_ms:8.2f} ms  ({old_ms / new_ms:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+"""
+Regression test of the browserless HTTP backend against a local stand-in
+XenForo server (CSRF login form, paginated thread and listing pages, and
+attachments that require the login cookie).
+
+Usage:
+    python -m pytest test/test_http_scraper.py
+    python test/test_http_scraper.py
+"""
+import io
+import os
+import sys
+import shutil
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from PIL import Image
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src", "backend"))
+
+from scraper.http_scraper import HTTPScraper, extract_login_form  # noqa: E402
+
+
+USERNAME = "member"
+PASSWORD = "secret"
+CSRF_TOKEN = "1718000000,0123456789abcdef"
+SESSION_COOKIE = "xf_user=42"
+# Attachments per thread page, thread pages, threads per listing page, listing pages
+THREAD_PAGE_SIZE = 3
+THREAD_PAGES = 2
+LISTING_PAGE_SIZE = 2
+LISTING_PAGES = 2
+
+
+def attachment_bytes() -> bytes:
+    """A small PNG served for every attachment."""
+    buffer = io.BytesIO()
+    Image.new("RGB", (40, 30), "green").save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Just enough of XenForo for the HTTP scraper."""
+
+    attachment = attachment_bytes()
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, body: bytes, content_type: str = "text/html", status: int = 200, cookie: str = None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        if cookie:
+            self.send_header("Set-Cookie", f"{cookie}; Path=/")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _page(self, body: str) -> bytes:
+        logged_in = "true" if SESSION_COOKIE in (self.headers.get("Cookie") or "") else "false"
+        return f'<html data-logged-in="{logged_in}"><body>{body}</body></html>'.encode()
+
+    def _next_link(self, path: str, page: int, pages: int) -> str:
+        if page >= pages:
+            return ""
+        return f'<a class="pageNav-jump pageNav-jump--next" href="{path}?page={page + 1}">Next</a>'
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        page = int(parse_qs(url.query).get("page", ["1"])[0])
+
+        if url.path == "/login/":
+            form = (
+                '<form action="/login/login" method="post" class="block">'
+                '<input type="text" name="login"><input type="password" name="password">'
+                f'<input type="hidden" name="_xfToken" value="{CSRF_TOKEN}">'
+                "</form>"
+            )
+            return self._send(self._page(form), cookie="xf_csrf=abc")
+
+        if url.path.startswith("/threads/"):
+            first = (page - 1) * THREAD_PAGE_SIZE + 1
+            links = "".join(
+                f'<a class="file-preview js-lbImage" href="/attachments/img-{i}-png.{i}/">img</a>'
+                for i in range(first, first + THREAD_PAGE_SIZE)
+            )
+            return self._send(self._page(links + self._next_link(url.path, page, THREAD_PAGES)))
+
+        if url.path.startswith("/forums/"):
+            first = (page - 1) * LISTING_PAGE_SIZE + 1
+            rows = "".join(
+                '<div class="structItem structItem--thread">'
+                f'<div class="structItem-title"><a href="/threads/jpd113-su25-b{i}-mc.{i}/">Thread {i}</a></div>'
+                f'<time class="structItem-latestDate" data-time="{1718000000 + i}"></time>'
+                "</div>"
+                for i in range(first, first + LISTING_PAGE_SIZE)
+            )
+            return self._send(self._page(rows + self._next_link(url.path, page, LISTING_PAGES)))
+
+        if url.path.startswith("/attachments/"):
+            if SESSION_COOKIE not in (self.headers.get("Cookie") or ""):
+                return self._send(b"Forbidden", status=403)
+            return self._send(self.attachment, "image/png")
+
+        self._send(b"Not found", status=404)
+
+    def do_POST(self):
+        form = parse_qs(self.rfile.read(int(self.headers["Content-Length"])).decode())
+        if (
+            urlparse(self.path).path == "/login/login"
+            and form.get("_xfToken") == [CSRF_TOKEN]
+            and form.get("login") == [USERNAME]
+            and form.get("password") == [PASSWORD]
+        ):
+            return self._send(b'<html data-logged-in="true"></html>', cookie=SESSION_COOKIE)
+        self._send(b'<html data-logged-in="false"></html>')
+
+
+class HTTPScraperTest(unittest.TestCase):
+    """Login, pagination, listings and downloads against the stand-in server."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+
+        # Scrapes write to ./archive and the database; keep both temporary
+        cls.cwd = os.getcwd()
+        cls.workdir = tempfile.mkdtemp(prefix="fuo-http-")
+        os.chdir(cls.workdir)
+        os.environ["DB_PATH"] = os.path.join(cls.workdir, "archive", "test.db")
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        os.chdir(cls.cwd)
+        shutil.rmtree(cls.workdir, ignore_errors=True)
+
+    def scraper(self, password: str = PASSWORD) -> HTTPScraper:
+        scraper = HTTPScraper(USERNAME, password, base_url=self.base_url, pdf_workers=1)
+        self.addCleanup(scraper.close)
+        return scraper
+
+    def test_extract_login_form(self):
+        form = extract_login_form(
+            '<form action="/login/login"><input name="login">'
+            f'<input type="hidden" name="_xfToken" value="{CSRF_TOKEN}"></form>'
+        )
+        self.assertEqual(form, {"action": "/login/login", "token": CSRF_TOKEN})
+
+        with self.assertRaises(ValueError):
+            extract_login_form('<form><input name="login"></form>')
+
+    def test_login(self):
+        url = f"{self.base_url}/threads/jpd113-su25-b5-mc.1/"
+        scraper = self.scraper()
+        scraper.init_driver()
+        self.assertTrue(scraper.login(url))
+
+        rejected = self.scraper(password="wrong")
+        rejected.init_driver()
+        self.assertFalse(rejected.login(url))
+
+    def test_image_urls_follow_pagination(self):
+        scraper = self.scraper()
+        scraper.init_driver()
+        self.assertTrue(scraper.login(f"{self.base_url}/threads/jpd113-su25-b5-mc.1/"))
+
+        urls = scraper.get_image_urls()
+        self.assertEqual(len(urls), THREAD_PAGE_SIZE * THREAD_PAGES)
+        self.assertEqual(urls[0], f"{self.base_url}/attachments/img-1-png.1/")
+        self.assertEqual(len(set(urls)), len(urls))
+
+    def test_list_threads(self):
+        threads = self.scraper().list_threads(f"{self.base_url}/forums/jpd113.10/")
+
+        self.assertEqual(len(threads), LISTING_PAGE_SIZE * LISTING_PAGES)
+        self.assertEqual(threads[0], {
+            "url": f"{self.base_url}/threads/jpd113-su25-b1-mc.1/",
+            "last_activity": 1718000001
+        })
+
+    def test_scrape_downloads_attachments(self):
+        result = self.scraper().scrape_images(f"{self.base_url}/threads/jpd113-su25-b5-mc.1/")
+
+        self.assertTrue(result["success"], result.get("error"))
+        self.assertEqual(result["image_count"], THREAD_PAGE_SIZE * THREAD_PAGES)
+        with open(os.path.join(result["images_folder"], "1.png"), "rb") as f:
+            self.assertEqual(f.read(), StandInHandler.attachment)
+        self.assertTrue(os.path.exists(result["pdf_path"]))
+
+
+if __name__ == "__main__":
+    unittest.main()